@@ -8,14 +8,20 @@ from functools import wraps
 import pytz
 import platform
 import sys
-import socket
-import re
-from mcrcon import MCRcon
+import time
+import base64
+import signal
 
 # Add src directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 import sql_calendar
+import log_retention
+import handler_heartbeat
+from event_registry import get_registry, event_definition_error
 from database_manager import db_manager
+from rcon_pool import rcon_connection
+from health_monitor import monitor as health_monitor
+from score_snapshots import score_history
 
 load_dotenv()
 PASSWORD = os.getenv("ADMIN_PASSWORD")
@@ -30,6 +36,14 @@ DATABASE_SCHEMA = os.getenv("DATABASE_SCHEMA", "schema.sql")
 DATABASE_PATH = os.path.join(DATABASE_DIR, DATABASE_FILE)
 SCHEMA_PATH = os.path.join(DATABASE_DIR, DATABASE_SCHEMA)
 
+# Live stream: how often a stream checks for changes (backing off to the max while nothing
+# changes), how long one request stays open before the browser reconnects (kept under
+# gunicorn's --timeout), and how many recent log rows a new viewer starts with
+LOG_STREAM_POLL_INTERVAL = 1.0
+LOG_STREAM_MAX_POLL_INTERVAL = 5.0
+LOG_STREAM_DURATION = 100
+LOG_STREAM_BACKLOG = 100
+
 # Other paths
 EVENTS_JSON_PATH = os.path.join(".", "events", "events_json")
 LOGS_PATH = os.path.join(".", "logs")
@@ -40,6 +54,8 @@ def get_db():
 
 def start_event_handler():
     try:
+        # A second click before this one's handler has taken its lock can still spawn a
+        # second process, but that one finds the lock held and exits straight away
         if not is_event_handler_running():
             if platform.system() == "Windows":
                 subprocess.Popen(["python", "./src/event_handler.py"], creationflags=subprocess.CREATE_NEW_CONSOLE)
@@ -53,11 +69,14 @@ def start_event_handler():
 
 def stop_event_handler():
     try:
-        if is_event_handler_running():
+        status = handler_heartbeat.handler_status()
+        if status["status"] != "Not Running" and status.get("pid"):
+            # The pid comes from the handler's lock, which is only held while that handler is alive
             if platform.system() == "Windows":
-                subprocess.run(["taskkill", "/F", "/IM", "python.exe"])
+                subprocess.run(["taskkill", "/F", "/PID", str(status["pid"])])
             else:
-                subprocess.run(["pkill", "-f", "event_handler.py"])
+                # A stalled handler's event loop can't run its SIGTERM handler
+                os.kill(status["pid"], signal.SIGKILL if status["status"] == "Stalled" else signal.SIGTERM)
             return True
         return False
     except Exception as e:
@@ -65,21 +84,8 @@ def stop_event_handler():
         return False
 
 def is_event_handler_running():
-    """Check if 'event_handler.py' is running."""
-    try:
-        if platform.system() == "Windows":
-            result = subprocess.run(
-                ["tasklist"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-            )
-            return "event_handler.py" in result.stdout
-        else:  # Linux
-            result = subprocess.run(
-                ["pgrep", "-f", "event_handler.py"], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-            )
-            return result.returncode == 0
-    except Exception as e:
-        print("Error checking event handler:", e)
-        return False
+    """Check if the event handler is alive, from its lock and heartbeat record."""
+    return handler_heartbeat.handler_status()["status"] != "Not Running"
 
 def login_required(f):
     @wraps(f)
@@ -133,6 +139,8 @@ def load_event_files():
 def load_logs_from_db():
     """Load recent logs from database"""
     try:
+        # Include anything this worker logged that is still buffered
+        sql_calendar.flush_logs()
         db = get_db()
         query = """
         SELECT timestamp, message, log_level 
@@ -214,126 +222,35 @@ def database_viewer():
     """New database viewer page"""
     return render_template("database_viewer.html")
 
+def health_snapshot():
+    """Latest health results from the background monitor (?refresh=1 probes right now)"""
+    health_monitor.ensure_started()
+    if request.args.get("refresh") == "1":
+        return health_monitor.refresh()
+    return health_monitor.snapshot()
+
 @app.route("/api/health/minecraft")
 @login_required
 def api_minecraft_health():
     """Check if Minecraft server is reachable"""
-    try:
-        # Get host from environment (default to localhost if not set)
-        rcon_host = os.getenv("RCON_HOST")
-        if not rcon_host:
-            return jsonify({
-                "healthy": False,
-                "status": "error",
-                "error": "RCON_HOST not configured in .env",
-                "server_ip": "Not configured"
-            })
-        
-        # Try to connect to the server port (usually 25565)
-        minecraft_port = 25565  # Standard Minecraft port
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)  # 5 second timeout
-        
-        result = sock.connect_ex((rcon_host, minecraft_port))
-        sock.close()
-        
-        if result == 0:
-            return jsonify({
-                "healthy": True,
-                "status": "online",
-                "message": f"Server at {rcon_host}:{minecraft_port} is reachable",
-                "server_ip": rcon_host
-            })
-        else:
-            return jsonify({
-                "healthy": False,
-                "status": "offline",
-                "error": f"Cannot connect to {rcon_host}:{minecraft_port}",
-                "server_ip": rcon_host
-            })
-            
-    except Exception as e:
-        return jsonify({
-            "healthy": False,
-            "status": "error",
-            "error": str(e),
-            "server_ip": rcon_host if 'rcon_host' in locals() else "Unknown"
-        })
+    snapshot = health_snapshot()
+    return jsonify(dict(snapshot["minecraft"], checked_at=snapshot["checked_at"]))
 
 @app.route("/api/health/rcon")
 @login_required 
 def api_rcon_health():
-    """Check if RCON connection is working using external script"""
-    try:
-        # Run the external RCON health check script
-        import subprocess
-        
-        script_path = os.path.join("src", "rcon_health_check.py")
-        
-        # Run the script and capture output
-        result = subprocess.run(
-            [sys.executable, script_path], 
-            capture_output=True, 
-            text=True, 
-            timeout=10  # 10 second timeout
-        )
-        
-        if result.returncode == 0:
-            # Parse the JSON output from the script
-            import json
-            health_data = json.loads(result.stdout.strip())
-            
-            # Try to get player count from result
-            player_count = 0
-            if health_data.get("result"):
-                # Parse "There are X of a max of Y players online:" format
-                import re
-                match = re.search(r'There are (\d+)', health_data["result"])
-                if match:
-                    player_count = int(match.group(1))
-            
-            health_data["player_count"] = player_count
-            return jsonify(health_data)
-        else:
-            # Script failed, try to parse error output
-            try:
-                error_data = json.loads(result.stdout.strip())
-                error_data["player_count"] = 0
-                return jsonify(error_data)
-            except:
-                return jsonify({
-                    "healthy": False,
-                    "status": "error",
-                    "error": f"RCON health check script failed: {result.stderr or 'Unknown error'}",
-                    "player_count": 0
-                })
-                
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            "healthy": False,
-            "status": "error",
-            "error": "RCON health check timed out",
-            "player_count": 0
-        })
-    except Exception as e:
-        return jsonify({
-            "healthy": False,
-            "status": "error",
-            "error": f"Failed to run RCON health check: {str(e)}",
-            "player_count": 0
-        })
+    """Check if RCON connection is working"""
+    snapshot = health_snapshot()
+    return jsonify(dict(snapshot["rcon"], checked_at=snapshot["checked_at"]))
     
 @app.route("/api/health/overall")
 @login_required
 def api_overall_health():
     """Get overall system health status"""
     try:
-        # Check both Minecraft and RCON
-        minecraft_response = api_minecraft_health()
-        rcon_response = api_rcon_health()
-        
-        minecraft_data = minecraft_response.get_json()
-        rcon_data = rcon_response.get_json()
+        snapshot = health_snapshot()
+        minecraft_data = snapshot["minecraft"]
+        rcon_data = snapshot["rcon"]
         
         minecraft_healthy = minecraft_data.get("healthy", False)
         rcon_healthy = rcon_data.get("healthy", False)
@@ -351,6 +268,7 @@ def api_overall_health():
             "minecraft": minecraft_data,
             "rcon": rcon_data,
             "issues": issues,
+            "checked_at": snapshot["checked_at"],
             "status": "All systems operational" if overall_healthy else f"Issues: {', '.join(issues)}"
         })
         
@@ -379,33 +297,104 @@ def api_database_info():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ====== TABLE PAGINATION ======
+# Table pages are fetched by keyset (WHERE id < cursor) rather than OFFSET, so deep pages cost
+# the same as the first one. Totals are cached per worker instead of COUNT(*) on every request.
+TABLE_COUNT_TTL = 60  # seconds a cached row count is reused
+MAX_PAGE_SIZE = 500
+_table_counts = {}
+
+def encode_cursor(direction, row_id):
+    """Opaque page cursor - 'before' pages go to older rows, 'after' pages to newer ones"""
+    raw = json.dumps({"d": direction, "id": row_id}).encode("utf8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """Returns (direction, id), or (None, None) for the first page / an invalid cursor"""
+    if not cursor:
+        return None, None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if data.get("d") in ("before", "after") and isinstance(data.get("id"), int):
+            return data["d"], data["id"]
+    except (ValueError, TypeError, AttributeError):
+        pass
+    return None, None
+
+def cached_table_count(db, table_name):
+    """Row count for a table, recounted at most once per TABLE_COUNT_TTL"""
+    cached = _table_counts.get(table_name)
+    if cached and time.monotonic() - cached[1] < TABLE_COUNT_TTL:
+        return cached[0]
+    
+    count_result = db.db_query(f"SELECT COUNT(*) FROM {table_name}")
+    total = count_result[0][0] if count_result else 0
+    _table_counts[table_name] = (total, time.monotonic())
+    return total
+
+def keyset_page(db, select_query, id_column, cursor, limit):
+    """
+    Fetch one page of select_query (newest first) by keyset on id_column.
+    Returns (rows, prev_cursor, next_cursor); a cursor is None when there is no page that way.
+    """
+    direction, cursor_id = decode_cursor(cursor)
+    
+    # One extra row tells us whether another page exists in the direction we're going
+    if direction == "after":
+        rows = db.db_query_with_params(
+            f"{select_query} WHERE {id_column} > ? ORDER BY {id_column} ASC LIMIT ?", (cursor_id, limit + 1)
+        ) or []
+        more = len(rows) > limit
+        rows = rows[:limit][::-1]
+        has_newer, has_older = more, True
+    elif direction == "before":
+        rows = db.db_query_with_params(
+            f"{select_query} WHERE {id_column} < ? ORDER BY {id_column} DESC LIMIT ?", (cursor_id, limit + 1)
+        ) or []
+        has_older = len(rows) > limit
+        rows = rows[:limit]
+        has_newer = True
+    else:
+        rows = db.db_query_with_params(
+            f"{select_query} ORDER BY {id_column} DESC LIMIT ?", (limit + 1,)
+        ) or []
+        has_older = len(rows) > limit
+        rows = rows[:limit]
+        has_newer = False
+    
+    # The id is always the first selected column
+    prev_cursor = encode_cursor("after", rows[0][0]) if rows and has_newer else None
+    next_cursor = encode_cursor("before", rows[-1][0]) if rows and has_older else None
+    return rows, prev_cursor, next_cursor
+
+def page_limit():
+    return max(1, min(request.args.get("limit", 50, type=int), MAX_PAGE_SIZE))
+
 @app.route("/api/database/table/<table_name>")
 @login_required
 def api_table_data(table_name):
     """Get data from a specific table"""
-    allowed_tables = ["events", "event_notifications", "logs", "event_winners"]
+    allowed_tables = ["events", "event_notifications", "logs", "event_winners", "score_snapshots"]
     if table_name not in allowed_tables:
         return jsonify({"error": "Table not allowed"}), 400
     
     try:
         db = get_db()
-        limit = request.args.get("limit", 50, type=int)
-        offset = request.args.get("offset", 0, type=int)
-        
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM {table_name}"
-        count_result = db.db_query(count_query)
-        total = count_result[0][0] if count_result else 0
+        limit = page_limit()
+        cursor = request.args.get("cursor")
         
-        # Get table data with pagination
-        query = f"SELECT * FROM {table_name} ORDER BY id DESC LIMIT {limit} OFFSET {offset}"
-        results = db.db_query(query)
+        # Get total count (cached)
+        total = cached_table_count(db, table_name)
         
         # Get column names
         column_query = f"PRAGMA table_info({table_name})"
         column_info = db.db_query(column_query)
         columns = [col[1] for col in column_info]  # col[1] is the column name
         
+        # Get one page of table data
+        results, prev_cursor, next_cursor = keyset_page(db, f"SELECT * FROM {table_name}", "id", cursor, limit)
+        
         # Format results
         rows = []
         for row in results:
@@ -420,7 +409,8 @@ def api_table_data(table_name):
             "rows": rows,
             "total": total,
             "limit": limit,
-            "offset": offset
+            "prev_cursor": prev_cursor,
+            "next_cursor": next_cursor
         })
         
     except Exception as e:
@@ -436,45 +426,36 @@ def api_enhanced_table_data(table_name):
     
     try:
         db = get_db()
-        limit = request.args.get("limit", 50, type=int)
-        offset = request.args.get("offset", 0, type=int)
+        limit = page_limit()
+        cursor = request.args.get("cursor")
         
         if table_name == "event_notifications":
             # Join with events table to get event name
-            query = f"""
+            query = """
             SELECT n.id, n.event_id, e.unique_event_name, e.name as event_name, 
                    n.notification_type, n.sent_at
             FROM event_notifications n
             JOIN events e ON n.event_id = e.id
-            ORDER BY n.id DESC 
-            LIMIT {limit} OFFSET {offset}
             """
+            id_column = "n.id"
             columns = ["id", "event_id", "unique_event_name", "event_name", "notification_type", "sent_at"]
             
-            # Get total count
-            count_query = "SELECT COUNT(*) FROM event_notifications"
-            
         elif table_name == "event_winners":
             # Join with events table to get event name
-            query = f"""
+            query = """
             SELECT w.id, w.event_id, e.unique_event_name, e.name as event_name,
                    w.player_name, w.final_score, w.was_online, w.rewarded_at
             FROM event_winners w
             JOIN events e ON w.event_id = e.id
-            ORDER BY w.id DESC 
-            LIMIT {limit} OFFSET {offset}
             """
+            id_column = "w.id"
             columns = ["id", "event_id", "unique_event_name", "event_name", "player_name", "final_score", "was_online", "rewarded_at"]
-            
-            # Get total count
-            count_query = "SELECT COUNT(*) FROM event_winners"
         
-        # Get total count
-        count_result = db.db_query(count_query)
-        total = count_result[0][0] if count_result else 0
+        # Get total count (cached)
+        total = cached_table_count(db, table_name)
         
-        # Get enhanced data
-        results = db.db_query(query)
+        # Get one page of enhanced data
+        results, prev_cursor, next_cursor = keyset_page(db, query, id_column, cursor, limit)
         
         # Format results
         rows = []
@@ -490,7 +471,49 @@ def api_enhanced_table_data(table_name):
             "rows": rows,
             "total": total,
             "limit": limit,
-            "offset": offset
+            "prev_cursor": prev_cursor,
+            "next_cursor": next_cursor
+        })
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/database/log-archives")
+@login_required
+def api_log_archives():
+    """List the monthly log archives written by log retention"""
+    try:
+        return jsonify({"archives": log_retention.list_archives()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/database/log-archives/<month>")
+@login_required
+def api_log_archive_data(month):
+    """Get archived log rows for one month (YYYY-MM), in the same shape as the table endpoint"""
+    try:
+        limit = page_limit()
+        offset = max(0, request.args.get("offset", 0, type=int))
+        
+        archive = log_retention.query_archive(month, limit, offset)
+        if archive is None:
+            return jsonify({"error": "Archive not found"}), 404
+        
+        rows = [dict(zip(archive["columns"], row)) for row in archive["rows"]]
+        
+        # Archives never change once written, so plain offsets work as the viewer's page cursors
+        prev_cursor = str(max(offset - limit, 0)) if offset > 0 else None
+        next_cursor = str(offset + limit) if offset + limit < archive["total"] else None
+        
+        return jsonify({
+            "table": f"logs_{month}",
+            "columns": archive["columns"],
+            "rows": rows,
+            "total": archive["total"],
+            "limit": limit,
+            "offset": offset,
+            "prev_cursor": prev_cursor,
+            "next_cursor": next_cursor
         })
         
     except Exception as e:
@@ -520,6 +543,7 @@ def api_admin_unlock():
 def api_admin_clear_logs():
     """Clear all logs from the database"""
     try:
+        sql_calendar.flush_logs()
         db = get_db()
         
         # Get count before deletion
@@ -530,6 +554,7 @@ def api_admin_clear_logs():
         # Delete all logs
         delete_query = "DELETE FROM logs"
         db.db_query_with_params(delete_query, ())
+        _table_counts.clear()
         
         # Log the action
         sql_calendar.log_message(f"Admin cleared {deleted_count} log entries via web interface", "ADMIN")
@@ -578,35 +603,8 @@ def api_admin_events_list():
 def api_admin_json_files():
     """Get list of all event JSON files for admin management"""
     try:
-        if not os.path.exists(EVENTS_JSON_PATH):
-            return jsonify({"files": []})
-        
-        files = []
-        for filename in os.listdir(EVENTS_JSON_PATH):
-            if filename.endswith('.json'):
-                filepath = os.path.join(EVENTS_JSON_PATH, filename)
-                stat = os.stat(filepath)
-                
-                # Try to read the JSON to get event details
-                try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                    event_name = data.get('name', 'Unknown')
-                    description = data.get('description', 'No description')
-                except:
-                    event_name = filename.replace('.json', '')
-                    description = 'Could not read file'
-                
-                files.append({
-                    "filename": filename,
-                    "event_name": event_name,
-                    "description": description,
-                    "size_bytes": stat.st_size,
-                    "modified": datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                })
-        
-        # Sort by filename
-        files.sort(key=lambda x: x['filename'])
+        # Parsed once per file change by the shared registry
+        files = [entry.summary for entry in get_registry(EVENTS_JSON_PATH).list()]
         
         return jsonify({"files": files})
         
@@ -711,9 +709,13 @@ def api_test_connection():
         if not host:
             return jsonify({"success": False, "error": "Host is required"})
         
-        # Try to connect
-        with MCRcon(host, password, port=port, timeout=5) as mcr:
-            result = mcr.command("list")
+        # Try to connect - a one-off session, these settings may never be used again
+        conn = rcon_connection(host, port, password, timeout=5)
+        try:
+            conn.connect()
+            result = conn.command("list")
+        finally:
+            conn.close()
         
         return jsonify({
             "success": True,
@@ -786,8 +788,13 @@ def api_admin_delete_event():
         # 2. Delete event_notifications  
         db.db_query_with_params("DELETE FROM event_notifications WHERE event_id = ?", (event_id,))
         
-        # 3. Delete the event itself
+        # 3. Delete score history
+        db.db_query_with_params("DELETE FROM score_snapshots WHERE event_id = ?", (event_id,))
+        
+        # 4. Delete the event itself
         db.db_query_with_params("DELETE FROM events WHERE id = ?", (event_id,))
+        _table_counts.clear()
+        sql_calendar.wake_event_handler()
         
         # Log the deletion
         sql_calendar.log_message(f"Admin deleted event '{event_name}' ({unique_name}) and all related data via web interface", "ADMIN")
@@ -872,6 +879,9 @@ def create_event():
             
             db.db_insert(insert_query)
             
+            # Let the event handler reschedule around the new event
+            sql_calendar.wake_event_handler()
+            
             # Log the event creation
             sql_calendar.log_message_with_timestamp(f"Event created via web interface: {name}")
             
@@ -991,19 +1001,19 @@ def create_json_event():
 @login_required
 def api_start_event_handler():
     success = start_event_handler()
-    return jsonify({"success": success, "status": "Running" if is_event_handler_running() else "Not Running"})
+    return jsonify({"success": success, "status": handler_heartbeat.handler_status()["status"]})
 
 @app.route("/api/event_handler_status")
 @login_required
 def api_event_handler_status():
-    running = is_event_handler_running()
-    return jsonify({"status": "Running" if running else "Not Running"})
+    """Running / Stalled / Not Running, plus the handler's last heartbeat details"""
+    return jsonify(handler_heartbeat.handler_status())
 
 @app.route("/api/event_handler/stop", methods=["POST"])
 @login_required
 def api_stop_event_handler():
     success = stop_event_handler()
-    return jsonify({"success": success, "status": "Running" if is_event_handler_running() else "Not Running"})
+    return jsonify({"success": success, "status": handler_heartbeat.handler_status()["status"]})
 
 @app.route("/api/event_files")
 @login_required
@@ -1018,16 +1028,118 @@ def api_logs():
     logs = load_logs_from_db()
     return jsonify(logs)
 
+def stream_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route("/api/logs/stream")
+@login_required
+def api_logs_stream():
+    """
+    Stream Server-Sent Events: new log rows (starting after the client's last seen log id),
+    plus a "status" event whenever the event handler's status changes and a "health" event
+    whenever the health monitor publishes new results. ?logs=0 leaves the log rows out.
+
+    Each open stream holds a gunicorn thread (start.sh runs --threads 8) for up to
+    LOG_STREAM_DURATION, in exchange for replacing every page's status and health polls.
+    """
+    include_logs = request.args.get("logs") != "0"
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("after")
+    last_id = int(last_id) if last_id and last_id.isdigit() else None
+    health_monitor.ensure_started()
+    
+    def generate():
+        nonlocal last_id
+        db = get_db()
+        
+        # First connection: start from the most recent rows, like the old log view
+        if include_logs and last_id is None:
+            sql_calendar.flush_logs()
+            result = db.db_query_with_params(
+                "SELECT COALESCE(MAX(id), 0) - ? FROM logs", (LOG_STREAM_BACKLOG,)
+            )
+            last_id = max(result[0][0], 0) if result else 0
+        
+        # Reconnect quickly when the stream ends, EventSource resends Last-Event-ID
+        yield "retry: 1000\n\n"
+        
+        started = time.monotonic()
+        last_sent = started
+        interval = LOG_STREAM_POLL_INTERVAL
+        status_key = last_health = None
+        while time.monotonic() - started < LOG_STREAM_DURATION:
+            changed = False
+            
+            # The heartbeat is rewritten every few seconds, so only its content counts as a change
+            status = handler_heartbeat.handler_status()
+            key = {k: v for k, v in status.items() if k not in ("updated_at", "heartbeat_age")}
+            if key != status_key:
+                status_key = key
+                yield stream_event("status", status)
+                changed = True
+            
+            health = health_monitor.snapshot()
+            if health != last_health:
+                last_health = health
+                yield stream_event("health", health)
+                changed = True
+            
+            if include_logs:
+                sql_calendar.flush_logs()
+                rows = db.db_query_with_params(
+                    "SELECT id, timestamp, message, log_level FROM logs WHERE id > ? ORDER BY id LIMIT 500",
+                    (last_id,)
+                ) or []
+                if rows:
+                    last_id = rows[-1][0]
+                    logs = [
+                        {"id": row[0], "timestamp": row[1], "message": row[2], "log_level": row[3]}
+                        for row in rows
+                    ]
+                    yield f"id: {last_id}\ndata: {json.dumps(logs)}\n\n"
+                    changed = True
+            
+            if changed:
+                last_sent = time.monotonic()
+                interval = LOG_STREAM_POLL_INTERVAL
+            else:
+                # Nothing new - check less often until something happens
+                interval = min(interval * 2, LOG_STREAM_MAX_POLL_INTERVAL)
+                if time.monotonic() - last_sent >= 15:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    last_sent = time.monotonic()
+            
+            time.sleep(interval)
+    
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @app.route("/api/event_json_content/<filename>")
 @login_required
 def api_event_json_content(filename):
-    path = os.path.join(EVENTS_JSON_PATH, filename)
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            # Return pretty-printed JSON
-            data = json.load(f)
-            return json.dumps(data, indent=2)
-    return "", 404
+    try:
+        entry = get_registry(EVENTS_JSON_PATH).get(filename)
+    except event_definition_error:
+        return "", 404
+    if entry.pretty_json is None:
+        return "; ".join(entry.errors), 422
+    # Pretty-printed once when the file was parsed
+    return entry.pretty_json
+
+@app.route("/api/event_scores/<unique_event_name>")
+@login_required
+def api_event_scores(unique_event_name):
+    """Score history recorded by the scoreboard passes - no RCON involved"""
+    event_id = sql_calendar.get_event_id_by_unique_name(unique_event_name)
+    if not event_id:
+        return jsonify({"error": "Event not found"}), 404
+    try:
+        history = score_history(event_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify(dict(history, event=unique_event_name))
 
 # Keep this for backward compatibility, but note it's now deprecated
 @app.route("/api/log_content/<filename>")
@@ -1065,6 +1177,10 @@ if __name__ == "__main__":
                 print("Database initialized successfully")
             else:
                 print(f"Database already exists with {len(info['tables'])} tables")
+        
+        # Apply any schema migrations not yet in this database
+        for filename in sql_calendar.migrate_database():
+            print(f"Applied database migration {filename}")
                 
     except Exception as e:
         print(f"Error with database: {e}")
@@ -0,0 +1,22 @@
+-- Indexes for the event handler's scheduler queries (sql_calendar.py)
+-- Partial indexes only hold the rows the handler still cares about, so they
+-- stay small no matter how many finished events pile up.
+
+-- Upcoming/unstarted events: starts and 24h/30min/start notifications
+CREATE INDEX IF NOT EXISTS idx_events_pending_start
+ON events(start_time)
+WHERE event_over = 0;
+
+-- Running events: ending
+CREATE INDEX IF NOT EXISTS idx_events_in_progress_end
+ON events(end_time)
+WHERE event_in_progress = 1;
+
+-- Running events: periodic scoreboard display
+CREATE INDEX IF NOT EXISTS idx_events_in_progress_scoreboard
+ON events(last_scoreboard_time)
+WHERE event_in_progress = 1;
+
+-- Winner lookups per event (event_winners has no index on event_id)
+CREATE INDEX IF NOT EXISTS idx_event_winners_event
+ON event_winners(event_id);
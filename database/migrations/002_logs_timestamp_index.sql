@@ -0,0 +1,3 @@
+-- Lets log viewing (ORDER BY timestamp DESC) and retention (timestamp < cutoff) use an index
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp
+ON logs(timestamp);
@@ -0,0 +1,15 @@
+-- Per-player score history for running events, written by each scoreboard pass
+-- Delta encoded: a row is only stored when a player's score differs from their
+-- previous row, so standings at any time are each player's latest row up to then.
+CREATE TABLE IF NOT EXISTS score_snapshots (
+    id INTEGER PRIMARY KEY,
+    event_id INTEGER NOT NULL,
+    taken_at TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+);
+
+-- Latest score per player (GROUP BY player_name with MAX(id)) and history per event
+CREATE INDEX IF NOT EXISTS idx_score_snapshots_event_player
+ON score_snapshots(event_id, player_name, id);
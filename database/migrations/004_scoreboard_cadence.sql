@@ -0,0 +1,10 @@
+-- When each running event's next scoreboard display is due. Set by the display
+-- action from the event's scoreboard cadence; NULL falls back to the default
+-- interval after last_scoreboard_time.
+-- ADD COLUMN has no IF NOT EXISTS: a second process racing this migration fails
+-- it harmlessly and picks up the new user_version on its next start.
+ALTER TABLE events ADD COLUMN next_scoreboard_time TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_events_in_progress_next_scoreboard
+ON events(next_scoreboard_time)
+WHERE event_in_progress = 1;
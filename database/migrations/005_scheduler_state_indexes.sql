@@ -0,0 +1,19 @@
+-- Lets every scheduler branch seek into its index instead of scanning it. The
+-- partial indexes from 001 hold only pending or running events, but a branch with
+-- no range on the indexed column still walked all of them. Leading the index with
+-- the state column the branch tests for equality turns that into a search.
+
+-- Unstarted and started-but-unnotified events: start, start notification
+CREATE INDEX IF NOT EXISTS idx_events_pending_state
+ON events(event_started, start_time)
+WHERE event_over = 0;
+
+-- Running events: ending and scoreboard display
+CREATE INDEX IF NOT EXISTS idx_events_running_state
+ON events(event_over, end_time)
+WHERE event_in_progress = 1;
+
+-- Superseded by idx_events_running_state
+DROP INDEX IF EXISTS idx_events_in_progress_end;
+DROP INDEX IF EXISTS idx_events_in_progress_scoreboard;
+DROP INDEX IF EXISTS idx_events_in_progress_next_scoreboard;
@@ -10,7 +10,7 @@ import sql_calendar
 # ====== LOAD CONFIG ======
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
-CHANNEL_ID = int(os.getenv("EVENT_CHANNEL_ID"))
+CHANNEL_ID = int(os.getenv("EVENT_CHANNEL_ID") or 0)
 
 # ====== DISCORD CLIENT ======
 intents = discord.Intents.default()
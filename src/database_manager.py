@@ -1,6 +1,39 @@
+import os
 import sqlite3
+import threading
 from datetime import datetime
 
+# ====== CONFIG ======
+BUSY_TIMEOUT = 5000          # ms a writer waits on a lock held by another process before giving up
+STATEMENT_CACHE_SIZE = 256   # prepared statements kept per connection
+
+# One connection per (database, thread, process). gunicorn workers and the event handler
+# each get their own, and a forked worker never reuses a connection opened by its parent.
+_connections = threading.local()
+
+def _open_connection(database):
+    connection = sqlite3.connect(database, timeout=BUSY_TIMEOUT / 1000, cached_statements=STATEMENT_CACHE_SIZE)
+
+    # Only takes effect on a brand-new database file - older ones are switched offline by
+    # `log_retention.py enable-incremental-vacuum`, since that takes a full VACUUM
+    connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    # WAL lets the web workers read while the handler writes, and leaves no -journal file behind
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT}")
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.execute("PRAGMA temp_store = MEMORY")
+    return connection
+
+def close_connections():
+    """Close this thread's pooled connections - the event handler calls it as it exits"""
+    pool = getattr(_connections, "pool", None) or {}
+    for connection in pool.values():
+        connection.close()
+    _connections.pool = {}
+
+
 class db_manager():
 
     def __init__(self, database, schema_file):
@@ -8,9 +41,18 @@ class db_manager():
         self.schema_file = schema_file
 
 
-    # Connects to the database and returns a cursor object as well as the connection
+    # Returns this thread's pooled connection to the database, opening it on first use.
+    # Use it as `with self.db_connect() as db_conn:` - the block commits or rolls back
+    # but leaves the connection open for reuse, so callers must not close it.
     def db_connect(self):
-        connection = sqlite3.connect(self.db)
+        pool = getattr(_connections, "pool", None)
+        if pool is None or getattr(_connections, "pid", None) != os.getpid():
+            pool = _connections.pool = {}
+            _connections.pid = os.getpid()
+
+        connection = pool.get(self.db)
+        if connection is None:
+            connection = pool[self.db] = _open_connection(self.db)
         return connection
 
 
@@ -56,6 +98,48 @@ class db_manager():
             print(f"Error initalizing with Schema: {self.schema_file}. Exception {e}")
 
 
+    def migrate(self, migrations_dir):
+        """
+        Apply migrations_dir/NNN_description.sql files newer than the database's
+        PRAGMA user_version, in order, each in its own transaction.
+
+        Migrations must be idempotent (IF NOT EXISTS etc.) - two processes starting
+        at the same time may both apply one before either records the new version.
+        """
+        applied = []
+        if not os.path.isdir(migrations_dir):
+            return applied
+
+        migrations = []
+        for filename in os.listdir(migrations_dir):
+            version, _, rest = filename.partition("_")
+            if version.isdigit() and rest.endswith(".sql"):
+                migrations.append((int(version), filename))
+
+        db_conn = self.db_connect()
+        current_version = db_conn.execute("PRAGMA user_version").fetchone()[0]
+
+        for version, filename in sorted(migrations):
+            if version <= current_version:
+                continue
+
+            with open(os.path.join(migrations_dir, filename), "r") as f:
+                migration_sql = f.read()
+
+            try:
+                db_conn.executescript(f"BEGIN IMMEDIATE;\n{migration_sql}\nPRAGMA user_version = {version};\nCOMMIT;")
+            except Exception as e:
+                if db_conn.in_transaction:
+                    db_conn.rollback()
+                print(f"Error applying migration {filename}: {e}")
+                break
+
+            applied.append(filename)
+            current_version = version
+
+        return applied
+
+
     def db_query(self, query):
         result = None
         db_conn = None
@@ -92,6 +176,22 @@ class db_manager():
 
         return result
 
+    def db_execute(self, query, params=()):
+        """Execute a parameterized write and return the number of affected rows"""
+        with self.db_connect() as db_conn:
+            cursor = db_conn.execute(query, params)
+            affected_rows = cursor.rowcount
+            cursor.close()
+        return affected_rows
+
+    def db_executemany(self, query, rows):
+        """Execute a parameterized write once per row, in one transaction"""
+        with self.db_connect() as db_conn:
+            cursor = db_conn.executemany(query, rows)
+            affected_rows = cursor.rowcount
+            cursor.close()
+        return affected_rows
+
     def db_insert(self, query):
         result = None
         
@@ -115,8 +215,11 @@ class db_manager():
         backup_path = f'{backup_dir}{self.db.strip(".db")}_{backup_timestamp}'
 
         try:
-            import shutil
-            shutil.copy2(self.db, backup_path)
+            # Use the backup API - a plain file copy would miss pages still in the WAL
+            backup_conn = sqlite3.connect(backup_path)
+            with backup_conn:
+                self.db_connect().backup(backup_conn)
+            backup_conn.close()
             print(f"Created backup file at {backup_path}")
             return True
         
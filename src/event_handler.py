@@ -1,176 +1,383 @@
 #!/usr/bin/python3.12
+import asyncio
+import functools
 import json
 import glob
 import os
-import subprocess
+import platform
+import signal
+import sys
 import time
 import sql_calendar
+import log_retention
+import handler_heartbeat
+from database_manager import close_connections
+from presence_service import presence, PRESENCE_TTL
+from rcon_event_framework import event_engine
+from notifier import discord_notifier
 from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
 
 # ====== CONFIG ======
 load_dotenv()
 RESULTS_PATH = os.getenv("LOGS_PATH")
-CHECK_INTERVAL = 30  # seconds, how often to check for events
+RETRY_INTERVAL = 30  # seconds before an action that is still due is attempted again
+MAX_IDLE_SLEEP = 600  # seconds, upper bound on sleeping between deadlines as a safety net
+MAX_CONCURRENT_ACTIONS = int(os.getenv("MAX_CONCURRENT_ACTIONS", 4))  # event actions allowed to run at once
 
-# ===== Script Paths =====
-BOT_PY_PATH = "./src/bot.py"
-RCON_FRAMEWORK_PATH = "./src/rcon_event_framework.py"
+# ===== Event Engine =====
+# Hosted in this process so RCON sessions and loaded modules persist between actions
+engine = event_engine()
+
+# ===== Discord Notifier =====
+# One logged-in session for the handler's lifetime, fed through a queue
+notifier = discord_notifier()
 
 # ====== HELPER FUNCTIONS ======
 
-def send_discord_notification(action, unique_name, winners=None, score=None):
-    """Call the bot.py script with subprocess"""
-    cmd = ["python3", BOT_PY_PATH, action, unique_name]
-    
-    # For 'over' action, always add winners and score (even if empty/zero)
+def send_discord_notification(action, unique_name, winners=None, score=None, on_sent=None):
+    """Queue a notification on the persistent Discord notifier - on_sent runs once it is delivered"""
+    # For 'over' action, always send winners and score (even if empty/zero)
     if action == "over":
         if winners is None:
             winners = ['no_Participants']
         if score is None:
             score = 0
-        cmd.append(",".join(winners))
-        cmd.append(str(score))
-    
-    print(f"Sending Discord notification: {' '.join(cmd)}")
-    sql_calendar.log_message(f"Sending Discord notification: {' '.join(cmd)}")
-    subprocess.run(cmd)
-
-def call_rcon_framework(action, json_file, unique_name=None):
-    """Call the RCON framework script"""
-    cmd = ["python3", RCON_FRAMEWORK_PATH, action, json_file]
-    if unique_name:
-        cmd.append(unique_name)
-    print(f"Calling RCON framework: {' '.join(cmd)}")
-    sql_calendar.log_message(f"Calling RCON framework: {' '.join(cmd)}")
-    subprocess.run(cmd)
-
-def get_event_results(unique_event_name):
-    """Get event results from database (NOT from files)"""
-    winners = []
-    score = None
-    
-    try:
-        # Get event ID from unique name
-        event_id = sql_calendar.get_event_id_by_unique_name(unique_event_name)
-        if not event_id:
-            sql_calendar.log_message(f"Could not find event ID for: {unique_event_name}", "ERROR")
-            return ['no_Participants'], 0
-        
-        # Get winners from database
-        winners_data = sql_calendar.get_event_winners(event_id)
-        
-        if winners_data:
-            # Extract winner names and get the final score from the first winner
-            winners = [winner[2] for winner in winners_data]  # player_name is index 2
-            score = winners_data[0][3] if winners_data[0][3] is not None else 0  # final_score is index 3
-            sql_calendar.log_message(f"Found winners in database: {winners} with score {score}")
-        else:
-            sql_calendar.log_message("No winners found in database")
-            winners = ['no_Participants']
-            score = 0
-            
-    except Exception as e:
-        sql_calendar.log_message(f"Error getting event results from database: {e}", "ERROR")
-        winners = ['no_Participants']
-        score = 0
-    
-    return winners, score
+
+    details = f" {','.join(winners)} {score}" if action == "over" else ""
+    print(f"Sending Discord notification: {action} {unique_name}{details}")
+    sql_calendar.log_message(f"Sending Discord notification: {action} {unique_name}{details}")
+    notifier.notify(action, unique_name, winners=winners, score=score, on_sent=on_sent)
+
+async def call_rcon_framework(action, json_file, unique_name=None, on_results=None):
+    """Run an RCON framework action on the in-process event engine"""
+    args = " ".join(arg for arg in (action, json_file, unique_name) if arg)
+    print(f"Calling RCON framework: {args}")
+    sql_calendar.log_message(f"Calling RCON framework: {args}")
+
+    if action == "start":
+        return await engine.start(json_file, unique_name)
+    elif action == "display":
+        return await engine.display(json_file, unique_name)
+    elif action == "clean":
+        return await engine.clean(json_file, unique_name, on_results=on_results)
+
+    sql_calendar.log_message(f"Unknown RCON framework action: {action}", "ERROR")
+    return False
+
+# ====== EVENT ACTIONS ======
+
+async def start_event(event_id, unique_name, name, event_json):
+    print(f"DEBUG| Starting Event {name}")
+    sql_calendar.log_message(f"Starting event: {name} (ID: {event_id})")
+
+    await call_rcon_framework("start", event_json)
+    sql_calendar.start_event_by_id(event_id)
+
+async def end_event(event_id, unique_name, name, event_json):
+    print(f"DEBUG| Ending Event {name}")
+    sql_calendar.log_message(f"Ending event: {name} (ID: {event_id})")
+
+    announced = False
+
+    def announce_results(leaders, final_score):
+        nonlocal announced
+        announced = True
+        send_discord_notification("over", unique_name, winners=leaders or None, score=final_score)
+
+    # Stop the event on the server - the winners are handed over as soon as they're
+    # known, while the closing ceremony is still playing
+    await call_rcon_framework("clean", event_json, unique_name, on_results=announce_results)
+
+    if not announced:
+        # The clean action failed before the winners could be determined
+        sql_calendar.log_message(f"No results from the clean action for {unique_name}", "WARN")
+        send_discord_notification("over", unique_name)
+
+    # Mark event as ended and send notification
+    sql_calendar.end_event_by_id(event_id)
+    sql_calendar.send_end_notification(event_id)
+
+async def display_scoreboard(event_id, unique_name, name, event_json):
+    print(f"DEBUG| Displaying scoreboard for {name}")
+    sql_calendar.log_message(f"Displaying scoreboard for: {name}")
+
+    # Scoreboard time is updated by the RCON framework
+    await call_rcon_framework("display", event_json, unique_name)
+
+# ====== ACTION SCHEDULER ======
+
+class action_scheduler():
+    """
+    Runs event actions as asyncio tasks so a long scoreboard display or closing
+    ceremony for one event doesn't hold up every other event.
+
+    Actions for the same event still run one at a time, in the order they were
+    submitted, and an action that is already queued or running for an event is
+    not submitted again by later handler cycles.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_ACTIONS, on_done=None):
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.event_locks = {}
+        self.in_flight = set()
+        self.running = set()
+        self.tasks = set()
+        self.attempts = {}
+        self.on_done = on_done
+
+
+    def is_busy(self, event_id, action=None):
+        """Check if an event has any (or a specific) action queued or running"""
+        if action is not None:
+            return (event_id, action) in self.in_flight
+        return any(busy_id == event_id for busy_id, _ in self.in_flight)
+
+
+    def attempt(self, event_id, action):
+        """Record an attempt at an action - False if it was already tried within RETRY_INTERVAL"""
+        now = time.monotonic()
+        key = (event_id, action)
+        if now - self.attempts.get(key, -RETRY_INTERVAL) < RETRY_INTERVAL:
+            return False
+
+        self.attempts = {k: t for k, t in self.attempts.items() if now - t < RETRY_INTERVAL}
+        self.attempts[key] = now
+        return True
+
+
+    def retry_delay(self, event_id, action):
+        """Seconds until an action may be attempted again (0 if it may run now)"""
+        last_attempt = self.attempts.get((event_id, action))
+        if last_attempt is None:
+            return 0
+        return max(0, last_attempt + RETRY_INTERVAL - time.monotonic())
+
+
+    def submit(self, event_id, action, coro_fn, *args):
+        key = (event_id, action)
+        if key in self.in_flight or not self.attempt(event_id, action):
+            return False
+
+        self.in_flight.add(key)
+        task = asyncio.create_task(self._run(key, coro_fn, args))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return True
+
+
+    async def _run(self, key, coro_fn, args):
+        event_id, action = key
+        lock = self.event_locks.setdefault(event_id, asyncio.Lock())
+
+        try:
+            # asyncio.Lock wakes waiters in FIFO order, which keeps per-event ordering
+            async with lock:
+                async with self.slots:
+                    self.running.add(key)
+                    await coro_fn(*args)
+        except Exception as e:
+            error_msg = f"Error running {action} for event {event_id}: {e}"
+            print(f"ERROR| {error_msg}")
+            sql_calendar.log_message(error_msg, "ERROR")
+        finally:
+            self.running.discard(key)
+            self.in_flight.discard(key)
+            if not self.is_busy(event_id):
+                self.event_locks.pop(event_id, None)
+            # Whatever this action changed may have moved the next deadline
+            if self.on_done:
+                self.on_done()
+
+
+    async def wait(self):
+        """Wait for every submitted action to finish"""
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+# Set to wake the main loop early: an action finished or the web app changed the schedule
+wakeup = asyncio.Event()
+scheduler = action_scheduler(on_done=wakeup.set)
+
+class wake_listener(asyncio.DatagramProtocol):
+    """Receives wake-up datagrams sent by sql_calendar.wake_event_handler()"""
+
+    def datagram_received(self, data, addr):
+        wakeup.set()
+
+def seconds_until_next_deadline():
+    """Sleep time until the earliest pending action, ignoring events with actions already running"""
+    now = datetime.now(timezone.utc)
+    delay = MAX_IDLE_SLEEP
+
+    for event_id, action, due_at in sql_calendar.upcoming_deadlines():
+        if due_at is None or scheduler.is_busy(event_id):
+            continue
+
+        due = datetime.fromisoformat(due_at.replace('Z', '+00:00'))
+        # Overdue actions that were just attempted wait out the retry interval
+        wait = max((due - now).total_seconds(), scheduler.retry_delay(event_id, action))
+        delay = min(delay, wait)
+
+    # Small margin so SQLite's whole-second 'now' has reached the deadline when we wake
+    return max(delay, 0) + 0.5
 
 # ====== MAIN LOOP ======
-def main():
+async def main():
     sql_calendar.log_message("Event handler starting up")
+    sql_calendar.migrate_database()
+    for query_name, plan_step in sql_calendar.check_scheduler_query_plans():
+        sql_calendar.log_message(f"Scheduler query {query_name} scans instead of searching an index: {plan_step}", "WARN")
+
+    notifier_task = asyncio.create_task(notifier.run())
+    retention_task = asyncio.create_task(retention_loop())
+    presence_task = asyncio.create_task(presence_loop())
 
+    wake_transport = None
+    try:
+        wake_transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            wake_listener, local_addr=("127.0.0.1", sql_calendar.SCHEDULER_WAKE_PORT)
+        )
+    except OSError as e:
+        sql_calendar.log_message(f"Could not listen for schedule changes on port {sql_calendar.SCHEDULER_WAKE_PORT}: {e}", "WARN")
+
+    loop_task = asyncio.create_task(handler_loop())
+    heartbeat_task = asyncio.create_task(heartbeat_loop())
+
+    # Stop from the web app or stop.sh (SIGTERM) shuts down cleanly instead of dying mid-action
+    if hasattr(signal, "SIGTERM") and platform.system() != "Windows":
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, loop_task.cancel)
+
+    try:
+        await loop_task
+    except asyncio.CancelledError:
+        sql_calendar.log_message("Event handler shutting down")
+    finally:
+        if wake_transport:
+            wake_transport.close()
+        # Let running actions finish, then flush queued notifications before the session goes away
+        await scheduler.wait()
+        heartbeat_task.cancel()
+        retention_task.cancel()
+        presence_task.cancel()
+        notifier.stop()
+        await notifier_task
+        await notifier.close()
+        handler_heartbeat.clear_heartbeat()
+
+# Wall-clock time the main loop last finished a pass, published in the heartbeat
+last_tick = None
+
+async def heartbeat_loop():
+    """Publish liveness and queue state for the web app every HEARTBEAT_INTERVAL"""
+    started_at = time.time()
     while True:
         try:
-            # === PRIORITY 1: Start Events ===
-            start_event_list = sql_calendar.events_needing_started()
-            
-            for event in start_event_list:
-                event_id, unique_name, name, event_json = event[0], event[1], event[2], event[3]
-                print(f"DEBUG| Starting Event {name}")
-                sql_calendar.log_message(f"Starting event: {name} (ID: {event_id})")
-                
-                call_rcon_framework("start", event_json)
-                sql_calendar.start_event_by_id(event_id)
-
-            # === PRIORITY 2: Send Event Start Notifications ===
-            missing_start_notifications = sql_calendar.find_missing_now_notif()
-            
-            for event in missing_start_notifications:
-                event_id, unique_name, name = event[0], event[1], event[2]
-                print(f"DEBUG| Sending start notification for {name}")
-                sql_calendar.log_message(f"Sending start notification for: {name}")
-                
-                send_discord_notification("now", unique_name)
-                sql_calendar.send_start_notification(event_id)
-
-            # === PRIORITY 3: End Events ===
-            end_event_list = sql_calendar.events_needing_ending()
-            
-            for event in end_event_list:
-                event_id, unique_name, name, event_json = event[0], event[1], event[2], event[3]
-                print(f"DEBUG| Ending Event {name}")
-                sql_calendar.log_message(f"Ending event: {name} (ID: {event_id})")
-                
-                # Stop the event on the server - this will save winners to database
-                call_rcon_framework("clean", event_json, unique_name)
-                
-                # Give the RCON framework time to save winners to database
-                time.sleep(3)
-                
-                # Get results from database using unique_name
-                winners, score = get_event_results(unique_name)
-                
-                # Send Discord notification
-                send_discord_notification("over", unique_name, winners=winners, score=score)
-                
-                # Mark event as ended and send notification
-                sql_calendar.end_event_by_id(event_id)
-                sql_calendar.send_end_notification(event_id)
-
-            # === PRIORITY 4: Display Scoreboards ===
-            scoreboard_events = sql_calendar.events_needing_scoreboard_display()
-
-            for event in scoreboard_events:
-                event_id, unique_name, name, event_json = event[0], event[1], event[2], event[3]
-                print(f"DEBUG| Displaying scoreboard for {name}")
-                sql_calendar.log_message(f"Displaying scoreboard for: {name}")
-                
-                call_rcon_framework("display", event_json, unique_name)  
-    # Pass unique_name as third argument
-                # Update scoreboard time will be handled in the RCON framework now
-
-            # === PRIORITY 5: Send 30 Minute Notifications ===
-            missing_30min_notifications = sql_calendar.find_missing_30m_notif()
-            
-            for event in missing_30min_notifications:
-                event_id, unique_name, name = event[0], event[1], event[2]
-                print(f"DEBUG| Sending 30min notification for {name}")
-                sql_calendar.log_message(f"Sending 30min notification for: {name}")
-                
-                send_discord_notification("thirty", unique_name)
-                sql_calendar.send_30min_notification(event_id)
-
-            # === PRIORITY 6: Send 24 Hour Notifications ===
-            missing_24h_notifications = sql_calendar.find_missing_24h_notif()
-            
-            for event in missing_24h_notifications:
-                event_id, unique_name, name = event[0], event[1], event[2]
-                print(f"DEBUG| Sending 24h notification for {name}")
-                sql_calendar.log_message(f"Sending 24h notification for: {name}")
-                
-                send_discord_notification("twenty_four", unique_name)
-                sql_calendar.send_24h_notification(event_id)
+            handler_heartbeat.write_heartbeat({
+                "started_at": started_at,
+                "last_tick": last_tick,
+                "queue_depth": len(scheduler.in_flight) - len(scheduler.running),
+                "current_actions": [
+                    {"event_id": event_id, "action": action}
+                    for event_id, action in sorted(scheduler.running)
+                ],
+                "notifications_queued": notifier.queue.qsize(),
+            })
+        except OSError as e:
+            print(f"ERROR| Could not write heartbeat: {e}")
+        await asyncio.sleep(handler_heartbeat.HEARTBEAT_INTERVAL)
 
+async def retention_loop():
+    """Archive old log rows off the event loop, once per LOG_RETENTION_INTERVAL"""
+    while True:
+        await asyncio.to_thread(log_retention.run_retention)
+        await asyncio.sleep(log_retention.LOG_RETENTION_INTERVAL)
+
+async def presence_loop():
+    """Keep the shared online-player reading fresh and log who joins and leaves"""
+    while True:
+        try:
+            snapshot = await asyncio.to_thread(presence.refresh)
+            if snapshot.joined or snapshot.left:
+                sql_calendar.log_message(
+                    f"Players online: {snapshot.count} (joined: {sorted(snapshot.joined)}, left: {sorted(snapshot.left)})"
+                )
+        except Exception as e:
+            # The server being down is the health monitor's to report; callers poll on demand
+            print(f"ERROR| Could not refresh player presence: {e}")
+        await asyncio.sleep(PRESENCE_TTL)
+
+async def handler_loop():
+    global last_tick
+
+    while True:
+        wakeup.clear()
+
+        try:
+            await run_due_actions()
         except Exception as e:
             error_msg = f"Error in main loop: {e}"
             print(f"ERROR| {error_msg}")
             sql_calendar.log_message(error_msg, "ERROR")
 
-        # Sleep before next cycle
-        sql_calendar.log_message(f"Sleeping for {CHECK_INTERVAL} seconds")
-        time.sleep(CHECK_INTERVAL)
+        # Sleep until the next action is due, or until something changes the schedule
+        try:
+            delay = seconds_until_next_deadline()
+        except Exception as e:
+            sql_calendar.log_message(f"Error computing next deadline: {e}", "ERROR")
+            delay = RETRY_INTERVAL
+
+        last_tick = time.time()
+        print(f"DEBUG| Sleeping for {delay:.1f} seconds")
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+# Notification actions: (notifier type, label for the logs, sql_calendar function that records it as sent)
+NOTIFICATION_ACTIONS = {
+    "start_notification": ("now", "start", sql_calendar.send_start_notification),
+    "30min": ("thirty", "30min", sql_calendar.send_30min_notification),
+    "24h": ("twenty_four", "24h", sql_calendar.send_24h_notification),
+}
+
+async def run_due_actions():
+    """Dispatch every action that is due right now"""
+    # One query for the whole tick, already in priority order:
+    # start, start notification, end, scoreboard display, 30min, 24h
+    for action, event_id, unique_name, name, event_json in sql_calendar.due_actions():
+
+        if action == "start":
+            scheduler.submit(event_id, "start", start_event, event_id, unique_name, name, event_json)
+
+        elif action == "end":
+            scheduler.submit(event_id, "end", end_event, event_id, unique_name, name, event_json)
+
+        elif action == "display":
+            # Never queue a scoreboard behind the cleanup that removes its objectives
+            if scheduler.is_busy(event_id, "end"):
+                continue
+            scheduler.submit(event_id, "display", display_scoreboard, event_id, unique_name, name, event_json)
+
+        elif action in NOTIFICATION_ACTIONS:
+            notification_type, label, record_sent = NOTIFICATION_ACTIONS[action]
+            # Not recorded as sent until Discord accepts it, so skip one still waiting to go out
+            if notifier.is_pending(notification_type, unique_name) or not scheduler.attempt(event_id, action):
+                continue
+            print(f"DEBUG| Sending {label} notification for {name}")
+            sql_calendar.log_message(f"Sending {label} notification for: {name}")
+
+            send_discord_notification(notification_type, unique_name, on_sent=functools.partial(record_sent, event_id))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Held for the life of the process, so only one handler ever runs the schedule
+    if not handler_heartbeat.acquire_handler_lock():
+        print("Another event handler is already running, exiting")
+        sys.exit(1)
+    try:
+        asyncio.run(main())
+    finally:
+        engine.close()
+        # Write out the last log entries, then close the connection so SQLite can checkpoint the WAL
+        sql_calendar.flush_logs()
+        close_connections()
\ No newline at end of file
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Event Plans
+Compiles a validated event definition into an immutable plan holding every RCON
+command the event sends, rendered once when the file is loaded. At run time the
+framework only fills in player names and scores, and the same plan can be
+rendered without a server to dry-run an event or diff two versions of it.
+"""
+
+import difflib
+import json
+
+# ====== SHARED EFFECTS ======
+BELL_SOUND = 'execute as @a at @s run playsound minecraft:block.bell.use master @s ~ ~ ~ 100'
+BELL_RINGS = 9
+WITHER_SOUND = 'execute as @a at @s run playsound minecraft:entity.wither.death master @s ~ ~ ~ 100'
+FIREWORK_PARTICLES = 'execute as @a at @s run particle minecraft:firework ~ ~ ~ 1 1 1 0.2 100 force'
+FIREWORK_SOUNDS = 'execute as @a at @s run playsound minecraft:entity.firework_rocket.twinkle master @s ~ ~ ~ 100'
+FIREWORK_BURSTS = 5
+CEREMONY_MUSIC = 'execute as @a at @s run playsound minecraft:music_disc.lava_chicken master @s ~ ~ ~ 100'
+STOP_MUSIC = 'stopsound @a'
+SIDEBAR_CLEAR = 'scoreboard objectives setdisplay sidebar'
+
+PHASES = ("start", "display", "clean")
+
+# Scoreboard cadence defaults, in minutes - overridden by the event JSON's "scoreboard" block.
+# The scheduler also falls back to DEFAULT_SCOREBOARD_INTERVAL for running events with no
+# next_scoreboard_time yet
+DEFAULT_SCOREBOARD_INTERVAL = 10
+SCOREBOARD_MIN_INTERVAL = 2
+SCOREBOARD_MAX_INTERVAL = 30
+SCOREBOARD_FINAL_MINUTES = 10
+
+# Runtime values are written into the text as these markers, then turned into
+# str.format fields once the surrounding JSON has been rendered
+SLOTS = ("player", "players", "score")
+
+
+def _marker(slot):
+    return f"\x00{slot}\x00"
+
+
+def _template(command):
+    """A rendered command as a str.format template - literal braces doubled, markers made into fields"""
+    template = command.replace("{", "{{").replace("}", "}}")
+    for slot in SLOTS:
+        # Inside JSON text the marker comes out escaped, as a bare target it stays raw
+        template = template.replace(json.dumps(_marker(slot))[1:-1], "{" + slot + "}")
+        template = template.replace(_marker(slot), "{" + slot + "}")
+    return template
+
+
+def _tellraw(target, text, color=None):
+    component = {"text": text, "color": color} if color else text
+    return f"tellraw {target} {json.dumps(component)}"
+
+
+def fill(template, player="", players=(), score=0):
+    """
+    Fill a plan template. `player` is only ever a command target, `players` is
+    joined and escaped to sit inside JSON text.
+    """
+    return template.format(player=player, players=json.dumps(", ".join(players))[1:-1], score=score)
+
+
+class event_plan():
+    """Every command an event sends, compiled from a definition that passed validate_event"""
+
+    __slots__ = (
+        "name",
+        "aggregate_objective",
+        "start_announcement",
+        "description_announcement",
+        "setup_commands",
+        "leader_announcement",
+        "tied_announcement",
+        "no_participation_announcement",
+        "thresholds",
+        "threshold_announcement",
+        "sidebar_commands",
+        "sidebar_duration",
+        "scoreboard_adaptive",
+        "scoreboard_interval",
+        "scoreboard_min_interval",
+        "scoreboard_max_interval",
+        "scoreboard_final_window",
+        "end_announcement",
+        "no_winner_announcement",
+        "winner_announcement",
+        "reward_notifications",
+        "reward_give",
+        "reward_received",
+        "cleanup_objectives",
+        "cleanup_commands",
+    )
+
+    def __init__(self, definition):
+        """Raises ValueError if a field can't be turned into commands"""
+        name = definition["name"]
+        score_text = definition.get("score_text", "points")
+        objective = definition["aggregate_objective"]
+        sidebar = definition["sidebar"]
+        commands = definition["commands"]
+        players, score, player = _marker("players"), _marker("score"), _marker("player")
+
+        try:
+            duration = float(sidebar["duration"])
+        except (TypeError, ValueError):
+            raise ValueError(f"'sidebar.duration' must be a number, got {sidebar['duration']!r}")
+        if not all(isinstance(cmd, str) for cmd in commands["setup"] + commands["cleanup"]):
+            raise ValueError("'commands.setup' and 'commands.cleanup' must only contain strings")
+
+        cadence = definition.get("scoreboard", {})
+        if not isinstance(cadence, dict):
+            raise ValueError("'scoreboard' must be an object")
+        try:
+            interval = float(cadence.get("interval", DEFAULT_SCOREBOARD_INTERVAL)) * 60
+            min_interval = float(cadence.get("min_interval", SCOREBOARD_MIN_INTERVAL)) * 60
+            max_interval = float(cadence.get("max_interval", SCOREBOARD_MAX_INTERVAL)) * 60
+            final_window = float(cadence.get("final_minutes", SCOREBOARD_FINAL_MINUTES)) * 60
+        except (TypeError, ValueError):
+            raise ValueError("'scoreboard' intervals must be numbers of minutes")
+        if not 0 < min_interval <= interval <= max_interval:
+            raise ValueError("'scoreboard' intervals must satisfy 0 < min_interval <= interval <= max_interval")
+        if not isinstance(cadence.get("adaptive", False), bool):
+            raise ValueError(f"'scoreboard.adaptive' must be true or false, got {cadence['adaptive']!r}")
+
+        title_format = {"text": str(sidebar["displayName"]), "color": str(sidebar["color"]), "bold": bool(sidebar["bold"])}
+
+        compiled = {
+            "name": name,
+            "aggregate_objective": objective,
+
+            # start
+            "start_announcement": _tellraw("@a", f"The {name} event is starting", "gold"),
+            "description_announcement": _tellraw("@a", str(definition["description"]), "aqua"),
+            "setup_commands": tuple(commands["setup"]),
+
+            # display
+            "leader_announcement": _template(_tellraw("@a", f"{players} is leading the {name} event with {score} {score_text}!", "gold")),
+            "tied_announcement": _template(_tellraw("@a", f"{players} are tied for first in the {name} event with {score} {score_text}!", "gold")),
+            "no_participation_announcement": _tellraw("@a", f"No one participated in the {name} event.", "red"),
+            "thresholds": tuple(sorted(definition.get("announce_thresholds", []))),
+            "threshold_announcement": _template(_tellraw("@a", f"{players} reached {score} {score_text} in the {name} event!", "yellow")),
+            "sidebar_commands": (
+                f"scoreboard objectives setdisplay sidebar {objective}",
+                f"scoreboard objectives modify {objective} displayname {json.dumps(title_format)}",
+            ),
+            "sidebar_duration": duration,
+            "scoreboard_adaptive": cadence.get("adaptive", False),
+            "scoreboard_interval": interval,
+            "scoreboard_min_interval": min_interval,
+            "scoreboard_max_interval": max_interval,
+            "scoreboard_final_window": final_window,
+
+            # clean
+            "end_announcement": _tellraw("@a", f"The {name} event has ended!", "gold"),
+            "no_winner_announcement": _tellraw("@a", "Unfortunately, nobody participated in this event!", "red"),
+            "winner_announcement": _template(_tellraw("@a", f"{players} won the event with {score} {score_text}", "green")),
+            "reward_notifications": tuple(_template(_tellraw(player, text)) for text in (
+                f"You have won the {name} event!",
+                "You will be receiving your prize in...",
+                "3!",
+                "2!",
+                "1!",
+            )),
+            # Event files write the item NBT with single quotes so it fits in a JSON string
+            "reward_give": _template(f"give {player} {definition['reward_cmd']}".replace("'", '"')),
+            "reward_received": _template(_tellraw(player, f"You have been given the legendary {definition['reward_name']}!", "light_purple")),
+            "cleanup_objectives": tuple(commands["cleanup"]),
+            "cleanup_commands": tuple(f"scoreboard objectives remove {objective}" for objective in commands["cleanup"]),
+        }
+        for slot, value in compiled.items():
+            object.__setattr__(self, slot, value)
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError("event plans are immutable")
+
+
+    def leaders_message(self, leaders, score):
+        """The display phase's leader announcement"""
+        template = self.leader_announcement if len(leaders) == 1 else self.tied_announcement
+        return fill(template, players=leaders, score=score)
+
+
+    def threshold_message(self, player, threshold):
+        """Announcement for a player passing one of the event's announce_thresholds"""
+        return fill(self.threshold_announcement, players=[player], score=threshold)
+
+
+    def next_scoreboard_delay(self, previous_delay=None, changes=None, seconds_left=None):
+        """
+        Seconds until the next scoreboard display. Fixed at the interval unless the event
+        is adaptive: then it speeds up to min_interval in the final minutes or right after
+        the lead changed, and backs off towards max_interval while nothing is moving
+        (no score changes, or no players to read at all).
+        """
+        if not self.scoreboard_adaptive:
+            return self.scoreboard_interval
+
+        if seconds_left is not None and seconds_left <= self.scoreboard_final_window:
+            return self.scoreboard_min_interval
+        if changes is not None and changes.leaders_changed and not changes.first:
+            return self.scoreboard_min_interval
+        if changes is None or not changes.changed:
+            return min(self.scoreboard_max_interval, max(previous_delay or 0, self.scoreboard_interval) * 2)
+        return self.scoreboard_interval
+
+
+    def winners_message(self, leaders, score):
+        """The closing ceremony's winner announcement"""
+        return fill(self.winner_announcement, players=leaders, score=score)
+
+
+    def reward_commands(self, player):
+        """(countdown messages, give command, received message) for one winner"""
+        notifications = [fill(template, player=player) for template in self.reward_notifications]
+        return notifications, fill(self.reward_give, player=player), fill(self.reward_received, player=player)
+
+
+    def render(self, phase, leaders=(), score=0):
+        """
+        The commands a phase sends, in order, for the given outcome - queries like
+        `list` and score aggregation are left out, they depend on the server
+        """
+        if phase == "start":
+            return [self.start_announcement, *[BELL_SOUND] * BELL_RINGS,
+                    self.description_announcement, WITHER_SOUND, *self.setup_commands]
+
+        if phase == "display":
+            if leaders and score != 0:
+                announcement = self.leaders_message(leaders, score)
+            else:
+                announcement = self.no_participation_announcement
+            return [announcement, *self.sidebar_commands, SIDEBAR_CLEAR]
+
+        if phase == "clean":
+            won = leaders and score > 0
+            cmds = [self.end_announcement, *[FIREWORK_PARTICLES, FIREWORK_SOUNDS] * FIREWORK_BURSTS]
+            cmds.append(self.winners_message(leaders, score) if won else self.no_winner_announcement)
+            cmds += [CEREMONY_MUSIC, *self.sidebar_commands, SIDEBAR_CLEAR, STOP_MUSIC]
+            if won:
+                for player in leaders:
+                    notifications, give_cmd, received_cmd = self.reward_commands(player)
+                    cmds += [*notifications, give_cmd, received_cmd]
+            return cmds + list(self.cleanup_commands)
+
+        raise ValueError(f"Unknown phase: {phase}")
+
+
+    def render_all(self, leaders=(), score=0):
+        """Every phase as one listing, for dry runs"""
+        lines = []
+        for phase in PHASES:
+            lines.append(f"# {phase}")
+            lines += self.render(phase, leaders, score)
+        return lines
+
+
+    def diff(self, other, leaders=(), score=0):
+        """Unified diff of what this plan and another would send"""
+        return list(difflib.unified_diff(
+            self.render_all(leaders, score), other.render_all(leaders, score),
+            fromfile=self.name, tofile=other.name, lineterm=""
+        ))
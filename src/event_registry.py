@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Event Definition Registry
+Parses and validates each events_json file once and keeps the result until the
+file's mtime or size changes, instead of re-reading it for every action and
+every page load. Also keeps the pretty-printed JSON, the admin summary and the
+compiled event_plan ready to use.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from event_plan import event_plan
+
+# Keys the RCON framework reads from every event definition, and their types
+REQUIRED_KEYS = {
+    "name": str,
+    "description": str,
+    "aggregate_objective": str,
+    "commands": dict,
+    "sidebar": dict,
+    "reward_cmd": str,
+    "reward_name": str,
+}
+REQUIRED_COMMANDS = ("setup", "aggregate", "cleanup")
+REQUIRED_SIDEBAR = ("displayName", "color", "bold", "duration")
+
+
+class event_definition_error(Exception):
+    """Raised when an event JSON file is missing, unreadable or invalid"""
+
+
+def validate_event(data):
+    """Return a list of problems with an event definition (empty when valid)"""
+    if not isinstance(data, dict):
+        return ["Event definition must be a JSON object"]
+
+    errors = []
+    for key, expected_type in REQUIRED_KEYS.items():
+        if key not in data:
+            errors.append(f"Missing '{key}'")
+        elif not isinstance(data[key], expected_type):
+            errors.append(f"'{key}' must be a {expected_type.__name__}")
+
+    if isinstance(data.get("commands"), dict):
+        for key in REQUIRED_COMMANDS:
+            if not isinstance(data["commands"].get(key), list):
+                errors.append(f"'commands.{key}' must be a list")
+
+    if isinstance(data.get("sidebar"), dict):
+        for key in REQUIRED_SIDEBAR:
+            if key not in data["sidebar"]:
+                errors.append(f"Missing 'sidebar.{key}'")
+
+    thresholds = data.get("announce_thresholds", [])
+    if not isinstance(thresholds, list) or not all(isinstance(t, int) and not isinstance(t, bool) and t > 0 for t in thresholds):
+        errors.append("'announce_thresholds' must be a list of positive whole numbers")
+
+    # Older files store this as the string "true"/"false"
+    if data.get("is_aggregate") not in (None, True, False, "true", "false"):
+        errors.append("'is_aggregate' must be true or false")
+
+    return errors
+
+
+class event_entry():
+    """One parsed file, plus everything the UI serves from it"""
+
+    def __init__(self, filename, stat, data, errors):
+        self.filename = filename
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.pretty_json = json.dumps(data, indent=2) if data is not None else None
+        if not errors:
+            # Older files store this as the string "true"/"false", which is truthy either way
+            data = dict(data, is_aggregate=data.get("is_aggregate") in (True, "true"))
+        self.data = data
+        self.errors = errors
+        self.plan = None
+        if not errors:
+            # Compiled once per file version, alongside the parse
+            try:
+                self.plan = event_plan(data)
+            except ValueError as e:
+                self.errors = errors = [str(e)]
+        self.summary = {
+            "filename": filename,
+            "event_name": data.get("name", "Unknown") if isinstance(data, dict) else filename.replace(".json", ""),
+            "description": data.get("description", "No description") if isinstance(data, dict) else "Could not read file",
+            "size_bytes": stat.st_size,
+            "modified": datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+            "valid": not errors,
+            "errors": errors,
+        }
+
+
+class event_registry():
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.entries = {}
+        self.lock = threading.Lock()
+
+
+    def get(self, filename):
+        """The current entry for a file, re-parsed only if it changed on disk"""
+        if not filename.endswith(".json") or os.path.basename(filename) != filename:
+            raise event_definition_error(f"Invalid event file name: {filename}")
+
+        path = os.path.join(self.directory, filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            with self.lock:
+                self.entries.pop(filename, None)
+            raise event_definition_error(f"Event file not found: {filename}")
+
+        with self.lock:
+            entry = self.entries.get(filename)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            return entry
+
+        entry = self._load(filename, path, stat)
+        with self.lock:
+            self.entries[filename] = entry
+        return entry
+
+
+    def definition(self, filename):
+        """
+        A validated event definition. The top level is a copy, so callers may add keys
+        (like unique_event_name), but nested values are shared and must not be modified.
+        """
+        entry = self.get(filename)
+        if entry.errors:
+            raise event_definition_error(f"{filename}: {'; '.join(entry.errors)}")
+        return dict(entry.data)
+
+
+    def plan(self, filename):
+        """The compiled event_plan for a valid definition"""
+        entry = self.get(filename)
+        if entry.errors:
+            raise event_definition_error(f"{filename}: {'; '.join(entry.errors)}")
+        return entry.plan
+
+
+    def list(self):
+        """Entries for every .json file in the directory, sorted by filename"""
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(".json"):
+                try:
+                    entries.append(self.get(filename))
+                except event_definition_error:
+                    # Deleted between listdir and stat
+                    continue
+
+        # Forget files that are gone
+        with self.lock:
+            names = {entry.filename for entry in entries}
+            for filename in list(self.entries):
+                if filename not in names:
+                    del self.entries[filename]
+        return entries
+
+
+    def _load(self, filename, path, stat):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            return event_entry(filename, stat, None, [f"Could not parse JSON: {e}"])
+        return event_entry(filename, stat, data, validate_event(data))
+
+
+# ====== SHARED REGISTRIES ======
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_registry(directory):
+    """Get the shared registry for an events directory"""
+    key = os.path.abspath(directory)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = event_registry(directory)
+            _registries[key] = registry
+        return registry
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Event Timelines
+A ceremony is a list of RCON commands at offsets from its start. The timeline
+waits on the event loop between steps instead of sleeping a worker thread, and
+steps that share an offset go out as one batch on one session - so every winner's
+countdown plays at the same time rather than one after another.
+"""
+
+import asyncio
+
+
+class timeline():
+
+    def __init__(self):
+        self.steps = []  # (offset, commands, label)
+
+
+    def at(self, offset, commands, label=None):
+        """Schedule one command or a list of commands `offset` seconds after the start"""
+        if isinstance(commands, str):
+            commands = [commands]
+        self.steps.append((offset, list(commands), label))
+        return self
+
+
+    def duration(self):
+        return max((offset for offset, _, _ in self.steps), default=0)
+
+
+    def batches(self):
+        """[(offset, [(command, label), ...])] in the order they'll be sent"""
+        batches = {}
+        for offset, commands, label in sorted(self.steps, key=lambda step: step[0]):
+            batches.setdefault(offset, []).extend((cmd, label) for cmd in commands)
+        return list(batches.items())
+
+
+    async def play(self, send):
+        """
+        Run the timeline. `send` is the blocking RCON call (a list of commands in,
+        a list of replies out); it runs on a worker thread so the loop stays free.
+
+        Returns {label: [(command, reply), ...]} for every labelled step. A slow batch
+        delays the ones after it, offsets are never skipped.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = {}
+
+        for offset, batch in self.batches():
+            delay = started + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            replies = await asyncio.to_thread(send, [cmd for cmd, _ in batch])
+            replies = list(replies) + [None] * (len(batch) - len(replies))
+            for (cmd, label), reply in zip(batch, replies):
+                if label is not None:
+                    results.setdefault(label, []).append((cmd, reply))
+
+        return results
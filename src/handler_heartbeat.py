@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Event Handler Heartbeat
+The event handler rewrites a small JSON record every few seconds (pid, last loop
+tick, queued and running actions). The web app reads it to tell Running from
+Stalled from Not Running without shelling out to pgrep/tasklist.
+
+Whether a handler exists at all comes from a lock file rather than the heartbeat:
+the handler takes an exclusive lock on it as soon as it starts and holds it until
+it exits, so a second handler refuses to start, and the pid recorded in it always
+belongs to a live handler - never to a process that reused an old pid.
+"""
+
+import json
+import os
+import time
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ====== CONFIG ======
+load_dotenv()
+DATABASE_DIR = os.getenv("DATABASE_DIR", "./database/")
+HEARTBEAT_PATH = os.path.join(DATABASE_DIR, "handler_heartbeat.json")
+LOCK_PATH = os.path.join(DATABASE_DIR, "handler.lock")
+HEARTBEAT_INTERVAL = 10   # seconds between heartbeats
+STALL_AFTER = 60          # seconds without a heartbeat before a live process counts as stalled
+LOCK_OFFSET = 64          # Windows locks are mandatory, so the locked byte sits past the pid text
+
+# Held open by the handler for its whole life; the lock goes when the process does
+_lock_file = None
+
+
+def write_heartbeat(record, path=HEARTBEAT_PATH):
+    """Publish the handler's state - written then renamed so readers never see half a file"""
+    record = dict(record, pid=os.getpid(), updated_at=time.time())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+
+
+def clear_heartbeat(path=HEARTBEAT_PATH):
+    """Remove the record on a clean shutdown"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def read_heartbeat(path=HEARTBEAT_PATH):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _try_lock(f):
+    """Non-blocking exclusive lock - False if another process holds it"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(LOCK_OFFSET)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(LOCK_OFFSET)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def acquire_handler_lock(path=LOCK_PATH):
+    """
+    Take the handler lock and record this process's pid in it. Called once at
+    handler startup - False if another handler already holds it.
+    """
+    global _lock_file
+    f = open(path, "a+")
+    if not _try_lock(f):
+        f.close()
+        return False
+    f.seek(0)
+    f.truncate()
+    f.write(str(os.getpid()))
+    f.flush()
+    _lock_file = f
+    return True
+
+
+def locked_handler_pid(path=LOCK_PATH):
+    """
+    The pid of the handler holding the lock, None if no handler holds it,
+    or 0 if one has just taken it and not written its pid yet.
+    """
+    try:
+        f = open(path, "r")
+    except FileNotFoundError:
+        return None
+
+    with f:
+        if _try_lock(f):
+            _unlock(f)
+            return None
+        f.seek(0)
+        pid = f.read(LOCK_OFFSET).strip()
+    return int(pid) if pid.isdigit() else 0
+
+
+def handler_status(path=HEARTBEAT_PATH, lock_path=LOCK_PATH):
+    """
+    {"status": "Running" | "Stalled" | "Not Running", ...heartbeat fields}
+
+    Stalled means the process exists but its event loop has stopped publishing
+    heartbeats, e.g. it is blocked on a hung call. "pid" is only ever the lock
+    holder's, so it is safe to signal.
+    """
+    pid = locked_handler_pid(lock_path)
+    if pid is None:
+        return {"status": "Not Running"}
+
+    record = read_heartbeat(path)
+    if not record or record.get("pid") != pid:
+        # Still starting up - no heartbeat of its own yet, so go by when it took the lock
+        try:
+            age = time.time() - os.path.getmtime(lock_path)
+        except OSError:
+            age = 0
+        return {"status": "Stalled" if age > STALL_AFTER else "Running", "pid": pid or None}
+
+    age = time.time() - record.get("updated_at", 0)
+    record["heartbeat_age"] = round(age, 1)
+    record["status"] = "Stalled" if age > STALL_AFTER else "Running"
+    return record
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Health Monitor
+Probes the Minecraft server port and RCON on a fixed schedule in a background
+thread and publishes the latest results as a JSON snapshot file, so health
+endpoints just read the snapshot instead of probing on every request.
+
+Every gunicorn worker runs a monitor thread, but only the one holding the
+lock file probes; the others read its snapshot and take over if it dies.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from rcon_health_check import check_rcon_health
+
+try:
+    import fcntl
+except ImportError:  # Windows - every process probes for itself
+    fcntl = None
+
+# ====== CONFIG ======
+load_dotenv()
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", 30))  # seconds between probes
+MINECRAFT_PORT = int(os.getenv("MINECRAFT_PORT", 25565))
+PROBE_TIMEOUT = 5  # seconds per probe
+DATABASE_DIR = os.getenv("DATABASE_DIR", "./database/")
+SNAPSHOT_PATH = os.path.join(DATABASE_DIR, "health_snapshot.json")
+LOCK_PATH = os.path.join(DATABASE_DIR, "health_monitor.lock")
+
+
+def check_minecraft():
+    """TCP connect to the game port"""
+    rcon_host = os.getenv("RCON_HOST")
+    if not rcon_host:
+        return {
+            "healthy": False,
+            "status": "error",
+            "error": "RCON_HOST not configured in .env",
+            "server_ip": "Not configured"
+        }
+
+    started = time.monotonic()
+    try:
+        with socket.create_connection((rcon_host, MINECRAFT_PORT), timeout=PROBE_TIMEOUT):
+            pass
+    except OSError as e:
+        return {
+            "healthy": False,
+            "status": "offline",
+            "error": f"Cannot connect to {rcon_host}:{MINECRAFT_PORT} ({e})",
+            "server_ip": rcon_host
+        }
+
+    return {
+        "healthy": True,
+        "status": "online",
+        "message": f"Server at {rcon_host}:{MINECRAFT_PORT} is reachable",
+        "server_ip": rcon_host,
+        "latency_ms": round((time.monotonic() - started) * 1000, 1)
+    }
+
+
+def check_rcon():
+    """Refresh the shared player presence over RCON - its `list` is the health probe"""
+    started = time.monotonic()
+    health_data = check_rcon_health(timeout=PROBE_TIMEOUT)
+    health_data["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+    health_data.setdefault("player_count", 0)
+    return health_data
+
+
+class health_monitor():
+
+    def __init__(self, interval=HEALTH_CHECK_INTERVAL, snapshot_path=SNAPSHOT_PATH, lock_path=LOCK_PATH):
+        self.interval = interval
+        self.snapshot_path = snapshot_path
+        self.lock_path = lock_path
+        self.lock_file = None
+        self.thread = None
+        self.pid = None
+        self.start_lock = threading.Lock()
+        self.cached = (None, None)  # (mtime, snapshot)
+
+
+    def ensure_started(self):
+        """Start the monitor thread in this process if it isn't running yet"""
+        with self.start_lock:
+            if self.pid == os.getpid() and self.thread is not None and self.thread.is_alive():
+                return
+            self.pid = os.getpid()
+            self.lock_file = None
+            self.thread = threading.Thread(target=self._run, name="health_monitor", daemon=True)
+            self.thread.start()
+
+
+    def snapshot(self):
+        """Latest published results - only re-reads the file when it has changed"""
+        try:
+            mtime = os.stat(self.snapshot_path).st_mtime_ns
+        except OSError:
+            return self._empty_snapshot()
+
+        cached_mtime, cached_snapshot = self.cached
+        if mtime == cached_mtime:
+            return cached_snapshot
+
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return cached_snapshot or self._empty_snapshot()
+
+        self.cached = (mtime, snapshot)
+        return snapshot
+
+
+    def refresh(self):
+        """Probe right now and publish the result (used by the dashboard's Refresh buttons)"""
+        snapshot = {
+            "minecraft": check_minecraft(),
+            "rcon": check_rcon(),
+            "checked_at": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }
+        self._publish(snapshot)
+        return snapshot
+
+
+    def _run(self):
+        while True:
+            try:
+                if self._is_prober():
+                    self.refresh()
+            except Exception as e:
+                print(f"Health monitor error: {e}")
+            time.sleep(self.interval)
+
+
+    def _is_prober(self):
+        """Hold an exclusive lock on the lock file; whoever has it does the probing"""
+        if fcntl is None:
+            return True
+        if self.lock_file is not None:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Kept open for the life of the process; the lock is released when it exits
+        self.lock_file = lock_file
+        return True
+
+
+    def _publish(self, snapshot):
+        # Write then rename so readers never see a half-written file
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+
+    def _empty_snapshot(self):
+        pending = {"healthy": False, "status": "checking", "error": "Health check has not run yet"}
+        return {
+            "minecraft": dict(pending, server_ip=os.getenv("RCON_HOST") or "Unknown"),
+            "rcon": dict(pending, player_count=0),
+            "checked_at": None,
+        }
+
+
+monitor = health_monitor()
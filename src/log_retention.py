@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Log Retention
+Keeps the logs table small: rows past the age/row limits are moved into one
+SQLite archive database per month (database/log_archive/logs_YYYY-MM.db), and
+the freed pages are handed back with incremental VACUUM.
+
+Archives stay plain SQLite so the database viewer can still query them.
+
+Databases created before incremental auto_vacuum was added need one full VACUUM
+to switch over. That locks the whole database, so it is never done by the
+handler - run it with everything stopped:
+
+    python src/log_retention.py enable-incremental-vacuum
+"""
+
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime, timezone, timedelta
+from dotenv import load_dotenv
+import sql_calendar
+from database_manager import db_manager
+
+# ====== CONFIG ======
+load_dotenv()
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", 14))           # days of logs kept in the main database
+LOG_MAX_ROWS = int(os.getenv("LOG_MAX_ROWS", 100000))                   # rows kept in the main database
+LOG_RETENTION_INTERVAL = float(os.getenv("LOG_RETENTION_INTERVAL", 3600))  # seconds between retention runs
+ARCHIVE_DIR = f"{sql_calendar.DATABASE_DIR}log_archive/"
+VACUUM_PAGES = 2000  # free pages returned to the OS per run, keeps each run short
+
+ARCHIVE_NAME = re.compile(r"^logs_(\d{4}-\d{2})\.db$")
+MONTH_FORMAT = re.compile(r"^\d{4}-\d{2}$")
+
+
+def archive_path(month):
+    return os.path.join(ARCHIVE_DIR, f"logs_{month}.db")
+
+
+def retention_cutoff(db):
+    """Timestamp before which rows are archived - whichever of the age and row limits is stricter"""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=LOG_RETENTION_DAYS)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    # Uses idx_logs_timestamp, so this is a short index walk rather than a sort
+    row_limit = db.db_query_with_params(
+        "SELECT timestamp FROM logs ORDER BY timestamp DESC LIMIT 1 OFFSET ?", (LOG_MAX_ROWS,)
+    )
+    if row_limit and row_limit[0][0] and row_limit[0][0] > cutoff:
+        # Roughly the newest LOG_MAX_ROWS rows stay (ties on the boundary second are kept too)
+        cutoff = row_limit[0][0]
+    return cutoff
+
+
+def archive_old_logs():
+    """Move rows older than the retention cutoff into their monthly archive databases"""
+    db = db_manager(sql_calendar.DATABASE_PATH, sql_calendar.SCHEMA_PATH)
+    sql_calendar.flush_logs()
+
+    cutoff = retention_cutoff(db)
+    months = db.db_query_with_params(
+        "SELECT DISTINCT substr(timestamp, 1, 7) FROM logs WHERE timestamp < ? ORDER BY 1", (cutoff,)
+    ) or []
+    if not months:
+        return 0
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    db_conn = db.db_connect()
+    archived = 0
+
+    for (month,) in months:
+        if not month or not MONTH_FORMAT.match(month):
+            continue
+        month_start = f"{month}-01T00:00:00Z"
+        month_end = (datetime.strptime(month_start, '%Y-%m-%dT%H:%M:%SZ') + timedelta(days=32)).strftime('%Y-%m-01T00:00:00Z')
+        params = (month_start, month_end, cutoff)
+
+        db_conn.execute("ATTACH DATABASE ? AS archive", (archive_path(month),))
+        try:
+            # Copy, then delete in the same transaction. WAL commits each file separately, so
+            # after a crash a row can at worst be in both - INSERT OR IGNORE makes the rerun safe
+            with db_conn:
+                db_conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive.logs (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TEXT,
+                    message TEXT NOT NULL,
+                    log_level TEXT
+                )""")
+                db_conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_logs_timestamp ON logs(timestamp)")
+                db_conn.execute("""
+                INSERT OR IGNORE INTO archive.logs (id, timestamp, message, log_level)
+                SELECT id, timestamp, message, log_level
+                FROM main.logs
+                WHERE timestamp >= ? AND timestamp < ? AND timestamp < ?
+                """, params)
+                cursor = db_conn.execute(
+                    "DELETE FROM main.logs WHERE timestamp >= ? AND timestamp < ? AND timestamp < ?", params
+                )
+                archived += cursor.rowcount
+        finally:
+            db_conn.execute("DETACH DATABASE archive")
+
+    return archived
+
+
+# Set once the "run enable-incremental-vacuum" hint has been logged by this process
+_vacuum_hint_logged = False
+
+def vacuum_free_pages():
+    """Return free pages to the OS a chunk at a time instead of a full VACUUM"""
+    global _vacuum_hint_logged
+    db = db_manager(sql_calendar.DATABASE_PATH, sql_calendar.SCHEMA_PATH)
+    db_conn = db.db_connect()
+
+    # Without incremental auto_vacuum the freed pages are still reused by new rows,
+    # the file just doesn't shrink - see enable_incremental_vacuum()
+    if db_conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        if not _vacuum_hint_logged:
+            sql_calendar.log_message(
+                "Database is not in incremental auto_vacuum mode, archived log space is reused but not returned. "
+                "Stop the handler and web app and run: python src/log_retention.py enable-incremental-vacuum", "WARN"
+            )
+            _vacuum_hint_logged = True
+        return 0
+
+    free_pages = db_conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if free_pages:
+        db_conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})").fetchall()
+    return min(free_pages, VACUUM_PAGES)
+
+
+def enable_incremental_vacuum():
+    """
+    Offline step: switch the database to incremental auto_vacuum with one full VACUUM.
+    Holds an exclusive lock for the whole rewrite, so nothing else may be using the database.
+    """
+    db = db_manager(sql_calendar.DATABASE_PATH, sql_calendar.SCHEMA_PATH)
+    db_conn = db.db_connect()
+    if db_conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    db_conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    db_conn.execute("VACUUM")
+    return True
+
+
+def run_retention():
+    """One retention pass: archive old rows, then reclaim space"""
+    try:
+        archived = archive_old_logs()
+        reclaimed = vacuum_free_pages()
+        if archived or reclaimed:
+            sql_calendar.log_message(f"Log retention archived {archived} rows and reclaimed {reclaimed} pages")
+        return archived
+    except Exception as e:
+        error_msg = f"Error running log retention: {e}"
+        print(error_msg)
+        sql_calendar.log_message(error_msg, "ERROR")
+        return 0
+
+
+# ====== ARCHIVE VIEWER ======
+
+def list_archives():
+    """Archived months, newest first"""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+
+    archives = []
+    for filename in os.listdir(ARCHIVE_DIR):
+        match = ARCHIVE_NAME.match(filename)
+        if match:
+            archives.append({
+                "month": match.group(1),
+                "size_bytes": os.path.getsize(os.path.join(ARCHIVE_DIR, filename)),
+            })
+    return sorted(archives, key=lambda archive: archive["month"], reverse=True)
+
+
+def query_archive(month, limit=50, offset=0):
+    """Rows from one month's archive, newest first - None if there is no such archive"""
+    if not MONTH_FORMAT.match(month or "") or not os.path.exists(archive_path(month)):
+        return None
+
+    # Read-only and short-lived: archives are only written by the retention pass
+    archive_conn = sqlite3.connect(f"file:{archive_path(month)}?mode=ro", uri=True)
+    try:
+        total = archive_conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        rows = archive_conn.execute(
+            "SELECT id, timestamp, message, log_level FROM logs ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        ).fetchall()
+    finally:
+        archive_conn.close()
+
+    return {"columns": ["id", "timestamp", "message", "log_level"], "rows": rows, "total": total}
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["enable-incremental-vacuum"]:
+        print("Usage: python log_retention.py enable-incremental-vacuum")
+        sys.exit(1)
+    print("Running full VACUUM, this can take a while on a large database...")
+    if enable_incremental_vacuum():
+        print("Database switched to incremental auto_vacuum")
+    else:
+        print("Database already uses incremental auto_vacuum")
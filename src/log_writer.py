@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Buffered Log Writer
+Collects log records in memory and writes them to the logs table in batches,
+one transaction per flush, instead of a connect + INSERT + commit per message.
+"""
+
+import atexit
+import os
+import threading
+from database_manager import db_manager
+from dotenv import load_dotenv
+
+# ====== CONFIG ======
+load_dotenv()
+FLUSH_SIZE = int(os.getenv("LOG_FLUSH_SIZE", 200))            # records buffered before an early flush
+FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 2.0))  # seconds a record may sit in the buffer
+MAX_BUFFER = 10000  # records kept while the database is unavailable, oldest dropped first
+
+INSERT_LOG_QUERY = """
+INSERT INTO logs (timestamp, message, log_level)
+VALUES (?, ?, ?);
+"""
+
+
+class log_writer():
+
+    def __init__(self, database, schema_file, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.db = db_manager(database, schema_file)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.urgent = False  # an ERROR is buffered, flush without waiting out the interval
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+
+    def write(self, timestamp, message, level="INFO"):
+        """Queue a record - never touches the database on the caller's thread"""
+        with self.condition:
+            self._ensure_thread()
+            self.buffer.append((timestamp, message, level))
+            if len(self.buffer) > MAX_BUFFER:
+                del self.buffer[:len(self.buffer) - MAX_BUFFER]
+
+            # Errors are worth seeing in the dashboard right away
+            if level == "ERROR":
+                self.urgent = True
+            if len(self.buffer) >= self.flush_size or self.urgent:
+                self.condition.notify()
+
+
+    def flush(self):
+        """Write everything buffered so far in one transaction"""
+        with self.flush_lock:
+            with self.condition:
+                records, self.buffer = self.buffer, []
+                self.urgent = False
+            if not records:
+                return
+
+            try:
+                with self.db.db_connect() as db_conn:
+                    db_conn.executemany(INSERT_LOG_QUERY, records)
+            except Exception as e:
+                print(f"Error flushing {len(records)} log records: {e}")
+                # Keep them for the next flush rather than losing them
+                with self.condition:
+                    self.buffer[:0] = records
+                    if len(self.buffer) > MAX_BUFFER:
+                        del self.buffer[:len(self.buffer) - MAX_BUFFER]
+
+
+    def _ensure_thread(self):
+        # A forked gunicorn worker inherits the buffer but not the thread, so start one per process
+        if self.pid == os.getpid() and self.thread is not None and self.thread.is_alive():
+            return
+        if self.pid != os.getpid():
+            self.buffer = []
+            self.pid = os.getpid()
+        self.thread = threading.Thread(target=self._run, name="log_writer", daemon=True)
+        self.thread.start()
+
+
+    def _run(self):
+        while True:
+            with self.condition:
+                # Checked under the lock, so a notify sent before this thread got here isn't missed
+                if len(self.buffer) < self.flush_size and not self.urgent:
+                    self.condition.wait(self.flush_interval)
+            self.flush()
+
+
+# ====== SHARED WRITERS ======
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_writer(database, schema_file):
+    """Get the shared writer for a database file"""
+    with _writers_lock:
+        writer = _writers.get(database)
+        if writer is None:
+            writer = log_writer(database, schema_file)
+            _writers[database] = writer
+        return writer
+
+def flush_all():
+    """Flush every writer - registered to run at interpreter exit"""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush()
+
+atexit.register(flush_all)
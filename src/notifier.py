@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Discord Notifier
+Keeps one logged-in Discord session for the lifetime of the event handler and
+drains queued notifications in batches, instead of starting bot.py (and a full
+Discord login) for every message.
+"""
+
+import asyncio
+import os
+import discord
+from dotenv import load_dotenv
+import sql_calendar
+from bot import build_embed, find_event_by_unique_name
+
+# ====== CONFIG ======
+load_dotenv()
+TOKEN = os.getenv("DISCORD_TOKEN")
+CHANNEL_ID = int(os.getenv("EVENT_CHANNEL_ID") or 0)
+NOTIFIER_TRANSPORT = os.getenv("NOTIFIER_TRANSPORT", "discord")  # "discord" or "stub"
+BATCH_WINDOW = 1.0        # seconds to wait for more messages before sending a batch
+RETRY_DELAY = 30.0        # seconds before a batch that failed to send is tried again
+MAX_EMBEDS_PER_MESSAGE = 10   # Discord limit
+MAX_CONTENT_LENGTH = 2000     # Discord limit
+
+# ====== TRANSPORTS ======
+
+class discord_transport():
+    """Sends through a single discord.py HTTP session (no gateway connection needed to post)"""
+
+    def __init__(self, token, channel_id):
+        self.token = token
+        self.channel_id = channel_id
+        self.client = None
+        self.channel = None
+
+    async def open(self):
+        if self.channel is not None:
+            return
+        self.client = discord.Client(intents=discord.Intents.none())
+        await self.client.login(self.token)
+        self.channel = await self.client.fetch_channel(self.channel_id)
+
+    async def send(self, content=None, embeds=None):
+        await self.channel.send(content=content, embeds=embeds or [])
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+        self.client = None
+        self.channel = None
+
+
+class stub_transport():
+    """Offline transport - records and logs messages instead of sending them"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def open(self):
+        pass
+
+    async def send(self, content=None, embeds=None):
+        message = {"content": content, "embeds": [embed.to_dict() for embed in embeds or []]}
+        self.sent.append(message)
+        print(f"[stub notifier] {message}")
+        sql_calendar.log_message(f"Stub notifier message: {message}")
+
+    async def close(self):
+        pass
+
+
+def default_transport():
+    """Pick the transport from .env - falls back to the stub when Discord isn't configured"""
+    if NOTIFIER_TRANSPORT == "stub":
+        return stub_transport()
+    if not TOKEN or not CHANNEL_ID:
+        sql_calendar.log_message("DISCORD_TOKEN/EVENT_CHANNEL_ID not set, using stub notifier", "WARN")
+        return stub_transport()
+    return discord_transport(TOKEN, CHANNEL_ID)
+
+# ====== NOTIFIER ======
+
+# Queued by stop() - run() sends everything ahead of it, then returns
+STOP = object()
+
+class discord_notifier():
+
+    def __init__(self, transport=None, batch_window=BATCH_WINDOW, retry_delay=RETRY_DELAY):
+        self.transport = transport or default_transport()
+        self.batch_window = batch_window
+        self.retry_delay = retry_delay
+        self.queue = asyncio.Queue()
+        self.pending = set()  # (action, unique_name) queued or waiting for a retry
+
+
+    def notify(self, action, unique_name, winners=None, score=None, on_sent=None):
+        """
+        Queue a twenty_four/thirty/now/over notification - never blocks.
+        `on_sent` is called once Discord has accepted it, not before.
+        """
+        self.pending.add((action, unique_name))
+        self.queue.put_nowait((action, unique_name, winners, score, on_sent))
+
+
+    def is_pending(self, action, unique_name):
+        """True while a notification is queued or waiting to be retried"""
+        return (action, unique_name) in self.pending
+
+
+    def stop(self):
+        """Ask run() to send what is queued and return"""
+        self.queue.put_nowait(STOP)
+
+
+    async def run(self):
+        """
+        Send whatever has piled up as one batch until stop() is called. A batch that
+        fails to send is retried after RETRY_DELAY, along with anything queued since.
+        """
+        failed = []
+        stopping = False
+        while not stopping:
+            batch = list(failed)
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), self.retry_delay if failed else None))
+            except asyncio.TimeoutError:
+                pass
+            else:
+                # Give notifications fired in the same handler cycle a moment to arrive
+                if batch[-1] is not STOP:
+                    await asyncio.sleep(self.batch_window)
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            stopping = any(item is STOP for item in batch)
+            failed = await self.send_batch([item for item in batch if item is not STOP])
+
+        # Shutting down - these stay unsent in the database and go out when the handler is back
+        for action, unique_name, _, _, _ in failed:
+            self.pending.discard((action, unique_name))
+            sql_calendar.log_message(f"Could not send {action} notification for {unique_name} before shutdown", "ERROR")
+
+
+    async def close(self):
+        """Close the session - call after run() has returned"""
+        await self.transport.close()
+
+
+    async def send_batch(self, batch):
+        """Send a batch, returning the notifications that could not be delivered"""
+        messages = []
+        for item in batch:
+            action, unique_name, winners, score, _ = item
+            message = await asyncio.to_thread(self.build_message, action, unique_name, winners, score)
+            if message is None:
+                # Nothing to send (e.g. the event was deleted) - still recorded, or the
+                # scheduler would queue it again every RETRY_INTERVAL
+                self.delivered(item, skipped=True)
+            else:
+                messages.append((item, message))
+
+        packed = self.pack(messages)
+        for index, (content, embeds, items) in enumerate(packed):
+            try:
+                await self.transport.open()
+                await self.transport.send(content=content, embeds=embeds)
+            except Exception as e:
+                error_msg = f"Error sending Discord notifications: {e}"
+                print(error_msg)
+                sql_calendar.log_message(error_msg, "ERROR")
+                # Drop the session so the retry logs in again
+                await self.transport.close()
+                return [item for _, _, unsent in packed[index:] for item in unsent]
+
+            for item in items:
+                self.delivered(item)
+        return []
+
+
+    def delivered(self, item, skipped=False):
+        action, unique_name, _, _, on_sent = item
+        self.pending.discard((action, unique_name))
+        if skipped:
+            sql_calendar.log_message(f"Skipped {action} notification for {unique_name}: no message could be built", "WARN")
+        else:
+            sql_calendar.log_message(f"Sent {action} notification for {unique_name}")
+        if on_sent is not None:
+            try:
+                on_sent()
+            except Exception as e:
+                sql_calendar.log_message(f"Finished {action} notification for {unique_name} but could not record it: {e}", "ERROR")
+
+
+    def build_message(self, action, unique_name, winners, score):
+        """Build the embed (or plain text for 'thirty') for one notification"""
+        event = find_event_by_unique_name(unique_name)
+        if not event:
+            error_msg = f"Event '{unique_name}' not found in database"
+            print(error_msg)
+            sql_calendar.log_message(error_msg, "ERROR")
+            return None
+
+        if action not in ("twenty_four", "thirty", "now", "over"):
+            sql_calendar.log_message(f"Unknown notification type: {action}", "ERROR")
+            return None
+
+        if action == "over":
+            winners = winners or ['no_Participants']
+            score = str(score if score is not None else 0)
+
+        return build_embed(event, action, winners, score)
+
+
+    def pack(self, messages):
+        """
+        Pack embeds and text lines into as few Discord messages as the limits allow.
+        Returns [(content, embeds, queued items in that message)].
+        """
+        packed = []
+        lines, embeds, items = [], [], []
+
+        for item, message in messages:
+            if isinstance(message, str):
+                if lines and len("\n".join(lines + [message])) > MAX_CONTENT_LENGTH:
+                    packed.append(("\n".join(lines), embeds, items))
+                    lines, embeds, items = [], [], []
+                lines.append(message)
+            else:
+                if len(embeds) == MAX_EMBEDS_PER_MESSAGE:
+                    packed.append(("\n".join(lines) or None, embeds, items))
+                    lines, embeds, items = [], [], []
+                embeds.append(message)
+            items.append(item)
+
+        if lines or embeds:
+            packed.append(("\n".join(lines) or None, embeds, items))
+        return packed
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Player Presence
+One shared reading of the server's `list` command: who is online, how many, and
+who joined or left since the previous reading. Callers get the cached reading
+while it is younger than PRESENCE_TTL, so rewards, winner records and health
+checks no longer each send their own `list`.
+
+The event handler refreshes it on a schedule; in the web app the health
+monitor's RCON probe is the refresh.
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from rcon_pool import get_pool, RCON_TIMEOUT
+
+# ====== CONFIG ======
+load_dotenv()
+PRESENCE_TTL = float(os.getenv("PRESENCE_TTL", 30))  # seconds a `list` reading is trusted
+
+# "There are 2 of a max of 20 players online: Alice, Bob"
+LIST_PATTERN = re.compile(r"There are (\d+) of a max(?: of)? (\d+) players online:?\s*(.*)$", re.DOTALL)
+
+
+class presence_snapshot():
+    """One parsed `list` reply"""
+
+    __slots__ = ("players", "count", "max_players", "result", "checked_at", "taken", "joined", "left")
+
+    def __init__(self, players, count, max_players, result, previous=None):
+        self.players = players          # frozenset of online player names
+        self.count = count
+        self.max_players = max_players
+        self.result = result            # the raw reply
+        self.checked_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.taken = time.monotonic()
+        # Diffs against the previous reading; nothing on the first one
+        self.joined = players - previous.players if previous else frozenset()
+        self.left = previous.players - players if previous else frozenset()
+
+
+def parse_list(result):
+    """(players, count, max_players) from a `list` reply - count is None if it can't be parsed"""
+    match = LIST_PATTERN.search(result or "")
+    if not match:
+        return frozenset(), None, None
+    names = [name.strip() for name in match.group(3).split(",")]
+    return frozenset(name for name in names if name), int(match.group(1)), int(match.group(2))
+
+
+class presence_service():
+
+    def __init__(self, ttl=PRESENCE_TTL):
+        self.ttl = ttl
+        self.current = None
+        # Held across the poll, so concurrent callers share one `list` instead of racing
+        self.lock = threading.Lock()
+
+
+    def get(self, max_age=None, timeout=RCON_TIMEOUT):
+        """The latest reading, polling the server only if it's older than max_age (default: the TTL)"""
+        max_age = self.ttl if max_age is None else max_age
+        with self.lock:
+            if self.current is not None and time.monotonic() - self.current.taken <= max_age:
+                return self.current
+            return self._poll(timeout)
+
+
+    def refresh(self, timeout=RCON_TIMEOUT):
+        """Poll now regardless of age - raises if the server can't be reached, like get()"""
+        with self.lock:
+            return self._poll(timeout)
+
+
+    def _poll(self, timeout):
+        result = get_pool(timeout=timeout).run(["list"])[0]
+        # An unrecognised reply reads as nobody online; max_players stays None to flag it
+        players, count, max_players = parse_list(result)
+        self.current = presence_snapshot(players, count or 0, max_players, (result or "").strip(), self.current)
+        return self.current
+
+
+presence = presence_service()
@@ -1,28 +1,32 @@
 #!/usr/bin/env python3
-import json
-import time
+import asyncio
 import sys
 import os
-from mcrcon import MCRcon # type: ignore
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
 import re
 import sql_calendar
+from rcon_pool import get_pool, close_all
+from event_registry import get_registry
+from event_plan import (
+    BELL_SOUND, BELL_RINGS, WITHER_SOUND, FIREWORK_PARTICLES, FIREWORK_SOUNDS, FIREWORK_BURSTS,
+    CEREMONY_MUSIC, STOP_MUSIC, SIDEBAR_CLEAR
+)
+from event_timeline import timeline
+from score_snapshots import poller as score_poller
+from presence_service import presence
 
 # LOAD CONFIG
 load_dotenv()
 rcon_host = os.getenv("RCON_HOST")
-rcon_port = int(os.getenv("RCON_PORT"))
+rcon_port = int(os.getenv("RCON_PORT", 25575))
 rcon_pass = os.getenv("RCON_PASS")
 events_path = os.getenv("EVENTS_JSON_PATH")
 
-def load_json(event_file):
-    with open(event_file, "r") as f:
-        event_data = json.load(f)
-    return event_data
-
-def escape_mc_string(text):
-    return text.replace("\\", "\\\\").replace('"', '\\"')
+# Ceremony pacing, in seconds
+BELL_INTERVAL = 0.25
+FIREWORK_INTERVAL = 0.3
+COUNTDOWN_INTERVAL = 1
 
 def log_to_sql(message, level="INFO"):
     """Log to SQLite database with proper UTC timestamp format"""
@@ -32,18 +36,19 @@ def log_to_sql(message, level="INFO"):
     except Exception as e:
         print(f"SQL logging failed: {e} - Message: {message}")
 
-def mcrcon_wrapper(cmds):
-    """Execute RCON commands with error handling and logging"""
+def mcrcon_wrapper(cmds, log_commands=True):
+    """
+    Execute RCON commands with error handling and logging. log_commands=False skips the
+    per-command log line for bulk reads like score polls; failures are always logged.
+    """
     if isinstance(cmds, str):
         cmds = [cmds]
 
-    cmd_results = []
-
     try:
-        with MCRcon(rcon_host, rcon_pass, port=rcon_port) as mcr:
+        # Shared pooled session - no new TCP connection or login per call
+        cmd_results = get_pool(rcon_host, rcon_port, rcon_pass).run(cmds)
+        if log_commands:
             for cmd in cmds:
-                result = mcr.command(cmd)
-                cmd_results.append(result)
                 log_to_sql(f"RCON command executed: {cmd}")
         return cmd_results
     except Exception as e:
@@ -53,8 +58,28 @@ def mcrcon_wrapper(cmds):
             log_to_sql(f"Failed RCON command: {cmd}", "ERROR")
         return []
 
+def get_online_players(max_age=None):
+    """
+    Online players from the shared presence reading, which only asks the server when
+    it is older than max_age seconds (default PRESENCE_TTL) - None if the server
+    couldn't be asked. Pass max_age=0 for decisions that must see who is online now.
+    """
+    try:
+        snapshot = presence.get(max_age=max_age)
+    except Exception as e:
+        log_to_sql(f"Could not get online players list: {e}", "ERROR")
+        return None
+
+    if snapshot.max_players is None:
+        log_to_sql(f"Could not parse online players list: {snapshot.result}", "WARN")
+    log_to_sql(f"Online players as of {snapshot.checked_at}: {sorted(snapshot.players)}")
+    return snapshot.players
+
 def get_players():
-    """Get list of tracked players from scoreboard"""
+    """
+    Get list of tracked players from scoreboard. This is not the online list: it also
+    holds players who scored and logged off, so it can't come from presence.
+    """
     player_list_cmd = "scoreboard players list"
     results = mcrcon_wrapper(player_list_cmd)
     
@@ -73,65 +98,77 @@ def get_players():
         log_to_sql("Could not parse tracked players from scoreboard", "WARN")
         return []
 
-def start_event(event_data):
+async def start_event(plan):
     """Start an event with announcements and setup commands"""
-    log_to_sql(f"Starting event: {event_data.get('name', 'Unknown')}")
-
-    # Event start announcement
-    event_start_text = f"The {event_data['name']} event is starting"
-    json_start_text = {"text": event_start_text, "color": "gold"}
-    display_title_text = f"tellraw @a {json.dumps(json_start_text)}"
-
-    # Event description
-    event_description_text = f"{event_data['description']}"
-    json_desc_text = {"text": event_description_text, "color": "aqua"}
-    display_description_text = f"tellraw @a {json.dumps(json_desc_text)}"
-
-    # Display start text
-    result_start_text = mcrcon_wrapper(display_title_text)
-    log_to_sql(f"Event start announcement sent with result: {result_start_text}")
-
-    # Play event start bells
-    bells_command = 'execute as @a at @s run playsound minecraft:block.bell.use master @s ~ ~ ~ 100'
-    for i in range(9):
-        bell_result = mcrcon_wrapper(bells_command)
-        log_to_sql(f"Bell sound {i+1}/9 played")
-        time.sleep(0.25)
-
-    # Display description
-    result_description = mcrcon_wrapper(display_description_text)
-    log_to_sql(f"Event description displayed with result: {result_description}")
-
-    # Play wither death sound
-    wither_sound_cmd = 'execute as @a at @s run playsound minecraft:entity.wither.death master @s ~ ~ ~ 100'
-    wither_result = mcrcon_wrapper(wither_sound_cmd)
-    log_to_sql(f"Wither sound played with result: {wither_result}")
-
-    # Execute setup commands
-    try:
-        setup_commands = event_data["commands"]["setup"]
-        for cmd in setup_commands:
-            cmd_result = mcrcon_wrapper(cmd)
-            log_to_sql(f"Setup command executed: {cmd} - Result: {cmd_result}")
-    except KeyError:
+    log_to_sql(f"Starting event: {plan.name}")
+
+    # Announcement, bells, then description, wither sound and setup together
+    ceremony = timeline()
+    ceremony.at(0, plan.start_announcement, "start")
+    for i in range(BELL_RINGS):
+        ceremony.at(i * BELL_INTERVAL, BELL_SOUND)
+    after_bells = BELL_RINGS * BELL_INTERVAL
+    ceremony.at(after_bells, plan.description_announcement, "description")
+    ceremony.at(after_bells, WITHER_SOUND, "wither")
+    ceremony.at(after_bells, plan.setup_commands, "setup")
+
+    if not plan.setup_commands:
         log_to_sql("No setup commands found in event JSON", "WARN")
-    except Exception as e:
-        log_to_sql(f"Error executing setup commands: {e}", "ERROR")
+
+    results = await ceremony.play(mcrcon_wrapper)
+    log_to_sql(f"Event start announcement sent with result: {results.get('start')}")
+    log_to_sql(f"{BELL_RINGS} bell sounds played")
+    log_to_sql(f"Event description displayed with result: {results.get('description')}")
+    log_to_sql(f"Wither sound played with result: {results.get('wither')}")
+    for cmd, cmd_result in results.get("setup", []):
+        log_to_sql(f"Setup command executed: {cmd} - Result: {cmd_result}")
 
     log_to_sql("Event setup completed successfully")
     print("✅ Event Setup Completed")
 
-def aggregate_scores(event_data):
-    """Aggregate player scores for events that require it"""
+def compile_selector_aggregation(agg_obj, objectives):
+    """Build the aggregation as a fixed set of selector commands, independent of player count"""
+    # `*` pairs every target with every source, so per-entity sums have to run through `execute as`
+    agg_cmds = [f"execute as @a run scoreboard players set @s {agg_obj} 0"]
+    for objective in objectives:
+        agg_cmds.append(f"execute as @a run scoreboard players operation @s {agg_obj} += @s {objective}")
+    return agg_cmds
+
+def aggregate_scores_per_player(agg_obj, objectives):
+    """Aggregate every tracked entity one by one - also covers players who have logged off"""
     player_list = get_players()
-    
+
     if not player_list:
         log_to_sql("No tracked players found for score aggregation", "WARN")
         print("No tracked players. Nothing to aggregate.")
-        return
+        return False
 
     log_to_sql(f"Aggregating scores for players: {player_list}")
 
+    agg_cmds = []
+    for player in player_list:
+        # Reset aggregate score to zero
+        agg_cmds.append(f"scoreboard players set {player} {agg_obj} 0")
+
+        # Aggregate each objective
+        for objective in objectives:
+            agg_cmds.append(f"scoreboard players operation {player} {agg_obj} += {player} {objective}")
+
+    # One batch over one pooled session - but lock-step by default (see RCON_PIPELINE), so
+    # it still costs a round trip per command, 1 + len(objectives) per player
+    agg_results = mcrcon_wrapper(agg_cmds)
+    log_to_sql(f"Aggregated {objectives} into {agg_obj} for {len(player_list)} players ({len(agg_results)}/{len(agg_cmds)} commands answered)")
+    return bool(agg_results)
+
+def aggregate_scores(event_data, exact=False):
+    """
+    Aggregate player scores for events that require it.
+
+    By default this runs the selector form, which only reaches online players: anyone
+    offline keeps the total from their last aggregation, which is fine for a running
+    leaderboard. Pass exact=True (final results) or set "aggregate_mode": "per_player"
+    in the event JSON to walk every tracked entity instead.
+    """
     try:
         agg_obj = event_data["aggregate_objective"]
         objectives = event_data["commands"]["aggregate"]
@@ -144,174 +181,227 @@ def aggregate_scores(event_data):
         log_to_sql("Event does not require score aggregation")
         return
 
-    for player in player_list:
-        # Reset aggregate score to zero
-        reset_cmd = f"scoreboard players set {player} {agg_obj} 0"
-        reset_result = mcrcon_wrapper(reset_cmd)
-        log_to_sql(f"Reset {agg_obj} to 0 for {player}: {reset_result}")
+    mode = "per_player" if exact else event_data.get("aggregate_mode", "selector")
 
-        # Aggregate each objective
-        for objective in objectives:
-            agg_cmd = f"scoreboard players operation {player} {agg_obj} += {player} {objective}"
-            agg_result = mcrcon_wrapper(agg_cmd)
-            log_to_sql(f"Aggregated {objective} into {agg_obj} for {player}: {agg_result}")
+    if mode == "selector":
+        agg_cmds = compile_selector_aggregation(agg_obj, objectives)
+        agg_results = mcrcon_wrapper(agg_cmds)
+        if agg_results:
+            log_to_sql(f"Aggregated {objectives} into {agg_obj} for online players with {len(agg_cmds)} selector commands")
+        else:
+            log_to_sql("Selector aggregation failed, falling back to per-player aggregation", "WARN")
+            mode = "per_player"
+
+    if mode == "per_player" and not aggregate_scores_per_player(agg_obj, objectives):
+        return
 
     log_to_sql("Score aggregation completed")
     print("✅ Calculated Aggregate Scores")
 
-def find_leaders(event_data, silent=False):
-    """Find the leading players and optionally announce them"""
-    player_list = get_players()
-    
+def get_scores(objective, player_list=None):
+    """
+    Snapshot every tracked player's score for an objective as {player: score}.
+
+    Vanilla has no command that reads one objective for every entity, so this costs
+    one `scoreboard players get` per tracked player on top of the player list.
+    """
+    if player_list is None:
+        player_list = get_players()
+
     if not player_list:
-        log_to_sql("No players to check for leaders", "WARN")
-        return [], 0
+        return {}
 
-    try:
-        main_obj = event_data["aggregate_objective"]
-    except KeyError:
-        log_to_sql("Missing aggregate_objective in event data", "ERROR")
+    # One batch over one pooled session, but a round trip per player unless RCON_PIPELINE is on
+    score_cmds = [f"scoreboard players get {player} {objective}" for player in player_list]
+    score_results = mcrcon_wrapper(score_cmds, log_commands=False)
+
+    scores = {}
+    unparsed = []
+    for player, score_result in zip(player_list, score_results):
+        match = re.search(r"has (-?\d+)", score_result)
+        if match:
+            scores[player] = int(match.group(1))
+        else:
+            # Players with no score set for this objective are simply left out
+            unparsed.append(player)
+
+    log_to_sql(f"Read {len(scores)} scores for {objective}")
+    if unparsed:
+        log_to_sql(f"No score for {objective} from: {unparsed}")
+
+    return scores
+
+def select_leaders(scores):
+    """Pick the top scorers from a {player: score} map"""
+    if not scores:
         return [], 0
 
-    leaders = []
-    leading_score = 0
+    leading_score = max(scores.values())
+    leaders = [player for player, score in scores.items() if score == leading_score]
+    return leaders, leading_score
 
+def track_scores(unique_event_name, scores, plan, final=False):
+    """
+    Record a score reading in the event's history and return what changed since the
+    previous one as score_changes - None if it couldn't be recorded
+    """
+    try:
+        event_id = sql_calendar.get_event_id_by_unique_name(unique_event_name)
+        if not event_id:
+            log_to_sql(f"Could not find event ID for: {unique_event_name}", "ERROR")
+            return None
+        changes = score_poller.poll(event_id, scores, plan.thresholds)
+        if final:
+            score_poller.forget(event_id)
+    except Exception as e:
+        log_to_sql(f"Error recording score snapshot: {e}", "ERROR")
+        return None
+
+    # Only the movement is logged, not every player's reading
+    if changes.changed:
+        log_to_sql(f"Score changes for {unique_event_name}: {changes.changed}")
+    return changes
+
+def find_leaders(plan, silent=False, unique_event_name=None, final=False):
+    """
+    Find the leading players and optionally announce them.
+
+    With a unique_event_name the reading is tracked against the previous one: it is
+    added to the event's score history and announcements are limited to what changed
+    (a new leader or tie, a player passing one of the event's announce_thresholds).
+    Without one every call announces the current leaders.
+    """
+    main_obj = plan.aggregate_objective
     log_to_sql(f"Checking scores for objective: {main_obj}")
 
-    for player in player_list:
-        score_cmd = f"scoreboard players get {player} {main_obj}"
-        score_result = mcrcon_wrapper(score_cmd)
-        log_to_sql(f"Score check for {player}: {score_result}")
+    scores = get_scores(main_obj)
+    # An empty reading is tracked too - the cadence backs off when there is nobody to score
+    changes = track_scores(unique_event_name, scores, plan, final) if unique_event_name else None
+    if final and not scores:
+        # Winners are only ever declared from the final reading itself, never from earlier ones
+        log_to_sql("Could not read final scores - no winners declared", "ERROR")
+        return [], 0
+    if changes is not None:
+        # The same merged map the poller judged "leaders changed" on - players missing
+        # from this reading keep their last recorded score
+        leaders, leading_score = changes.leaders, changes.leading_score
+    else:
+        leaders, leading_score = select_leaders(scores)
 
-        if not score_result:
-            continue
+    if not scores and not leaders:
+        log_to_sql("No players to check for leaders", "WARN")
+        return [], 0
 
-        # Parse score from result
-        match = re.search(r"has (\d+)", score_result[0])
-        if match:
-            score = int(match.group(1))
-            
-            if not leaders or score > leading_score:
-                leaders = [player]
-                leading_score = score
-            elif score == leading_score:
-                leaders.append(player)
-        else:
-            log_to_sql(f"Could not parse score for {player} from: {score_result[0]}", "WARN")
+    announcements = []
+    if changes and not silent:
+        announcements += [plan.threshold_message(player, threshold) for player, threshold in changes.crossed]
 
     # FIXED: Check if top score is 0 (nobody participated)
     if leading_score == 0:
         log_to_sql("Top score is 0 - no participation in event")
-        if not silent:
-            message = f"No one participated in the {event_data['name']} event."
-            announcement = {"text": message, "color": "red"}
-            announce_cmd = f"tellraw @a {json.dumps(announcement)}"
-            announce_result = mcrcon_wrapper(announce_cmd)
-            log_to_sql(f"No participation announcement sent: {announce_result}")
+        if not silent and (changes is None or changes.first):
+            announcements.append(plan.no_participation_announcement)
+        if announcements:
+            announce_results = mcrcon_wrapper(announcements)
+            log_to_sql(f"No participation announcement sent: {announce_results}")
         return [], 0
 
     # Format leader announcement for actual scores
     if leaders:
         leader_names = ", ".join(leaders)
-        log_to_sql(f"Current leaders: {leader_names} with score {leading_score}")
-
-        if not silent:
-            if len(leaders) == 1:
-                message = f"{leader_names} is leading the {event_data['name']} event with {leading_score} {event_data.get('score_text', 'points')}!"
-            else:
-                message = f"{leader_names} are tied for first in the {event_data['name']} event with {leading_score} {event_data.get('score_text', 'points')}!"
-
-            announcement = {"text": message, "color": "gold"}
-            announce_cmd = f"tellraw @a {json.dumps(announcement)}"
-            announce_result = mcrcon_wrapper(announce_cmd)
-            log_to_sql(f"Leader announcement sent: {announce_result}")
+        if changes is None or changes.leaders_changed:
+            log_to_sql(f"Current leaders: {leader_names} with score {leading_score}")
+            if not silent:
+                announcements.append(plan.leaders_message(leaders, leading_score))
     else:
         log_to_sql("No leaders found")
 
+    if announcements:
+        announce_results = mcrcon_wrapper(announcements)
+        log_to_sql(f"Score announcements sent: {announce_results}")
+
     print("✅ Leaders determined!")
     return leaders, leading_score
 
-def display_scoreboard(event_data, unique_event_name=None):
-    """Display the event scoreboard for a specified duration"""
-    try:
-        tracked_obj = event_data["aggregate_objective"]
-        display_name = event_data["sidebar"]["displayName"]
-        duration = event_data["sidebar"]["duration"]
-        bold = event_data["sidebar"]["bold"]
-        color = event_data["sidebar"]["color"]
-    except KeyError as e:
-        log_to_sql(f"Missing scoreboard configuration: {e}", "ERROR")
-        return
-
-    log_to_sql(f"Displaying scoreboard for {duration} seconds")
-
-    # Set up scoreboard display
-    display_cmd = f'scoreboard objectives setdisplay sidebar {tracked_obj}'
-    display_result = mcrcon_wrapper(display_cmd)
-    log_to_sql(f"Scoreboard display set: {display_result}")
+def add_sidebar(ceremony, plan, offset=0):
+    """Show the sidebar at `offset` and clear it after the event's duration - returns when it clears"""
+    cleared = offset + plan.sidebar_duration
+    ceremony.at(offset, plan.sidebar_commands, "sidebar")
+    ceremony.at(cleared, SIDEBAR_CLEAR, "sidebar_clear")
+    return cleared
 
-    # Format scoreboard title
-    title_format = {
-        "text": str(display_name),
-        "color": str(color),
-        "bold": bool(bold)
-    }
-    
-    modify_cmd = f"scoreboard objectives modify {tracked_obj} displayname {json.dumps(title_format)}"
-    modify_result = mcrcon_wrapper(modify_cmd)
-    log_to_sql(f"Scoreboard title modified: {modify_result}")
-
-    # Display for specified duration
-    time.sleep(duration)
+async def display_scoreboard(plan, unique_event_name=None):
+    """Display the event scoreboard for a specified duration"""
+    log_to_sql(f"Displaying scoreboard for {plan.sidebar_duration} seconds")
 
-    # Clear scoreboard
-    clear_cmd = "scoreboard objectives setdisplay sidebar"
-    clear_result = mcrcon_wrapper(clear_cmd)
-    log_to_sql(f"Scoreboard cleared: {clear_result}")
+    ceremony = timeline()
+    add_sidebar(ceremony, plan)
+    results = await ceremony.play(mcrcon_wrapper)
+    log_to_sql(f"Scoreboard display set and title modified: {results.get('sidebar')}")
+    log_to_sql(f"Scoreboard cleared: {results.get('sidebar_clear')}")
 
     # Update the scoreboard display time in database
     if unique_event_name:
-        update_scoreboard_display_time(unique_event_name)
+        await asyncio.to_thread(update_scoreboard_display_time, unique_event_name, plan)
 
     log_to_sql("Scoreboard display completed")
     print("✅ Scoreboard was displayed")
 
-def cleanup_objs(event_data):
+def cleanup_objs(plan):
     """Clean up scoreboard objectives after event"""
-    try:
-        cleanup_objectives = event_data["commands"]["cleanup"]
-    except KeyError:
+    if not plan.cleanup_objectives:
         log_to_sql("No cleanup objectives specified", "WARN")
         return
 
-    log_to_sql(f"Cleaning up objectives: {cleanup_objectives}")
+    log_to_sql(f"Cleaning up objectives: {list(plan.cleanup_objectives)}")
 
-    for objective in cleanup_objectives:
-        cleanup_cmd = f'scoreboard objectives remove {objective}'
-        cleanup_result = mcrcon_wrapper(cleanup_cmd)
+    cleanup_results = mcrcon_wrapper(list(plan.cleanup_commands))
+    for objective, cleanup_result in zip(plan.cleanup_objectives, cleanup_results):
         log_to_sql(f"Cleaned up objective {objective}: {cleanup_result}")
 
     log_to_sql("Event cleanup completed")
     print("✅ Event has been cleaned up!")
 
-def update_scoreboard_display_time(unique_event_name):
-    """Update the last scoreboard display time with proper UTC format"""
+def parse_utc(timestamp):
+    return datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+def update_scoreboard_display_time(unique_event_name, plan=None):
+    """Update the last scoreboard display time with proper UTC format, and schedule the next display from the plan's cadence"""
     try:
         event_id = sql_calendar.get_event_id_by_unique_name(unique_event_name)
         if not event_id:
             log_to_sql(f"Could not find event ID for: {unique_event_name}", "ERROR")
             return False
             
-        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-        sql_calendar.update_scoreboard_time(event_id, timestamp)
-        log_to_sql(f"Updated scoreboard display time for event {event_id} ({unique_event_name}) to {timestamp}")
+        now = datetime.now(timezone.utc)
+        timestamp = now.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        next_time = None
+        if plan is not None:
+            previous_delay = seconds_left = None
+            schedule = sql_calendar.get_scoreboard_schedule(event_id)
+            if schedule:
+                last_time, previous_next_time, end_time = schedule
+                if last_time and previous_next_time:
+                    previous_delay = (parse_utc(previous_next_time) - parse_utc(last_time)).total_seconds()
+                if end_time:
+                    seconds_left = (parse_utc(end_time) - now).total_seconds()
+
+            delay = plan.next_scoreboard_delay(previous_delay, score_poller.latest_changes(event_id), seconds_left)
+            next_time = (now + timedelta(seconds=delay)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        sql_calendar.update_scoreboard_time(event_id, timestamp, next_time)
+        log_to_sql(f"Updated scoreboard display time for event {event_id} ({unique_event_name}) to {timestamp}, next display at {next_time or 'the default interval'}")
         return True
     except Exception as e:
         log_to_sql(f"Error updating scoreboard time: {e}", "ERROR")
         return False
 
-def save_winners_to_sql(event_data, leaders, final_score):
-    """Save event winners directly to SQLite database"""
+def save_winners_to_sql(event_data, leaders, final_score, online_players=None):
+    """
+    Save event winners directly to SQLite database. online_players is the reading the
+    rewards were given from - asked for fresh if not passed
+    """
     try:
         unique_name = event_data.get('unique_event_name')
         if not unique_name:
@@ -330,14 +420,9 @@ def save_winners_to_sql(event_data, leaders, final_score):
             return
 
         # Get online players to determine who was online
-        online_cmd = "list"
-        online_result = mcrcon_wrapper(online_cmd)
-        online_players = []
-        
-        if online_result:
-            online_match = re.search(r"online:\s*(.+)$", online_result[0])
-            if online_match:
-                online_players = [p.strip() for p in online_match.group(1).split(",")]
+        if online_players is None:
+            online_players = get_online_players(max_age=0)
+        online_players = online_players or frozenset()
 
         # Save each winner
         for winner in leaders:
@@ -351,68 +436,36 @@ def save_winners_to_sql(event_data, leaders, final_score):
     except Exception as e:
         log_to_sql(f"Error saving winners to database: {e}", "ERROR")
 
-def give_reward_item(winners, event_data):
-    """Give reward items to online winners"""
+async def give_reward_item(winners, plan, online_players=None):
+    """Give reward items to online winners - online_players is asked for fresh if not passed"""
     if not winners:
         log_to_sql("No winners to reward")
         return
 
     # Get online players
-    online_cmd = "list"
-    online_result = mcrcon_wrapper(online_cmd)
-    
-    if not online_result:
-        log_to_sql("Could not get online players list", "ERROR")
+    if online_players is None:
+        online_players = await asyncio.to_thread(get_online_players, 0)
+    if online_players is None:
         return
 
-    log_to_sql(f"Online players query result: {online_result}")
-
-    # Parse online players
-    online_match = re.search(r"online:\s*(.+)$", online_result[0])
-    if online_match:
-        online_players = [p.strip() for p in online_match.group(1).split(",")]
-    else:
-        log_to_sql("Could not parse online players list", "WARN")
-        online_players = []
-
     online_winners = [player for player in winners if player in online_players]
     offline_winners = [player for player in winners if player not in online_players]
 
     log_to_sql(f"Online winners: {online_winners}, Offline winners: {offline_winners}")
 
+    # Every winner's countdown runs on the same clock, so a tie doesn't lengthen the ceremony
+    ceremony = timeline()
     for winner in online_winners:
-        try:
-            # Winner notification sequence
-            notifications = [
-                f'tellraw {winner} "You have won the {event_data["name"]} event!"',
-                f'tellraw {winner} "You will be receiving your prize in..."',
-                f'tellraw {winner} "3!"',
-                f'tellraw {winner} "2!"',
-                f'tellraw {winner} "1!"'
-            ]
-            
-            for notif in notifications:
-                mcrcon_wrapper(notif)
-                time.sleep(1)
-
-            # Give reward item
-            reward_cmd = f'give {winner} {event_data["reward_cmd"]}'
-            reward_cmd = reward_cmd.replace("'", '"')
-            reward_result = mcrcon_wrapper(reward_cmd)
-            log_to_sql(f"Gave reward to {winner}: {reward_result}")
-
-            # Item received notification
-            item_msg = f"You have been given the legendary {event_data['reward_name']}!"
-            item_json = {"text": item_msg, "color": "light_purple"}
-            item_cmd = f'tellraw {winner} {json.dumps(item_json)}'
-            mcrcon_wrapper(item_cmd)
-
-            log_to_sql(f"Reward sequence completed for {winner}")
-
-        except KeyError as e:
-            log_to_sql(f"Missing reward configuration: {e}", "ERROR")
-        except Exception as e:
-            log_to_sql(f"Error rewarding {winner}: {e}", "ERROR")
+        notifications, reward_cmd, item_cmd = plan.reward_commands(winner)
+        for i, notif in enumerate(notifications):
+            ceremony.at(i * COUNTDOWN_INTERVAL, notif)
+        countdown_end = len(notifications) * COUNTDOWN_INTERVAL
+        ceremony.at(countdown_end, reward_cmd, winner)
+        ceremony.at(countdown_end, item_cmd)
+
+    results = await ceremony.play(mcrcon_wrapper)
+    for winner in online_winners:
+        log_to_sql(f"Gave reward to {winner}: {results.get(winner)}")
 
     if offline_winners:
         log_to_sql(f"Offline winners need manual reward: {offline_winners}", "WARN")
@@ -420,73 +473,84 @@ def give_reward_item(winners, event_data):
     log_to_sql("Reward distribution completed")
     print("✅ Distributed rewards to online winners!")
 
-def closing_ceremony(event_data):
-    """Execute closing ceremony with effects and winner announcements"""
+async def closing_ceremony(event_data, plan, on_results=None):
+    """
+    Execute closing ceremony with effects and winner announcements.
+    on_results(leaders, final_score) is called as soon as the winners are known,
+    before anything is played.
+    """
     log_to_sql("Starting closing ceremony")
 
     # Find winners silently
-    leaders, final_score = find_leaders(event_data, silent=True)
+    leaders, final_score = await asyncio.to_thread(
+        find_leaders, plan, True, event_data.get("unique_event_name"), True
+    )
+    won = bool(leaders) and final_score > 0
 
-    # Event end announcement
-    end_text = f"The {event_data['name']} event has ended!"
-    end_json = {"text": end_text, "color": "gold"}
-    end_cmd = f"tellraw @a {json.dumps(end_json)}"
-    mcrcon_wrapper(end_cmd)
+    if on_results:
+        try:
+            on_results(leaders if won else [], final_score if won else 0)
+        except Exception as e:
+            log_to_sql(f"Error handing off event results: {e}", "ERROR")
 
-    # Fireworks display
-    firework_particles = 'execute as @a at @s run particle minecraft:firework ~ ~ ~ 1 1 1 0.2 100 force'
-    firework_sounds = 'execute as @a at @s run playsound minecraft:entity.firework_rocket.twinkle master @s ~ ~ ~ 100'
+    ceremony = timeline()
 
-    log_to_sql("Playing fireworks display")
-    for i in range(5):
-        mcrcon_wrapper([firework_particles, firework_sounds])
-        time.sleep(0.3)
+    # Event end announcement and fireworks display
+    ceremony.at(0, plan.end_announcement)
+    for i in range(FIREWORK_BURSTS):
+        ceremony.at(i * FIREWORK_INTERVAL, [FIREWORK_PARTICLES, FIREWORK_SOUNDS])
+    after_fireworks = FIREWORK_BURSTS * FIREWORK_INTERVAL
 
     # FIXED: Handle different winner scenarios
-    if not leaders or final_score == 0:
-        # Nobody participated
-        no_winner_text = "Unfortunately, nobody participated in this event!"
-        no_winner_json = {"text": no_winner_text, "color": "red"}
-        no_winner_cmd = f"tellraw @a {json.dumps(no_winner_json)}"
-        mcrcon_wrapper(no_winner_cmd)
-        log_to_sql("No participation announcement sent")
+    if won:
+        winner_cmd = plan.winners_message(leaders, final_score)
+        ceremony.at(after_fireworks, winner_cmd)
+        log_to_sql(f"Winner announcement: {winner_cmd}")
     else:
-        # We have winners with actual scores
-        winner_text = f"{', '.join(leaders)} won the event with {final_score} {event_data.get('score_text', 'points')}"
-        winner_json = {"text": winner_text, "color": "green"}
-        winner_cmd = f"tellraw @a {json.dumps(winner_json)}"
-        mcrcon_wrapper(winner_cmd)
-        log_to_sql(f"Winner announcement: {winner_text}")
-
-    # Ceremony music
-    music_cmd = 'execute as @a at @s run playsound minecraft:music_disc.lava_chicken master @s ~ ~ ~ 100'
-    mcrcon_wrapper(music_cmd)
-    log_to_sql("Started ceremony music")
-
-    # Display final scoreboard
-    display_scoreboard(event_data)
-    
-    # Stop music
-    stop_cmd = 'stopsound @a'
-    mcrcon_wrapper(stop_cmd)
+        # Nobody participated
+        ceremony.at(after_fireworks, plan.no_winner_announcement)
+        log_to_sql("No participation announcement queued")
+
+    # Ceremony music over the final scoreboard
+    ceremony.at(after_fireworks, CEREMONY_MUSIC)
+    music_end = add_sidebar(ceremony, plan, after_fireworks)
+    ceremony.at(music_end, STOP_MUSIC)
+
+    log_to_sql(f"Playing closing ceremony ({ceremony.duration()} seconds)")
+    await ceremony.play(mcrcon_wrapper)
     log_to_sql("Stopped ceremony music")
 
     # FIXED: Only distribute rewards if there are actual winners
-    if leaders and final_score > 0:
-        give_reward_item(leaders, event_data)
+    online_players = None
+    if won:
+        # One fresh `list` after the ceremony decides both who gets a reward and who
+        # is recorded as online - the cached reading can be PRESENCE_TTL old
+        online_players = await asyncio.to_thread(get_online_players, 0)
+        await give_reward_item(leaders, plan, online_players)
 
     # Save results to database
-    save_winners_to_sql(event_data, leaders, final_score)
+    await asyncio.to_thread(save_winners_to_sql, event_data, leaders, final_score, online_players)
 
     log_to_sql("Closing ceremony completed")
 
 def run_event(action, json_file, unique_name=None):
-    """Main event runner function"""
+    """Main event runner function - returns True if the action completed"""
+    return asyncio.run(run_event_async(action, json_file, unique_name))
+
+async def run_event_async(action, json_file, unique_name=None, on_results=None):
+    """
+    Run an action on the current event loop. Ceremonies are timelines on the loop;
+    blocking queries (aggregation, score lookups, database writes) go to worker threads.
+    For "clean", on_results(leaders, final_score) receives the winners once they are known.
+    """
     log_to_sql(f"Running event action: {action} with file: {json_file}")
     
     # Load event data
     try:
-        event_data = load_json(f'{events_path}{json_file}')
+        # Parsed, validated and compiled once, re-read only when the file changes
+        registry = get_registry(events_path)
+        event_data = registry.definition(json_file)
+        plan = registry.plan(json_file)
         log_to_sql(f"Loaded event data for: {event_data.get('name', 'Unknown')}")
         
         # Add unique_event_name to event_data if provided
@@ -498,46 +562,84 @@ def run_event(action, json_file, unique_name=None):
         error_msg = f"Failed to load event JSON {json_file}: {e}"
         log_to_sql(error_msg, "ERROR")
         print(f"❌ {error_msg}")
-        sys.exit(1)
-
-    # Get event ID for database operations
-    event_id = None
-    if unique_name:
-        event_id = sql_calendar.get_event_id_by_unique_name(unique_name)
+        return False
 
     # Execute requested action
     try:
         if action == "start":
-            start_event(event_data)
+            await start_event(plan)
         elif action == "display":
-            aggregate_scores(event_data)
-            find_leaders(event_data)
-            display_scoreboard(event_data, unique_event_name=unique_name)
+            await asyncio.to_thread(aggregate_scores, event_data)
+            await asyncio.to_thread(find_leaders, plan, False, unique_name)
+            await display_scoreboard(plan, unique_event_name=unique_name)
         elif action == "clean":
-            aggregate_scores(event_data)
-            closing_ceremony(event_data)
-            cleanup_objs(event_data)
+            await asyncio.to_thread(aggregate_scores, event_data, True)
+            await closing_ceremony(event_data, plan, on_results)
+            await asyncio.to_thread(cleanup_objs, plan)
         else:
             error_msg = f"Unknown action: {action}"
             log_to_sql(error_msg, "ERROR")
             print(f"❌ {error_msg}")
-            sys.exit(1)
+            return False
             
         log_to_sql(f"Event action '{action}' completed successfully")
+        return True
         
     except Exception as e:
         error_msg = f"Error during {action} action: {e}"
         log_to_sql(error_msg, "ERROR")
         print(f"❌ {error_msg}")
-        sys.exit(1)
+        return False
+
+# ====== IN-PROCESS ENGINE ======
+class event_engine():
+    """
+    Runs event actions inside a long-lived process (the event handler), so the RCON
+    pool and anything else loaded at import time survive between actions.
+
+    Actions run on the handler's event loop: ceremony waits are timeline sleeps on
+    the loop and only the blocking RCON/database calls borrow a worker thread.
+    """
+
+    async def start(self, json_file, unique_name=None):
+        return await run_event_async("start", json_file, unique_name)
+
+    async def display(self, json_file, unique_name=None):
+        return await run_event_async("display", json_file, unique_name)
+
+    async def clean(self, json_file, unique_name=None, on_results=None):
+        return await run_event_async("clean", json_file, unique_name, on_results)
+
+    def close(self):
+        close_all()
+
+# ====== DRY RUN ======
+DRY_RUN_LEADERS = ("Steve", "Alex")
+DRY_RUN_SCORE = 10
+
+def dry_run(json_file, other_json_file=None):
+    """Print every command an event would send, or the diff against another event file"""
+    registry = get_registry(events_path)
+    plan = registry.plan(json_file)
+    if other_json_file:
+        lines = plan.diff(registry.plan(other_json_file), DRY_RUN_LEADERS, DRY_RUN_SCORE)
+    else:
+        lines = plan.render_all(DRY_RUN_LEADERS, DRY_RUN_SCORE)
+    print("\n".join(lines))
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
         print("Usage: python rcon_event_framework.py <start|display|clean> <json-file> [unique_event_name]")
+        print("       python rcon_event_framework.py plan <json-file> [other-json-file]")
         sys.exit(1)
 
+    if sys.argv[1] == "plan":
+        # Nothing is sent to the server
+        dry_run(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+        sys.exit(0)
+
     action = sys.argv[1]
     json_file = sys.argv[2]
     unique_name = sys.argv[3] if len(sys.argv) > 3 else None
 
-    run_event(action, json_file, unique_name)
\ No newline at end of file
+    sys.exit(0 if run_event(action, json_file, unique_name) else 1)
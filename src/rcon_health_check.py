@@ -1,16 +1,17 @@
 #!/usr/bin/env python3
 """
 RCON Health Check Script
-Simple standalone script to test RCON connectivity without threading issues.
+Simple standalone script to test RCON connectivity. check_rcon_health() is also
+used in-process by health_monitor, where its `list` doubles as the presence refresh.
 """
 
 import sys
 import os
 import json
 from dotenv import load_dotenv
-from mcrcon import MCRcon
+from presence_service import presence
 
-def check_rcon_health():
+def check_rcon_health(timeout=10):
     """Check RCON connectivity and return status as JSON"""
     load_dotenv()
     
@@ -27,15 +28,16 @@ def check_rcon_health():
                 "error": "RCON configuration incomplete"
             }
         
-        # Test RCON connection
-        with MCRcon(rcon_host, rcon_pass, port=rcon_port) as mcr:
-            result = mcr.command("list")
+        # Test RCON connection - the reply also refreshes the shared player presence
+        snapshot = presence.refresh(timeout=timeout)
         
-        if result and len(result.strip()) > 0:
+        if snapshot.result:
             return {
                 "healthy": True,
                 "status": "connected",
-                "result": result.strip(),
+                "result": snapshot.result,
+                "player_count": snapshot.count,
+                "players": sorted(snapshot.players),
                 "message": "RCON connection successful"
             }
         else:
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+RCON Session Pool
+Keeps authenticated RCON connections open and shares them between callers,
+instead of paying a TCP connect + login handshake for every command.
+
+Speaks the RCON wire protocol directly (rather than through mcrcon) so that
+timeouts use socket timeouts and work from any thread, not just the main one.
+"""
+
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+# ====== CONFIG ======
+load_dotenv()
+POOL_SIZE = int(os.getenv("RCON_POOL_SIZE", 2))           # max concurrent sessions per server
+RCON_TIMEOUT = float(os.getenv("RCON_TIMEOUT", 10))       # seconds, socket and checkout timeout
+KEEPALIVE_INTERVAL = float(os.getenv("RCON_KEEPALIVE", 60))  # seconds idle before a session is re-validated
+# Vanilla servers read one packet per recv and drop the connection if a read holds more,
+# so batches go lock-step unless the server is known to accept several packets at once
+RCON_PIPELINE = os.getenv("RCON_PIPELINE", "false").lower() == "true"
+MAX_PIPELINE = 64  # commands written per round trip, keeps socket buffers from filling up both ways
+
+# ====== PROTOCOL ======
+PACKET_RESPONSE = 0
+PACKET_COMMAND = 2
+PACKET_LOGIN = 3
+MAX_REPLY_CHUNK = 4096  # servers split longer replies over several packets of this many bytes
+
+class rcon_error(Exception):
+    """Raised when an RCON session cannot be used"""
+
+class rcon_auth_error(rcon_error):
+    """Raised when the server rejects the RCON password"""
+
+class rcon_closed_error(rcon_error):
+    """Raised when the server closes the connection"""
+
+
+class rcon_connection():
+
+    def __init__(self, host, port, password, timeout=RCON_TIMEOUT, pipeline=RCON_PIPELINE):
+        self.host = host
+        self.port = int(port)
+        self.password = password
+        self.timeout = timeout
+        self.pipeline = pipeline
+        self.sock = None
+        self.next_id = 0
+        self.last_used = 0.0
+        self.reused = False  # checked out of the pool after sitting idle, rather than freshly connected
+
+
+    # Opens the TCP connection and authenticates
+    def connect(self):
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        try:
+            self._login()
+        except Exception:
+            self.close()
+            raise
+        self.last_used = time.monotonic()
+
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+
+
+    def is_alive(self):
+        """Cheap check that the server has not closed the socket while it sat idle"""
+        if self.sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            if not readable:
+                return True
+            # An idle session should have nothing to read; EOF or stray data both mean it is stale
+            return False
+        except (OSError, ValueError):
+            return False
+
+
+    def command(self, cmd):
+        """Send a single command and return the server's reply"""
+        return self.command_batch([cmd])[0]
+
+
+    def command_batch(self, cmds, results=None):
+        """
+        Run commands over this connection and return their replies in order.
+
+        Replies are appended to `results` as they complete, so a caller can tell which
+        commands ran if the connection drops mid-batch.
+        """
+        if results is None:
+            results = []
+
+        if self.pipeline:
+            for start in range(0, len(cmds), MAX_PIPELINE):
+                self._pipelined(cmds[start:start + MAX_PIPELINE], results)
+        else:
+            for cmd in cmds:
+                results.append(self._lock_step(cmd))
+
+        self.last_used = time.monotonic()
+        return results
+
+
+    def _lock_step(self, cmd):
+        """
+        Send one command and wait for its whole reply before anything else is written,
+        so the server never sees more than one packet per read.
+
+        A reply shorter than a full chunk is complete. A full chunk may have more
+        behind it, so an empty packet of an unknown type is sent as a terminator -
+        the server answers it only after the rest of the reply.
+        """
+        cmd_id = self._new_id()
+        self._send_packet(cmd_id, PACKET_COMMAND, cmd)
+
+        request_id, _, body = self._read_packet()
+        while request_id != cmd_id:
+            request_id, _, body = self._read_packet()
+        if len(body) < MAX_REPLY_CHUNK:
+            return self._decode(body)
+
+        terminator_id = self._new_id()
+        self._send_packet(terminator_id, PACKET_RESPONSE, "")
+        parts = [body]
+        while True:
+            request_id, _, body = self._read_packet()
+            if request_id == terminator_id:
+                return self._decode(b"".join(parts))
+            if request_id == cmd_id:
+                parts.append(body)
+
+
+    def _pipelined(self, chunk, results):
+        """
+        Write every packet back-to-back, then match replies by request id.
+
+        The server answers packets strictly in order, so an empty packet of an unknown type
+        sent after the batch acts as a terminator - once its reply arrives, every earlier
+        reply (including ones split over several packets) has been read in full.
+        """
+        cmd_ids = [self._new_id() for _ in chunk]
+        terminator_id = self._new_id()
+
+        packets = b"".join(self._encode_packet(cmd_id, PACKET_COMMAND, cmd) for cmd_id, cmd in zip(cmd_ids, chunk))
+        packets += self._encode_packet(terminator_id, PACKET_RESPONSE, "")
+        self.sock.sendall(packets)
+
+        replies = {cmd_id: [] for cmd_id in cmd_ids}
+        position = 0
+        try:
+            while True:
+                request_id, _, body = self._read_packet()
+                if request_id == terminator_id:
+                    break
+                if request_id not in replies:
+                    continue
+                replies[request_id].append(body)
+
+                # A reply for a later command means every earlier one is complete
+                while cmd_ids[position] != request_id:
+                    results.append(self._decode(b"".join(replies[cmd_ids[position]])))
+                    position += 1
+        except (OSError, rcon_error):
+            # Anything that got even part of a reply already ran on the server
+            results.extend(self._decode(b"".join(replies[cmd_id])) for cmd_id in cmd_ids[position:] if replies[cmd_id])
+            raise
+
+        results.extend(self._decode(b"".join(replies[cmd_id])) for cmd_id in cmd_ids[position:])
+
+
+    def _login(self):
+        login_id = self._new_id()
+        self._send_packet(login_id, PACKET_LOGIN, self.password or "")
+        request_id, _, _ = self._read_packet()
+        if request_id == -1:
+            raise rcon_auth_error("RCON login failed: incorrect password")
+
+
+    def _new_id(self):
+        # Request ids must stay positive; -1 is reserved for auth failures
+        self.next_id = (self.next_id % 0x7FFFFFFE) + 1
+        return self.next_id
+
+
+    def _encode_packet(self, request_id, packet_type, body):
+        payload = struct.pack("<ii", request_id, packet_type) + body.encode("utf8") + b"\x00\x00"
+        return struct.pack("<i", len(payload)) + payload
+
+
+    def _send_packet(self, request_id, packet_type, body):
+        self.sock.sendall(self._encode_packet(request_id, packet_type, body))
+
+
+    def _read_exact(self, length):
+        data = b""
+        while len(data) < length:
+            chunk = self.sock.recv(length - len(data))
+            if not chunk:
+                raise rcon_closed_error("RCON connection closed by server")
+            data += chunk
+        return data
+
+
+    def _read_packet(self):
+        """(request_id, type, body) - the body stays bytes, a character can be split across packets"""
+        (length,) = struct.unpack("<i", self._read_exact(4))
+        payload = self._read_exact(length)
+        request_id, packet_type = struct.unpack("<ii", payload[:8])
+        return request_id, packet_type, payload[8:-2]
+
+
+    def _decode(self, body):
+        return body.decode("utf8", errors="replace")
+
+
+class rcon_pool():
+
+    def __init__(self, host, port, password, size=POOL_SIZE, timeout=RCON_TIMEOUT):
+        self.host = host
+        self.port = int(port)
+        self.password = password
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = []
+        self.lock = threading.Lock()
+
+
+    @contextmanager
+    def session(self):
+        """Check out an authenticated connection, capped at the pool size"""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise rcon_error("Timed out waiting for a free RCON session")
+
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except Exception:
+            # Never hand a connection in an unknown state back to the pool
+            if conn is not None:
+                conn.close()
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._checkin(conn)
+            self.slots.release()
+
+
+    def run(self, cmds):
+        """
+        Run commands as one batch over one session, reconnecting once if an idle session
+        turns out to have been dropped.
+
+        A command that was sent but got no reply may still have run, so the batch is
+        only retried when nothing can have reached the server: no connection was made,
+        or a reused session was already closed before its first reply. A timeout is
+        never retried - the server may just be lagging behind.
+        """
+        for attempt in (1, 2):
+            results = []
+            reused = None
+            try:
+                with self.session() as conn:
+                    reused = conn.reused
+                    conn.command_batch(cmds, results)
+                return results
+            except rcon_auth_error:
+                raise
+            except (OSError, rcon_error) as e:
+                if attempt == 2 or not self._nothing_sent(reused, results, e):
+                    raise
+
+        return results
+
+
+    def _nothing_sent(self, reused, results, error):
+        if reused is None:
+            # Failed while connecting, before any command was written
+            return True
+        stale = isinstance(error, (BrokenPipeError, ConnectionResetError, rcon_closed_error))
+        return reused and not results and stale
+
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+
+    def _checkout(self):
+        while True:
+            with self.lock:
+                conn = self.idle.pop() if self.idle else None
+
+            if conn is None:
+                conn = rcon_connection(self.host, self.port, self.password, self.timeout)
+                conn.connect()
+                return conn
+
+            # Re-validate sessions that have been idle long enough to be dropped by the server or a NAT
+            if time.monotonic() - conn.last_used < KEEPALIVE_INTERVAL or conn.is_alive():
+                conn.reused = True
+                return conn
+            conn.close()
+
+
+    def _checkin(self, conn):
+        with self.lock:
+            self.idle.append(conn)
+
+
+# ====== SHARED POOLS ======
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(host=None, port=None, password=None, timeout=RCON_TIMEOUT):
+    """
+    Get the shared pool for a server, defaulting to the RCON settings in .env.
+    Pools are keyed on the timeout too, so one caller's timeout never applies to another's.
+    """
+    host = host or os.getenv("RCON_HOST")
+    port = int(port or os.getenv("RCON_PORT", 25575))
+    password = password if password is not None else os.getenv("RCON_PASS")
+
+    key = (host, port, password, timeout)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = rcon_pool(host, port, password, timeout=timeout)
+            _pools[key] = pool
+        return pool
+
+def close_all():
+    """Close every idle pooled connection"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
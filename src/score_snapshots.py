@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Score Snapshots
+Every scoreboard pass already reads all players' scores; this keeps them as a
+per-event time series in score_snapshots instead of throwing them away. Rows are
+delta encoded against the previous snapshot, so a pass where nothing moved
+writes nothing.
+
+The poller builds on the same previous-scores map to tell the framework what
+actually changed - a new leader, a new tie, a player crossing a threshold - so
+only those get announced.
+"""
+
+import threading
+from datetime import datetime, timezone
+import sql_calendar
+
+
+class score_recorder():
+
+    def __init__(self):
+        self.last_scores = {}  # event_id -> {player: score} as last recorded
+        self.lock = threading.Lock()
+
+
+    def record(self, event_id, scores, taken_at=None):
+        """Store the players whose score changed since the last snapshot and return them as {player: score}"""
+        if taken_at is None:
+            taken_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        with self.lock:
+            previous = self._previous(event_id)
+            changed = {player: score for player, score in scores.items() if previous.get(player) != score}
+            if changed:
+                sql_calendar.insert_score_snapshot(event_id, taken_at, changed)
+
+            # Players missing from this pass (no score set) keep their last value
+            self.last_scores[event_id] = {**previous, **scores}
+            return changed
+
+
+    def previous(self, event_id):
+        """The last recorded {player: score} map for an event"""
+        with self.lock:
+            return dict(self._previous(event_id))
+
+
+    def forget(self, event_id):
+        """Drop the in-memory state for an event that has ended"""
+        with self.lock:
+            self.last_scores.pop(event_id, None)
+
+
+    def _previous(self, event_id):
+        previous = self.last_scores.get(event_id)
+        if previous is None:
+            # First pass since the handler started - continue from what's already stored
+            previous = sql_calendar.get_latest_scores(event_id)
+            self.last_scores[event_id] = previous
+        return previous
+
+
+def top_scorers(scores):
+    """(leaders, leading_score) for a {player: score} map, leaders sorted by name"""
+    leading_score = max(scores.values(), default=0)
+    # A top score of 0 means nobody has participated yet, so nobody leads
+    leaders = sorted(player for player, score in scores.items() if score == leading_score) if leading_score > 0 else []
+    return leaders, leading_score
+
+
+class score_changes():
+    """What one poll found compared to the poll before it"""
+
+    __slots__ = ("changed", "leaders", "leading_score", "first", "leaders_changed", "crossed")
+
+    def __init__(self, changed, leaders, leading_score, first, leaders_changed, crossed):
+        self.changed = changed                  # {player: score} for players whose score moved
+        self.leaders = leaders                  # from this reading merged over the previous one
+        self.leading_score = leading_score
+        self.first = first                      # no earlier reading for this event, polled or stored
+        self.leaders_changed = leaders_changed  # a new leader or a new tie
+        self.crossed = crossed                  # [(player, threshold)], highest threshold passed per player
+
+
+class score_poller():
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.leaders = {}  # event_id -> leaders as of the last poll
+        self.latest = {}   # event_id -> score_changes from the last poll
+        self.lock = threading.Lock()
+
+
+    def poll(self, event_id, scores, thresholds=()):
+        """Record a {player: score} reading and work out what changed since the last one"""
+        with self.lock:
+            previous = self.recorder.previous(event_id)
+            changed = self.recorder.record(event_id, scores)
+            current = {**previous, **scores}
+
+            leaders, leading_score = top_scorers(current)
+
+            if event_id not in self.leaders:
+                # First poll since the handler started - compare against the stored scores, so a
+                # restart doesn't announce the same leaders again
+                self.leaders[event_id] = top_scorers(previous)[0] if previous else None
+            first = self.leaders[event_id] is None
+            leaders_changed = first or leaders != self.leaders[event_id]
+            self.leaders[event_id] = leaders
+
+            crossed = []
+            for player, score in changed.items():
+                passed = [threshold for threshold in thresholds if previous.get(player, 0) < threshold <= score]
+                if passed:
+                    crossed.append((player, max(passed)))
+
+            changes = score_changes(changed, leaders, leading_score, first, leaders_changed, crossed)
+            self.latest[event_id] = changes
+            return changes
+
+
+    def latest_changes(self, event_id):
+        """What the last poll for an event found, or None if it hasn't been polled"""
+        with self.lock:
+            return self.latest.get(event_id)
+
+
+    def forget(self, event_id):
+        with self.lock:
+            self.leaders.pop(event_id, None)
+            self.latest.pop(event_id, None)
+        self.recorder.forget(event_id)
+
+
+def score_history(event_id):
+    """
+    {"series": {player: [[taken_at, score], ...]}, "standings": [{"player", "score"}, ...]}
+    Series only hold the points where a score changed; standings are best first.
+    """
+    series = {}
+    for taken_at, player, score in sql_calendar.get_score_history(event_id):
+        series.setdefault(player, []).append([taken_at, score])
+
+    standings = sorted(
+        ({"player": player, "score": points[-1][1]} for player, points in series.items()),
+        key=lambda standing: (-standing["score"], standing["player"])
+    )
+    return {"series": series, "standings": standings}
+
+
+recorder = score_recorder()
+poller = score_poller(recorder)
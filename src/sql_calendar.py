@@ -1,8 +1,11 @@
 #!/usr/bin/python3.12
 import os
+import socket
 from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
 from database_manager import db_manager
+from log_writer import get_writer
+from event_plan import DEFAULT_SCOREBOARD_INTERVAL
 
 # --- Config ---
 load_dotenv()
@@ -10,107 +13,143 @@ DATABASE_FILE = os.getenv("DATABASE_FILE")
 DATABASE_DIR = os.getenv("DATABASE_DIR")
 DATABASE_SCHEMA= os.getenv("DATABASE_SCHEMA")
 
+# Without these every path below would silently point at a file named "NoneNone"
+if not DATABASE_DIR or not DATABASE_FILE:
+    raise RuntimeError("DATABASE_DIR and DATABASE_FILE must be set in .env")
+
 # Database Paths
 SCHEMA_PATH = f"{DATABASE_DIR}{DATABASE_SCHEMA}"
 DATABASE_PATH = f"{DATABASE_DIR}{DATABASE_FILE}"
 
+# Schema migrations, applied in order on top of the initial schema
+MIGRATIONS_DIR = f"{DATABASE_DIR}migrations/"
+
+# Localhost UDP port the event handler listens on to be woken when the schedule changes
+SCHEDULER_WAKE_PORT = int(os.getenv("SCHEDULER_WAKE_PORT", 8765))
+
+# === SCHEDULER QUERIES ===
+# Kept at module level so check_scheduler_query_plans() can EXPLAIN the exact SQL the handler runs
+
+def _unsent(notification_type):
+    return f"""events e
+LEFT JOIN event_notifications n
+    ON e.id = n.event_id
+    AND n.notification_type = '{notification_type}'"""
+
+# Every scheduler action in handler priority order, as (action, FROM, pending while, due_at).
+# The handler's wake-up deadlines and its due actions are both built from this one list,
+# so they can't disagree about when something is due. :now and :in_30m come from due_actions_clock()
+SCHEDULER_ACTIONS = (
+    ("start", "events e",
+     "e.event_started = 0 AND e.event_over = 0",
+     "e.start_time"),
+    ("start_notification", _unsent("start"),
+     "e.event_started = 1 AND e.event_over = 0 AND n.id IS NULL",
+     "e.start_time"),
+    ("end", "events e",
+     "e.event_in_progress = 1 AND e.event_over = 0",
+     "strftime('%Y-%m-%dT%H:%M:%SZ', e.end_time, '+1 second')"),
+    ("display", "events e",
+     "e.event_in_progress = 1 AND e.event_over = 0",
+     f"COALESCE(e.next_scoreboard_time, strftime('%Y-%m-%dT%H:%M:%SZ', e.last_scoreboard_time, '+{DEFAULT_SCOREBOARD_INTERVAL} minutes'), :now)"),
+    ("30min", _unsent("30min"),
+     "e.start_time > :now AND e.event_over = 0 AND n.id IS NULL",
+     "strftime('%Y-%m-%dT%H:%M:%SZ', e.start_time, '-30 minutes')"),
+    ("24h", _unsent("24h"),
+     "e.start_time > :in_30m AND e.event_over = 0 AND n.id IS NULL",
+     "strftime('%Y-%m-%dT%H:%M:%SZ', e.start_time, '-1 day')"),
+)
+
+# When each pending action next becomes due
+UPCOMING_DEADLINES_QUERY = "\n\nUNION ALL\n".join(
+    f"SELECT e.id, '{action}', {due_at}\nFROM {source}\nWHERE {pending}"
+    for action, source, pending, due_at in SCHEDULER_ACTIONS
+) + ";"
+
+# Every action due right now, in handler priority order. One statement with the clock
+# passed in as parameters, so all six checks see the same snapshot and the same 'now'
+DUE_ACTIONS_QUERY = "\n\nUNION ALL\n".join(
+    f"SELECT {priority} AS priority, '{action}' AS action, e.id, e.unique_event_name, e.name, e.event_json, e.start_time\n"
+    f"FROM {source}\nWHERE {pending}\nAND {due_at} <= :now"
+    for priority, (action, source, pending, due_at) in enumerate(SCHEDULER_ACTIONS, start=1)
+) + "\n\nORDER BY priority, start_time;"
+
 # === QUERY FUNCTIONS ===
 
-def find_missing_24h_notif():
-    """Find events needing 24h notifications"""
-    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
+def due_actions_clock():
+    """The time window parameters for the scheduler queries, all from one reading of the clock"""
+    now = datetime.now(timezone.utc)
+    return {
+        "now": now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "in_30m": (now + timedelta(minutes=30)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+    }
 
-    missing_24_query = """
-    SELECT e.*
-    FROM events e
-    LEFT JOIN event_notifications n
-        ON e.id = n.event_id
-        AND n.notification_type = '24h'
-    WHERE e.start_time > strftime('%Y-%m-%dT%H:%M:%SZ', 'now', '+30 minutes')
-    AND e.start_time <= strftime('%Y-%m-%dT%H:%M:%SZ', 'now', '+1 day')
-    AND n.id IS NULL
-    AND e.event_over = 0;
+def due_actions():
     """
-    
-    return db.db_query(missing_24_query)
-
-def find_missing_30m_notif():
-    """Find events needing 30min notifications"""
-    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
-
-    missing_30_query = """
-    SELECT e.*
-    FROM events e
-    LEFT JOIN event_notifications n
-        ON e.id = n.event_id
-        AND n.notification_type = '30min'
-    WHERE e.start_time > strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
-    AND e.start_time <= strftime('%Y-%m-%dT%H:%M:%SZ', 'now', '+30 minutes')
-    AND e.event_over = 0
-    AND n.id IS NULL;
+    Everything the handler should do this tick, as
+    (action, event_id, unique_name, name, event_json) rows in priority order.
+    action is one of start, start_notification, end, display, 30min, 24h.
     """
-
-    return db.db_query(missing_30_query)
-
-def find_missing_now_notif():
-    """Find events needing start notifications"""
     db = db_manager(DATABASE_PATH, SCHEMA_PATH)
 
-    missing_start_now_notif_query = """
-    SELECT e.*
-    FROM events e
-    LEFT JOIN event_notifications n
-        ON e.id = n.event_id
-        AND n.notification_type = 'start'
-    WHERE e.start_time <= strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
-    AND e.event_started = 1
-    AND e.event_over = 0
-    AND n.id IS NULL;
-    """
-
-    return db.db_query(missing_start_now_notif_query)
+    rows = db.db_query_with_params(DUE_ACTIONS_QUERY, due_actions_clock()) or []
+    return [row[1:6] for row in rows]
 
-def events_needing_started():
-    """Find events that need to be started"""
-    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
+def upcoming_deadlines():
+    """
+    When each pending action next becomes due, as (event_id, action, due_at) rows.
 
-    events_needing_started_query = """
-    SELECT *
-    FROM events
-    WHERE start_time <= strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
-    AND event_started = 0
-    AND event_over = 0;
+    Read from the same pending actions as due_actions(), so the handler can sleep
+    until the earliest one instead of polling.
     """
+    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
 
-    return db.db_query(events_needing_started_query)
+    return db.db_query_with_params(UPCOMING_DEADLINES_QUERY, due_actions_clock()) or []
 
-def events_needing_ending():
-    """Find events that need to be ended"""
+def wake_event_handler():
+    """Tell a running event handler the schedule changed so it recomputes its next wakeup"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b"wake", ("127.0.0.1", SCHEDULER_WAKE_PORT))
+    except OSError as e:
+        # Not fatal - the handler still re-checks on its own at least every few minutes
+        print(f"Could not wake event handler: {e}")
+
+def migrate_database():
+    """Bring an existing database up to the latest schema migration"""
     db = db_manager(DATABASE_PATH, SCHEMA_PATH)
 
-    events_needing_ending_query = """
-    SELECT *
-    FROM events
-    WHERE event_in_progress = 1
-    AND end_time < strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
-    AND event_over = 0;
-    """
+    try:
+        applied = db.migrate(MIGRATIONS_DIR)
+    except Exception as e:
+        log_message(f"Error migrating database: {e}", "ERROR")
+        return []
 
-    return db.db_query(events_needing_ending_query)
+    for filename in applied:
+        log_message(f"Applied database migration {filename}")
+    return applied
 
-def events_needing_scoreboard_display():
-    """Find events in progress that need scoreboard display"""
+def check_scheduler_query_plans():
+    """
+    EXPLAIN QUERY PLAN each scheduler query and return (query_name, plan_step) for
+    every step that scans a table or index instead of searching it. Empty means every
+    table access seeks into an index.
+    """
     db = db_manager(DATABASE_PATH, SCHEMA_PATH)
 
-    events_need_display_query = """
-    SELECT *
-    FROM events
-    WHERE event_in_progress = 1
-    AND (last_scoreboard_time IS NULL 
-         OR last_scoreboard_time <= strftime('%Y-%m-%dT%H:%M:%SZ', datetime('now', '-10 minutes')));
-    """
+    scheduler_queries = {
+        "upcoming_deadlines": (UPCOMING_DEADLINES_QUERY, due_actions_clock()),
+        "due_actions": (DUE_ACTIONS_QUERY, due_actions_clock()),
+    }
 
-    return db.db_query(events_need_display_query)
+    full_scans = []
+    for name, (query, params) in scheduler_queries.items():
+        plan = db.db_query_with_params(f"EXPLAIN QUERY PLAN {query}", params) or []
+        for row in plan:
+            detail = row[3]
+            if detail.startswith("SCAN"):
+                full_scans.append((name, detail))
+    return full_scans
 
 # === UPDATE FUNCTIONS ===
 
@@ -126,13 +165,7 @@ def start_event_by_id(event_id):
     """
 
     try:
-        db_conn = db.db_connect()
-        cursor = db_conn.cursor()
-        cursor.execute(start_event_query, (event_id,))
-        db_conn.commit()
-        affected_rows = cursor.rowcount
-        cursor.close()
-        db_conn.close()
+        affected_rows = db.db_execute(start_event_query, (event_id,))
         
         log_message(f"Event {event_id} marked as started (affected {affected_rows} rows)")
         return affected_rows > 0
@@ -153,13 +186,7 @@ def end_event_by_id(event_id):
     """
 
     try:
-        db_conn = db.db_connect()
-        cursor = db_conn.cursor()
-        cursor.execute(end_event_query, (event_id,))
-        db_conn.commit()
-        affected_rows = cursor.rowcount
-        cursor.close()
-        db_conn.close()
+        affected_rows = db.db_execute(end_event_query, (event_id,))
         
         log_message(f"Event {event_id} marked as ended (affected {affected_rows} rows)")
         return affected_rows > 0
@@ -181,13 +208,7 @@ def update_scoreboard_display_time(event_id):
     """
     
     try:
-        db_conn = db.db_connect()
-        cursor = db_conn.cursor()
-        cursor.execute(update_query, (current_time, event_id))
-        db_conn.commit()
-        affected_rows = cursor.rowcount
-        cursor.close()
-        db_conn.close()
+        affected_rows = db.db_execute(update_query, (current_time, event_id))
         
         return affected_rows > 0
         
@@ -267,49 +288,35 @@ def insert_event(unique_name, name, event_json, description, start_time, end_tim
 
 def log_message(message, level="INFO"):
     """Add a simple log entry with current timestamp"""
-    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
-    
     timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
     
-    query = """
-    INSERT INTO logs (timestamp, message, log_level)
-    VALUES (?, ?, ?);
-    """
-    
-    return db.db_query_with_params(query, (timestamp, message, level))
+    # Buffered - written to the logs table in batches by log_writer
+    get_writer(DATABASE_PATH, SCHEMA_PATH).write(timestamp, message, level)
 
 def log_message_with_timestamp(message, level="INFO", timestamp=None):
     """Add a log entry with custom timestamp in UTC format"""
-    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
-    
     if not timestamp:
         timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
     
-    query = """
-    INSERT INTO logs (timestamp, message, log_level)
-    VALUES (?, ?, ?);
-    """
-    
-    return db.db_query_with_params(query, (timestamp, message, level))
+    get_writer(DATABASE_PATH, SCHEMA_PATH).write(timestamp, message, level)
+
+def flush_logs():
+    """Write any buffered log entries now"""
+    get_writer(DATABASE_PATH, SCHEMA_PATH).flush()
 
-def update_scoreboard_time(event_id, timestamp):
-    """Update the last scoreboard display time for an event"""
+def update_scoreboard_time(event_id, timestamp, next_time=None):
+    """Update the last scoreboard display time for an event, and when the next display is due"""
     db = db_manager(DATABASE_PATH, SCHEMA_PATH)
     
     query = """
     UPDATE events
-    SET last_scoreboard_time = ?
+    SET last_scoreboard_time = ?,
+        next_scoreboard_time = ?
     WHERE id = ?;
     """
     
     try:
-        db_conn = db.db_connect()
-        cursor = db_conn.cursor()
-        cursor.execute(query, (timestamp, event_id))
-        db_conn.commit()
-        affected_rows = cursor.rowcount
-        cursor.close()
-        db_conn.close()
+        affected_rows = db.db_execute(query, (timestamp, next_time, event_id))
         
         return affected_rows > 0
         
@@ -317,6 +324,17 @@ def update_scoreboard_time(event_id, timestamp):
         log_message(f"Error updating scoreboard time: {e}", "ERROR")
         return False
 
+def get_scoreboard_schedule(event_id):
+    """(last_scoreboard_time, next_scoreboard_time, end_time) for an event, or None"""
+    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
+
+    query = """
+    SELECT last_scoreboard_time, next_scoreboard_time, end_time FROM events WHERE id = ?;
+    """
+
+    result = db.db_query_with_params(query, (event_id,))
+    return result[0] if result else None
+
 def get_event_id_by_unique_name(unique_name):
     """Get event ID by unique event name"""
     db = db_manager(DATABASE_PATH, SCHEMA_PATH)
@@ -351,3 +369,43 @@ def get_event_winners(event_id):
     """
     
     return db.db_query_with_params(query, (event_id,))
+
+def insert_score_snapshot(event_id, taken_at, scores):
+    """Append one row per player in a {player: score} map, as a single batch"""
+    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
+
+    query = """
+    INSERT INTO score_snapshots (event_id, taken_at, player_name, score)
+    VALUES (?, ?, ?, ?);
+    """
+
+    rows = [(event_id, taken_at, player, score) for player, score in scores.items()]
+    return db.db_executemany(query, rows)
+
+def get_latest_scores(event_id):
+    """Each player's most recent recorded score for an event as {player: score}"""
+    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
+
+    # SQLite takes the bare score column from the row holding MAX(id)
+    query = """
+    SELECT player_name, score, MAX(id)
+    FROM score_snapshots
+    WHERE event_id = ?
+    GROUP BY player_name;
+    """
+
+    result = db.db_query_with_params(query, (event_id,)) or []
+    return {player: score for player, score, _ in result}
+
+def get_score_history(event_id):
+    """Every recorded score change for an event, oldest first, as (taken_at, player, score) rows"""
+    db = db_manager(DATABASE_PATH, SCHEMA_PATH)
+
+    query = """
+    SELECT taken_at, player_name, score
+    FROM score_snapshots
+    WHERE event_id = ?
+    ORDER BY id;
+    """
+
+    return db.db_query_with_params(query, (event_id,)) or []
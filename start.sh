@@ -61,6 +61,7 @@ echo "🌐 Starting web application with gunicorn..."
 gunicorn \
     --bind 0.0.0.0:8080 \
     --workers 4 \
+    --threads 8 \
     --timeout 120 \
     --daemon \
     --pid /tmp/gunicorn.pid \
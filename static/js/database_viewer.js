@@ -85,6 +85,7 @@ function switchTab(tabName) {
     } else if (tabName === 'notifications' && !document.getElementById('notifications-table').innerHTML.includes('table')) {
         loadTable('event_notifications');
     } else if (tabName === 'logs' && !document.getElementById('logs-table').innerHTML.includes('table')) {
+        loadLogArchives();
         loadTable('logs');
     } else if (tabName === 'winners' && !document.getElementById('winners-table').innerHTML.includes('table')) {
         loadTable('event_winners');
@@ -131,7 +132,10 @@ function loadDatabaseInfo() {
         });
 }
 
-function loadTable(tableName) {
+// Page cursors from the last response for each table, used by the prev/next buttons
+const tableCursors = {};
+
+function loadTable(tableName, cursor = '') {
     currentTable = tableName;
     const targetDiv = tableName === 'event_notifications' ? 'notifications-table' : `${tableName.replace('event_', '')}-table`;
 
@@ -143,10 +147,20 @@ function loadTable(tableName) {
 
     document.getElementById(targetDiv).innerHTML = '<div class="loading">Loading data...</div>';
 
-    // Use enhanced endpoint for notifications and winners
-    const endpoint = (tableName === 'event_notifications' || tableName === 'event_winners') 
+    // Use enhanced endpoint for notifications and winners, archive endpoint for archived logs
+    const logsSource = tableName === 'logs' ? document.getElementById('logs-source')?.value : '';
+    let endpoint = (tableName === 'event_notifications' || tableName === 'event_winners') 
         ? `/api/database/enhanced-table/${tableName}?limit=${limit}`
         : `/api/database/table/${tableName}?limit=${limit}`;
+    if (logsSource) {
+        // Archive cursors are row offsets into that month's archive
+        endpoint = `/api/database/log-archives/${logsSource}?limit=${limit}`;
+        if (cursor) {
+            endpoint += `&offset=${encodeURIComponent(cursor)}`;
+        }
+    } else if (cursor) {
+        endpoint += `&cursor=${encodeURIComponent(cursor)}`;
+    }
 
     fetch(endpoint)
         .then(response => response.json())
@@ -202,8 +216,14 @@ function loadTable(tableName) {
             });
             html += '</tbody></table></div>';
 
-            // Add pagination info
-            html += `<div class="pagination-info">Showing ${data.rows.length} of ${data.total} total rows</div>`;
+            // Add pagination info and controls
+            tableCursors[tableName] = { prev: data.prev_cursor, next: data.next_cursor };
+            html += `<div class="pagination-info">Showing ${data.rows.length} of ${data.total} total rows`;
+            if (data.prev_cursor || data.next_cursor) {
+                html += ` <button class="refresh-btn" onclick="pageTable('${tableName}', 'prev')" ${data.prev_cursor ? '' : 'disabled'}>&larr; Newer</button>`;
+                html += ` <button class="refresh-btn" onclick="pageTable('${tableName}', 'next')" ${data.next_cursor ? '' : 'disabled'}>Older &rarr;</button>`;
+            }
+            html += '</div>';
 
             document.getElementById(targetDiv).innerHTML = html;
         })
@@ -212,6 +232,36 @@ function loadTable(tableName) {
         });
 }
 
+function loadLogArchives() {
+    const select = document.getElementById('logs-source');
+    if (!select) return;
+
+    fetch('/api/database/log-archives')
+        .then(response => response.json())
+        .then(data => {
+            const selected = select.value;
+            select.innerHTML = '<option value="">Current logs</option>';
+
+            (data.archives || []).forEach(archive => {
+                const option = document.createElement('option');
+                option.value = archive.month;
+                option.textContent = `Archive ${archive.month} (${(archive.size_bytes / 1024 / 1024).toFixed(1)} MB)`;
+                select.appendChild(option);
+            });
+            select.value = selected;
+        })
+        .catch(error => {
+            console.error('Error loading log archives:', error);
+        });
+}
+
+function pageTable(tableName, direction) {
+    const cursor = tableCursors[tableName]?.[direction];
+    if (cursor) {
+        loadTable(tableName, cursor);
+    }
+}
+
 function executeQuery() {
     const query = document.getElementById('query-input').value.trim();
     if (!query) {
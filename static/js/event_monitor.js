@@ -7,26 +7,7 @@ let playersOnline = 0;
 async function refreshStatus() {
     try {
         const res = await fetch("/api/event_handler_status");
-        const data = await res.json();
-        const statusCard = document.getElementById("handler-status-card");
-        const statusDiv = document.getElementById("status");
-        const statusDescription = document.getElementById("status-description");
-        const statusIcon = document.getElementById("handler-icon");
-        
-        // Update status text and styling
-        statusDiv.textContent = data.status;
-        
-        if (data.status === "Running") {
-            statusCard.className = "event-handler-status-card running";
-            statusDiv.className = "handler-status-label running";
-            statusDescription.textContent = "Actively processing events and monitoring schedules";
-            statusIcon.textContent = "⚙️";
-        } else {
-            statusCard.className = "event-handler-status-card stopped";
-            statusDiv.className = "handler-status-label stopped";
-            statusDescription.textContent = "Event handler is not running. Events will not be processed.";
-            statusIcon.textContent = "⏸️";
-        }
+        renderStatus(await res.json());
     } catch (err) {
         console.error("Error fetching status:", err);
         const statusCard = document.getElementById("handler-status-card");
@@ -40,6 +21,43 @@ async function refreshStatus() {
     }
 }
 
+function renderStatus(data) {
+    const statusCard = document.getElementById("handler-status-card");
+    const statusDiv = document.getElementById("status");
+    const statusDescription = document.getElementById("status-description");
+    const statusIcon = document.getElementById("handler-icon");
+    
+    // Update status text and styling
+    statusDiv.textContent = data.status;
+    
+    if (data.status === "Running") {
+        statusCard.className = "event-handler-status-card running";
+        statusDiv.className = "handler-status-label running";
+        statusDescription.textContent = describeHandlerActivity(data);
+        statusIcon.textContent = "⚙️";
+    } else if (data.status === "Stalled") {
+        statusCard.className = "event-handler-status-card stopped";
+        statusDiv.className = "handler-status-label stopped";
+        statusDescription.textContent = `Process ${data.pid} has not sent a heartbeat for ${Math.round(data.heartbeat_age)}s. Stop and start it again.`;
+        statusIcon.textContent = "⚠️";
+    } else {
+        statusCard.className = "event-handler-status-card stopped";
+        statusDiv.className = "handler-status-label stopped";
+        statusDescription.textContent = "Event handler is not running. Events will not be processed.";
+        statusIcon.textContent = "⏸️";
+    }
+}
+
+function describeHandlerActivity(data) {
+    const actions = data.current_actions || [];
+    if (actions.length === 0) {
+        return "Actively processing events and monitoring schedules";
+    }
+    const running = actions.map(a => `${a.action} (event ${a.event_id})`).join(', ');
+    const queued = data.queue_depth ? `, ${data.queue_depth} queued` : '';
+    return `Running: ${running}${queued}`;
+}
+
 async function startEventHandler() {
     await fetch("/api/event_handler/start", { method: "POST" });
     refreshStatus();
@@ -50,65 +68,77 @@ async function stopEventHandler() {
     refreshStatus();
 }
 
-async function checkMinecraftHealth() {
+// Health results come from the server's background monitor; force=true asks it to probe right now
+function lastCheckTime(data) {
+    return data.checked_at ? new Date(data.checked_at).toLocaleTimeString() : '-';
+}
+
+async function checkMinecraftHealth(force = false) {
     updateHealthCard('minecraft', 'checking', 'Checking...', {});
     
     try {
-        const res = await fetch("/api/health/minecraft");
-        const data = await res.json();
-        
-        if (data.healthy) {
-            updateHealthCard('minecraft', 'healthy', 'Online', {
-                'Last Check': new Date().toLocaleTimeString()
-            });
-            serverIP = data.server_ip || 'Unknown';
-        } else {
-            updateHealthCard('minecraft', 'unhealthy', 'Offline', {
-                'Last Check': new Date().toLocaleTimeString(),
-                'Error': data.error || 'Connection failed'
-            });
-            serverIP = data.server_ip || 'Unknown';
-        }
+        const res = await fetch("/api/health/minecraft" + (force ? "?refresh=1" : ""));
+        renderMinecraftHealth(await res.json());
     } catch (error) {
         updateHealthCard('minecraft', 'unhealthy', 'Error', {
             'Last Check': new Date().toLocaleTimeString(),
             'Error': error.message
         });
+        updateServerInfo();
+        updateOverallHealth();
+    }
+}
+
+function renderMinecraftHealth(data) {
+    if (data.healthy) {
+        updateHealthCard('minecraft', 'healthy', 'Online', {
+            'Last Check': lastCheckTime(data)
+        });
+    } else {
+        updateHealthCard('minecraft', 'unhealthy', 'Offline', {
+            'Last Check': lastCheckTime(data),
+            'Error': data.error || 'Connection failed'
+        });
     }
+    serverIP = data.server_ip || 'Unknown';
     
     updateServerInfo();
     updateOverallHealth();
 }
 
-async function checkRconHealth() {
+async function checkRconHealth(force = false) {
     updateHealthCard('rcon', 'checking', 'Checking...', {});
     
     try {
-        const startTime = Date.now();
-        const res = await fetch("/api/health/rcon");
-        const responseTime = Date.now() - startTime;
-        const data = await res.json();
-        
-        if (data.healthy) {
-            updateHealthCard('rcon', 'healthy', 'Connected', {
-                'Response Time': responseTime + 'ms',
-                'Last Check': new Date().toLocaleTimeString()
-            });
-            playersOnline = data.player_count || 0;
-        } else {
-            updateHealthCard('rcon', 'unhealthy', 'Failed', {
-                'Response Time': responseTime + 'ms',
-                'Last Check': new Date().toLocaleTimeString(),
-                'Error': data.error || 'Connection failed'
-            });
-            playersOnline = 0;
-        }
+        const res = await fetch("/api/health/rcon" + (force ? "?refresh=1" : ""));
+        renderRconHealth(await res.json());
     } catch (error) {
         updateHealthCard('rcon', 'unhealthy', 'Error', {
             'Last Check': new Date().toLocaleTimeString(),
             'Error': error.message
         });
         playersOnline = 0;
+        updateServerInfo();
+        updateOverallHealth();
+    }
+}
+
+function renderRconHealth(data) {
+    const responseTime = data.latency_ms ?? '-';
+    
+    if (data.healthy) {
+        updateHealthCard('rcon', 'healthy', 'Connected', {
+            'Response Time': responseTime + 'ms',
+            'Last Check': lastCheckTime(data)
+        });
+        playersOnline = data.player_count || 0;
+    } else {
+        updateHealthCard('rcon', 'unhealthy', 'Failed', {
+            'Response Time': responseTime + 'ms',
+            'Last Check': lastCheckTime(data),
+            'Error': data.error || 'Connection failed'
+        });
+        playersOnline = 0;
     }
     
     updateServerInfo();
@@ -192,32 +222,72 @@ function updateOverallHealth() {
 }
 
 async function refreshServerInfo() {
-    await checkMinecraftHealth();
+    // One forced probe refreshes both results
+    await checkMinecraftHealth(true);
     await checkRconHealth();
 }
 
 async function refreshSystemStatus() {
-    await checkMinecraftHealth();
+    await checkMinecraftHealth(true);
     await checkRconHealth();
 }
 
+// Live stream - the server pushes only log rows newer than the last one we saw, and the
+// handler status and health results whenever they change, so nothing here polls
+const MAX_LOG_LINES = 300;
+let logStream = null;
+
+function startLogStream() {
+    const viewer = document.getElementById('logViewer');
+    const status = document.getElementById('log-stream-status');
+
+    logStream = new EventSource('/api/logs/stream');
+
+    logStream.onopen = () => {
+        status.textContent = '● Live';
+    };
+
+    logStream.onmessage = (event) => {
+        const logs = JSON.parse(event.data);
+        const atBottom = viewer.scrollTop + viewer.clientHeight >= viewer.scrollHeight - 5;
+
+        logs.forEach(log => {
+            const line = document.createElement('div');
+            const time = new Date(log.timestamp).toLocaleString();
+            line.textContent = `${time} [${log.log_level}] ${log.message}`;
+            viewer.appendChild(line);
+        });
+
+        while (viewer.childElementCount > MAX_LOG_LINES) {
+            viewer.removeChild(viewer.firstElementChild);
+        }
+        if (atBottom) {
+            viewer.scrollTop = viewer.scrollHeight;
+        }
+    };
+
+    logStream.addEventListener('status', (event) => {
+        renderStatus(JSON.parse(event.data));
+    });
+
+    logStream.addEventListener('health', (event) => {
+        const snapshot = JSON.parse(event.data);
+        renderMinecraftHealth({ ...snapshot.minecraft, checked_at: snapshot.checked_at });
+        renderRconHealth({ ...snapshot.rcon, checked_at: snapshot.checked_at });
+    });
+
+    // EventSource reconnects by itself and resumes from the last event id
+    logStream.onerror = () => {
+        status.textContent = 'Reconnecting...';
+    };
+}
+
 // Initialize event listeners and auto-refresh
 document.addEventListener("DOMContentLoaded", () => {
     // Set up button event listeners
     document.getElementById("start-btn").addEventListener("click", startEventHandler);
     document.getElementById("stop-btn").addEventListener("click", stopEventHandler);
 
-    // Initial load
-    refreshStatus();
-    checkMinecraftHealth();
-    checkRconHealth();
-
-    // Auto-refresh status every 30 seconds
-    setInterval(refreshStatus, 30000);
-    
-    // Auto-refresh health checks every 60 seconds
-    setInterval(() => {
-        checkMinecraftHealth();
-        checkRconHealth();
-    }, 60000);
+    // The stream sends the current status and health as soon as it connects
+    startLogStream();
 });
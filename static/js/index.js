@@ -26,6 +26,11 @@ function updateEventHandlerWarning(status) {
         statusText.textContent = 'Event handler is running and processing events automatically.';
         startBtn.style.display = 'none';
         warning.querySelector('.warning-icon').textContent = '✅';
+    } else if (status === 'Stalled') {
+        warning.className = 'event-handler-warning';
+        statusText.textContent = 'Event handler is running but has stopped responding. Restart it from the Event Monitor.';
+        startBtn.style.display = 'none';
+        warning.querySelector('.warning-icon').textContent = '⚠️';
     } else if (status === 'Not Running') {
         warning.className = 'event-handler-warning';
         statusText.textContent = 'Event handler is not running. Events will not be processed automatically.';
@@ -55,27 +60,27 @@ async function startEventHandler() {
     }
 }
 
-// System status checks
-async function checkSystemStatus() {
-    // Minecraft status
-    try {
-        const res = await fetch("/api/health/minecraft");
-        const data = await res.json();
-        updateStatusCard('minecraft', data.healthy ? 'healthy' : 'unhealthy', 
-            data.healthy ? 'Online' : 'Offline');
-    } catch (err) {
-        updateStatusCard('minecraft', 'unhealthy', 'Error');
-    }
+// System status, pushed by the server whenever the health monitor publishes new results
+function renderSystemStatus(snapshot) {
+    updateStatusCard('minecraft', snapshot.minecraft.healthy ? 'healthy' : 'unhealthy',
+        snapshot.minecraft.healthy ? 'Online' : 'Offline');
+    updateStatusCard('rcon', snapshot.rcon.healthy ? 'healthy' : 'unhealthy',
+        snapshot.rcon.healthy ? 'Connected' : 'Failed');
+}
 
-    // RCON status
-    try {
-        const res = await fetch("/api/health/rcon");
-        const data = await res.json();
-        updateStatusCard('rcon', data.healthy ? 'healthy' : 'unhealthy', 
-            data.healthy ? 'Connected' : 'Failed');
-    } catch (err) {
-        updateStatusCard('rcon', 'unhealthy', 'Error');
-    }
+// Handler status and health arrive over the same stream the Event Monitor uses, without its log rows
+function startStatusStream() {
+    const stream = new EventSource('/api/logs/stream?logs=0');
+
+    stream.addEventListener('status', (event) => {
+        const data = JSON.parse(event.data);
+        eventHandlerStatus = data.status;
+        updateEventHandlerWarning(data.status);
+    });
+
+    stream.addEventListener('health', (event) => {
+        renderSystemStatus(JSON.parse(event.data));
+    });
 }
 
 function updateStatusCard(type, status, value) {
@@ -155,15 +160,11 @@ async function loadEventJson(filename) {
 
 // Initialize dashboard
 document.addEventListener("DOMContentLoaded", () => {
-    checkEventHandlerStatus();
-    checkSystemStatus();
+    startStatusStream();
     refreshCalendar();
     refreshEventFiles();
     
-    // Auto-refresh every 30 seconds
-    setInterval(() => {
-        checkEventHandlerStatus();
-        checkSystemStatus();
-        refreshCalendar();
-    }, 30000);
+    // The calendar keeps polling: an event's status also moves with the clock, and events
+    // are edited from other pages, so there is no single change for the stream to push
+    setInterval(refreshCalendar, 30000);
 });
\ No newline at end of file
@@ -0,0 +1,22 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Point the database settings at a scratch copy before anything loads .env
+DATABASE_DIR = tempfile.mkdtemp(prefix="event_tests_") + "/"
+shutil.copy(os.path.join(ROOT, "database", "init_schema.sql"), DATABASE_DIR)
+shutil.copytree(os.path.join(ROOT, "database", "migrations"), os.path.join(DATABASE_DIR, "migrations"))
+os.environ["DATABASE_DIR"] = DATABASE_DIR
+os.environ["DATABASE_FILE"] = "event_database.db"
+os.environ["DATABASE_SCHEMA"] = "init_schema.sql"
+
+with sqlite3.connect(DATABASE_DIR + "event_database.db") as connection, open(DATABASE_DIR + "init_schema.sql") as schema:
+    connection.executescript(schema.read())
+
+# The modules in src/ import each other as top-level modules; app.py sits at the root
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,99 @@
+"""A fake RCON server for tests, as strict about packet framing as vanilla's"""
+
+import socket
+import struct
+import threading
+
+from rcon_pool import MAX_REPLY_CHUNK
+
+PASSWORD = "pw"
+
+
+class strict_server():
+    """
+    Behaves like vanilla's RconClient: one recv of up to 1460 bytes per packet, and the
+    connection is dropped if that read is not exactly one packet. Commands starting with
+    `ignore` are run but never answered, like a server that has stopped responding.
+    `respond(cmd)` overrides the reply to other commands - None drops the connection.
+    """
+
+    def __init__(self, ignore=None, respond=None):
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.ignore = ignore
+        self.respond = respond
+        self.dropped = False
+        self.received = []
+        self.connections = []
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+
+    def handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    data = conn.recv(1460)
+                except OSError:
+                    return
+                if not data:
+                    return
+                (length,) = struct.unpack("<i", data[:4])
+                if len(data) != length + 4:
+                    self.dropped = True
+                    return
+                request_id, packet_type = struct.unpack("<ii", data[4:12])
+                body = data[12:-2].decode("utf8")
+                if packet_type == 2:
+                    self.received.append(body)
+
+                if packet_type == 3:
+                    self.send(conn, request_id if body == PASSWORD else -1, 2, b"")
+                elif packet_type == 2 and self.ignore and body.startswith(self.ignore):
+                    continue
+                elif packet_type == 2:
+                    reply = self.respond(body) if self.respond else f"ran {body}"
+                    if reply is None:
+                        return
+                    reply = reply.encode("utf8")
+                    for start in range(0, max(len(reply), 1), MAX_REPLY_CHUNK):
+                        self.send(conn, request_id, 0, reply[start:start + MAX_REPLY_CHUNK])
+                else:
+                    self.send(conn, request_id, 0, f"Unknown request {packet_type:x}".encode("utf8"))
+
+
+    def send(self, conn, request_id, packet_type, body):
+        payload = struct.pack("<ii", request_id, packet_type) + body + b"\x00\x00"
+        conn.sendall(struct.pack("<i", len(payload)) + payload)
+
+
+    def drop_connections(self):
+        """Close every open session from the server side, like a restart or an idle timeout"""
+        for conn in self.connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.connections = []
+
+
+    def close(self):
+        # Shut down first - closing alone doesn't wake the thread blocked in accept()
+        try:
+            self.listener.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.listener.close()
+        self.drop_connections()
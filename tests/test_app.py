@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import time
+import types
+
+import pytest
+
+import app as app_module
+import log_retention
+import sql_calendar
+from app import app, get_db, keyset_page, cached_table_count, MAX_PAGE_SIZE
+from database_manager import db_manager
+
+MONTH = "2025-01"
+
+
+@pytest.fixture
+def archive_client():
+    os.makedirs(log_retention.ARCHIVE_DIR, exist_ok=True)
+    with sqlite3.connect(log_retention.archive_path(MONTH)) as archive:
+        archive.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp TEXT, message TEXT, log_level TEXT)")
+        archive.executemany(
+            "INSERT INTO logs VALUES (?, ?, ?, 'INFO')",
+            [(i, f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}Z", f"message {i}") for i in range(1, MAX_PAGE_SIZE + 11)]
+        )
+    archive.close()
+
+    with app.test_client() as client:
+        with client.session_transaction() as session:
+            session["logged_in"] = True
+        yield client
+    os.remove(log_retention.archive_path(MONTH))
+
+
+def test_archive_page_size_is_capped(archive_client):
+    data = archive_client.get(f"/api/database/log-archives/{MONTH}?limit=-1").get_json()
+    assert len(data["rows"]) == 1
+
+    data = archive_client.get(f"/api/database/log-archives/{MONTH}?limit=100000").get_json()
+    assert len(data["rows"]) == MAX_PAGE_SIZE
+
+
+def test_archive_offset_is_never_negative(archive_client):
+    data = archive_client.get(f"/api/database/log-archives/{MONTH}?limit=5&offset=-20").get_json()
+    assert data["offset"] == 0
+    assert [row["id"] for row in data["rows"]] == [MAX_PAGE_SIZE + 10 - i for i in range(5)]
+    assert data["prev_cursor"] is None
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """A logged-in client whose streams run for a fraction of a second, with every sleep recorded"""
+    sleeps = []
+    monkeypatch.setattr(app_module, "LOG_STREAM_DURATION", 0.5)
+    monkeypatch.setattr(app_module, "LOG_STREAM_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(app_module, "LOG_STREAM_MAX_POLL_INTERVAL", 0.08)
+    monkeypatch.setattr(app_module, "time", types.SimpleNamespace(
+        monotonic=time.monotonic, sleep=lambda seconds: (sleeps.append(seconds), time.sleep(seconds))
+    ))
+    # The health monitor's probes would go to a real server
+    monkeypatch.setattr(app_module.health_monitor, "ensure_started", lambda: None)
+
+    with app.test_client() as client:
+        with client.session_transaction() as session:
+            session["logged_in"] = True
+
+        def read(query=""):
+            sleeps.clear()
+            body = client.get(f"/api/logs/stream{query}").get_data(as_text=True)
+            events = []
+            for block in body.split("\n\n"):
+                fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":") and ": " in line)
+                if "data" in fields:
+                    events.append((fields.get("event", "message"), json.loads(fields["data"])))
+            return events, list(sleeps)
+
+        yield read
+
+
+def add_logs(*messages):
+    # Anything other modules have buffered goes in first, so it isn't mistaken for new rows
+    sql_calendar.flush_logs()
+    db = get_db()
+    for message in messages:
+        db.db_query_with_params("INSERT INTO logs (timestamp, message, log_level) VALUES ('2026-01-01T00:00:00Z', ?, 'INFO')", (message,))
+    return db.db_query_with_params("SELECT MAX(id) FROM logs", ())[0][0]
+
+
+def test_stream_sends_new_rows_status_and_health_once(stream):
+    after = add_logs("before")
+    add_logs("first", "second")
+
+    events, _ = stream(f"?after={after}")
+    assert [name for name, _ in events] == ["status", "health", "message"]
+    assert events[0][1]["status"] == "Not Running"
+    assert [row["message"] for row in events[2][1]] == ["first", "second"]
+
+
+def test_status_only_stream_leaves_logs_out(stream):
+    after = add_logs("ignored")
+    add_logs("also ignored")
+
+    events, _ = stream(f"?logs=0&after={after}")
+    assert [name for name, _ in events] == ["status", "health"]
+
+
+def test_idle_stream_backs_off(stream):
+    _, sleeps = stream(f"?after={add_logs('latest')}")
+    assert sleeps[0] == app_module.LOG_STREAM_POLL_INTERVAL
+    assert sleeps == sorted(sleeps)
+    assert sleeps[-1] == app_module.LOG_STREAM_MAX_POLL_INTERVAL
+
+
+@pytest.fixture
+def numbers(tmp_path):
+    db = db_manager(str(tmp_path / "pages.db"), None)
+    db.db_query_with_params("CREATE TABLE numbers (id INTEGER PRIMARY KEY)", ())
+    for i in range(1, 8):
+        db.db_query_with_params("INSERT INTO numbers (id) VALUES (?)", (i,))
+    return db
+
+
+def page(db, cursor):
+    rows, prev_cursor, next_cursor = keyset_page(db, "SELECT id FROM numbers", "id", cursor, 3)
+    return [row[0] for row in rows], prev_cursor, next_cursor
+
+
+def test_keyset_pages_walk_both_ways(numbers):
+    first, prev_cursor, next_cursor = page(numbers, None)
+    assert first == [7, 6, 5] and prev_cursor is None
+
+    second, back, next_cursor = page(numbers, next_cursor)
+    assert second == [4, 3, 2]
+
+    last, _, end = page(numbers, next_cursor)
+    assert last == [1] and end is None
+
+    # Going back from the second page lands on the first again
+    assert page(numbers, back)[0] == first
+
+
+def test_new_rows_do_not_shift_a_deep_page(numbers):
+    _, _, next_cursor = page(numbers, None)
+    numbers.db_query_with_params("INSERT INTO numbers (id) VALUES (8)", ())
+    assert page(numbers, next_cursor)[0] == [4, 3, 2]
+
+
+def test_invalid_cursor_starts_from_the_newest_rows(numbers):
+    assert page(numbers, "not-a-cursor")[0] == [7, 6, 5]
+
+
+def test_table_totals_are_cached(numbers, monkeypatch):
+    monkeypatch.setattr(app_module, "_table_counts", {})
+    assert cached_table_count(numbers, "numbers") == 7
+    numbers.db_query_with_params("INSERT INTO numbers (id) VALUES (8)", ())
+    assert cached_table_count(numbers, "numbers") == 7
+
+    monkeypatch.setattr(app_module, "TABLE_COUNT_TTL", 0)
+    assert cached_table_count(numbers, "numbers") == 8
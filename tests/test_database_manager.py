@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+import sql_calendar
+from database_manager import db_manager, close_connections
+
+
+def test_connection_is_reused_until_closed(tmp_path):
+    db = db_manager(str(tmp_path / "pooled.db"), None)
+    connection = db.db_connect()
+    assert db.db_connect() is connection
+
+    close_connections()
+    with pytest.raises(sqlite3.ProgrammingError):
+        connection.execute("SELECT 1")
+    assert db.db_connect() is not connection
+
+
+def write_migration(directory, filename, sql):
+    (directory / filename).write_text(sql)
+
+
+@pytest.fixture
+def fresh(tmp_path):
+    migrations = tmp_path / "migrations"
+    migrations.mkdir()
+    write_migration(migrations, "001_items.sql", "CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY);")
+    write_migration(migrations, "002_item_name.sql", "ALTER TABLE items ADD COLUMN name TEXT;")
+    write_migration(migrations, "README.txt", "not a migration")
+    return db_manager(str(tmp_path / "migrated.db"), None), migrations
+
+
+def user_version(db):
+    return db.db_connect().execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_migrations_apply_in_order_and_only_once(fresh):
+    db, migrations = fresh
+    assert db.migrate(str(migrations)) == ["001_items.sql", "002_item_name.sql"]
+    assert user_version(db) == 2
+
+    # Already at version 2 - a second run, like a restart, changes nothing
+    assert db.migrate(str(migrations)) == []
+    write_migration(migrations, "003_item_index.sql", "CREATE INDEX IF NOT EXISTS idx_items_name ON items(name);")
+    assert db.migrate(str(migrations)) == ["003_item_index.sql"]
+    assert user_version(db) == 3
+
+
+def test_failed_migration_is_rolled_back_and_stops_the_run(fresh):
+    db, migrations = fresh
+    write_migration(migrations, "002_item_name.sql", "ALTER TABLE items ADD COLUMN name TEXT; SELECT * FROM missing_table;")
+    write_migration(migrations, "003_item_index.sql", "CREATE INDEX IF NOT EXISTS idx_items_name ON items(name);")
+
+    assert db.migrate(str(migrations)) == ["001_items.sql"]
+    assert user_version(db) == 1
+    columns = [row[1] for row in db.db_connect().execute("PRAGMA table_info(items)")]
+    assert columns == ["id"]
+
+
+def test_repo_migrations_bring_the_schema_to_the_latest_version(tmp_path):
+    db = db_manager(str(tmp_path / "schema.db"), sql_calendar.SCHEMA_PATH)
+    db.initialize_db()
+    applied = db.migrate(sql_calendar.MIGRATIONS_DIR)
+    assert applied == sorted(applied)
+    assert user_version(db) == int(applied[-1].partition("_")[0])
@@ -0,0 +1,49 @@
+import asyncio
+
+from event_handler import action_scheduler
+
+
+def run_actions(scheduler, submissions):
+    """Submit (event_id, action) pairs that each take a moment, returning the order things happened in"""
+    log = []
+    running = set()
+    peak = 0
+
+    async def action(event_id, name):
+        nonlocal peak
+        log.append(("start", event_id, name))
+        running.add((event_id, name))
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.05)
+        running.discard((event_id, name))
+        log.append(("end", event_id, name))
+
+    async def scenario():
+        accepted = [scheduler.submit(event_id, name, action, event_id, name) for event_id, name in submissions]
+        await scheduler.wait()
+        return accepted
+
+    return asyncio.run(scenario()), log, peak
+
+
+def test_actions_for_one_event_run_in_order():
+    _, log, _ = run_actions(action_scheduler(), [(1, "start"), (1, "display"), (1, "end")])
+    assert log == [
+        ("start", 1, "start"), ("end", 1, "start"),
+        ("start", 1, "display"), ("end", 1, "display"),
+        ("start", 1, "end"), ("end", 1, "end"),
+    ]
+
+
+def test_different_events_run_concurrently_up_to_the_limit():
+    _, log, peak = run_actions(action_scheduler(max_concurrent=2), [(1, "display"), (2, "display"), (3, "display")])
+    assert peak == 2
+    # The first two overlap, the third waits for a free slot
+    assert [entry[:2] for entry in log[:2]] == [("start", 1), ("start", 2)]
+    assert len(log) == 6
+
+
+def test_an_action_in_flight_is_not_submitted_again():
+    accepted, log, _ = run_actions(action_scheduler(), [(1, "display"), (1, "display")])
+    assert accepted == [True, False]
+    assert log == [("start", 1, "display"), ("end", 1, "display")]
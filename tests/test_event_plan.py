@@ -0,0 +1,26 @@
+import json
+import os
+
+import pytest
+
+from event_plan import event_plan
+
+EVENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "events", "events_json")
+
+
+def definition(**scoreboard):
+    with open(os.path.join(EVENTS_DIR, "TimberTrial.json")) as f:
+        data = json.load(f)
+    data["scoreboard"] = scoreboard
+    return data
+
+
+@pytest.mark.parametrize("adaptive", [True, False])
+def test_adaptive_cadence_takes_a_bool(adaptive):
+    assert event_plan(definition(adaptive=adaptive)).scoreboard_adaptive is adaptive
+
+
+@pytest.mark.parametrize("adaptive", ["false", "true", 0, None])
+def test_adaptive_cadence_rejects_anything_else(adaptive):
+    with pytest.raises(ValueError, match="scoreboard.adaptive"):
+        event_plan(definition(adaptive=adaptive))
@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+from event_registry import event_registry, event_definition_error
+
+EVENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "events", "events_json")
+
+
+@pytest.mark.parametrize("stored, expected", [("true", True), ("false", False), (True, True), (False, False)])
+def test_is_aggregate_is_read_as_a_bool(tmp_path, stored, expected):
+    with open(os.path.join(EVENTS_DIR, "TimberTrial.json")) as f:
+        data = json.load(f)
+    data["is_aggregate"] = stored
+    with open(tmp_path / "TimberTrial.json", "w") as f:
+        json.dump(data, f)
+
+    assert event_registry(str(tmp_path)).definition("TimberTrial.json")["is_aggregate"] is expected
+
+
+@pytest.fixture
+def events(tmp_path):
+    with open(os.path.join(EVENTS_DIR, "TimberTrial.json")) as f:
+        data = json.load(f)
+    with open(tmp_path / "TimberTrial.json", "w") as f:
+        json.dump(data, f)
+    return tmp_path, data
+
+
+def test_unchanged_file_is_served_from_the_cache(events):
+    directory, _ = events
+    registry = event_registry(str(directory))
+    entry = registry.get("TimberTrial.json")
+    assert registry.get("TimberTrial.json") is entry
+    assert registry.plan("TimberTrial.json") is entry.plan
+
+
+def test_changed_file_is_parsed_again(events):
+    directory, data = events
+    registry = event_registry(str(directory))
+    registry.get("TimberTrial.json")
+
+    data["name"] = "Timber Trial Deluxe"
+    path = directory / "TimberTrial.json"
+    with open(path, "w") as f:
+        json.dump(data, f)
+    # Same-second rewrites still count as a change
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+
+    assert registry.definition("TimberTrial.json")["name"] == "Timber Trial Deluxe"
+
+
+def test_definitions_are_copies_callers_can_extend(events):
+    directory, _ = events
+    registry = event_registry(str(directory))
+    registry.definition("TimberTrial.json")["unique_event_name"] = "timber_1"
+    assert "unique_event_name" not in registry.definition("TimberTrial.json")
+
+
+def test_deleted_file_is_forgotten(events):
+    directory, _ = events
+    registry = event_registry(str(directory))
+    assert [entry.filename for entry in registry.list()] == ["TimberTrial.json"]
+
+    os.remove(directory / "TimberTrial.json")
+    assert registry.list() == []
+    with pytest.raises(event_definition_error):
+        registry.get("TimberTrial.json")
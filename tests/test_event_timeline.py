@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from event_timeline import timeline
+
+
+def recorder():
+    """A blocking `send` that records each batch with when it arrived"""
+    sent = []
+    started = time.monotonic()
+
+    def send(cmds):
+        sent.append((round(time.monotonic() - started, 2), cmds))
+        return [f"ok {cmd}" for cmd in cmds]
+
+    return send, sent
+
+
+def test_steps_at_one_offset_go_out_as_one_batch():
+    ceremony = timeline()
+    ceremony.at(0.1, "say later")
+    ceremony.at(0, "say first", "first")
+    ceremony.at(0, ["give alice diamond", "give bob diamond"], "rewards")
+
+    assert ceremony.batches() == [
+        (0, [("say first", "first"), ("give alice diamond", "rewards"), ("give bob diamond", "rewards")]),
+        (0.1, [("say later", None)]),
+    ]
+
+    send, sent = recorder()
+    results = asyncio.run(ceremony.play(send))
+    assert [cmds for _, cmds in sent] == [["say first", "give alice diamond", "give bob diamond"], ["say later"]]
+    assert results == {
+        "first": [("say first", "ok say first")],
+        "rewards": [("give alice diamond", "ok give alice diamond"), ("give bob diamond", "ok give bob diamond")],
+    }
+
+
+def test_tied_countdowns_share_one_clock():
+    ceremony = timeline()
+    for winner in ("alice", "bob", "carol"):
+        for second in range(3):
+            ceremony.at(second * 0.05, f"title {winner} {3 - second}")
+
+    send, sent = recorder()
+    started = time.monotonic()
+    asyncio.run(ceremony.play(send))
+
+    # Three winners take as long as one
+    assert time.monotonic() - started < 0.3
+    assert [len(cmds) for _, cmds in sent] == [3, 3, 3]
+
+
+def test_the_loop_stays_free_while_a_ceremony_plays():
+    ceremony = timeline().at(0, "say start").at(0.2, "say end")
+    ticks = []
+
+    async def scenario():
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        def slow_send(cmds):
+            time.sleep(0.05)  # blocking RCON round trip
+            return cmds
+
+        await asyncio.gather(ceremony.play(slow_send), ticker())
+
+    asyncio.run(scenario())
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.15
+
+
+def test_a_slow_batch_delays_the_rest_without_skipping_them():
+    ceremony = timeline().at(0, "say slow").at(0.01, "say next").at(0.02, "say last")
+    sent = []
+
+    def send(cmds):
+        sent.extend(cmds)
+        if cmds == ["say slow"]:
+            time.sleep(0.1)
+        return cmds
+
+    asyncio.run(ceremony.play(send))
+    assert sent == ["say slow", "say next", "say last"]
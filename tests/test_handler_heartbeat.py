@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import time
+
+import handler_heartbeat
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Stands in for the handler: takes the lock, reports whether it got it, then waits
+HOLDER = """
+import sys, time
+sys.path.insert(0, {src!r})
+import handler_heartbeat
+print(handler_heartbeat.acquire_handler_lock({lock!r}), flush=True)
+time.sleep(30)
+"""
+
+
+def start_holder(lock_path):
+    holder = subprocess.Popen(
+        [sys.executable, "-c", HOLDER.format(src=SRC, lock=str(lock_path))], stdout=subprocess.PIPE, text=True
+    )
+    return holder, holder.stdout.readline().strip() == "True"
+
+
+def test_status_follows_the_lock_holder(tmp_path):
+    lock_path, heartbeat_path = tmp_path / "handler.lock", tmp_path / "heartbeat.json"
+    assert handler_heartbeat.handler_status(str(heartbeat_path), str(lock_path)) == {"status": "Not Running"}
+
+    holder, locked = start_holder(lock_path)
+    try:
+        assert locked
+        # Started, no heartbeat yet
+        status = handler_heartbeat.handler_status(str(heartbeat_path), str(lock_path))
+        assert status == {"status": "Running", "pid": holder.pid}
+
+        second, second_locked = start_holder(lock_path)
+        second.kill()
+        second.wait()
+        assert not second_locked
+    finally:
+        holder.kill()
+        holder.wait()
+
+    assert handler_heartbeat.handler_status(str(heartbeat_path), str(lock_path)) == {"status": "Not Running"}
+
+
+def test_stale_heartbeat_without_the_lock_is_not_running(tmp_path):
+    lock_path, heartbeat_path = tmp_path / "handler.lock", tmp_path / "heartbeat.json"
+    # A fresh-looking record whose pid now belongs to some other live process
+    handler_heartbeat.write_heartbeat({"last_tick": time.time()}, str(heartbeat_path))
+    lock_path.write_text(str(os.getpid()))
+
+    assert handler_heartbeat.handler_status(str(heartbeat_path), str(lock_path)) == {"status": "Not Running"}
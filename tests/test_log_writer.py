@@ -0,0 +1,65 @@
+import sqlite3
+import time
+
+import pytest
+
+from log_writer import log_writer
+
+LOGS_TABLE = "CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp TEXT, message TEXT, log_level TEXT)"
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "logs.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute(LOGS_TABLE)
+    return path
+
+
+def logged(path):
+    with sqlite3.connect(path) as connection:
+        return [row[0] for row in connection.execute("SELECT message FROM logs ORDER BY id")]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_records_wait_in_the_buffer_until_flushed(database):
+    writer = log_writer(database, None, flush_size=100, flush_interval=60)
+    for i in range(5):
+        writer.write("2026-01-01T00:00:00Z", f"message {i}")
+    assert logged(database) == []
+
+    writer.flush()
+    assert logged(database) == [f"message {i}" for i in range(5)]
+
+
+def test_a_full_buffer_is_flushed_in_the_background(database):
+    writer = log_writer(database, None, flush_size=3, flush_interval=60)
+    for i in range(3):
+        writer.write("2026-01-01T00:00:00Z", f"message {i}")
+    assert wait_for(lambda: len(logged(database)) == 3)
+
+
+def test_errors_are_flushed_right_away(database):
+    writer = log_writer(database, None, flush_size=100, flush_interval=60)
+    writer.write("2026-01-01T00:00:00Z", "routine")
+    writer.write("2026-01-01T00:00:00Z", "broken", "ERROR")
+    assert wait_for(lambda: logged(database) == ["routine", "broken"])
+
+
+def test_records_survive_a_failed_flush(tmp_path):
+    path = str(tmp_path / "missing_table.db")
+    writer = log_writer(path, None, flush_size=100, flush_interval=60)
+    writer.write("2026-01-01T00:00:00Z", "kept")
+    writer.flush()
+    assert writer.buffer == [("2026-01-01T00:00:00Z", "kept", "INFO")]
+
+    with sqlite3.connect(path) as connection:
+        connection.execute(LOGS_TABLE)
+    writer.flush()
+    assert logged(path) == ["kept"]
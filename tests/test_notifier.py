@@ -0,0 +1,94 @@
+import asyncio
+
+from notifier import discord_notifier
+
+
+class flaky_transport():
+    """Fails the first `failures` sends, records the rest"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    async def open(self):
+        pass
+
+    async def send(self, content=None, embeds=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Discord is down")
+        self.sent.append(content)
+
+    async def close(self):
+        pass
+
+
+def make_notifier(transport, **kwargs):
+    notifier = discord_notifier(transport, **kwargs)
+    notifier.build_message = lambda action, unique_name, winners, score: f"{action} {unique_name}"
+    return notifier
+
+
+def test_stop_sends_the_batch_being_held():
+    async def scenario():
+        transport = flaky_transport()
+        notifier = make_notifier(transport, batch_window=0.5)
+        recorded = []
+        task = asyncio.create_task(notifier.run())
+
+        notifier.notify("now", "event_a", on_sent=lambda: recorded.append("event_a"))
+        # run() has taken it off the queue and is waiting out the batch window
+        await asyncio.sleep(0.1)
+        notifier.stop()
+        await task
+        return transport.sent, recorded, notifier.is_pending("now", "event_a")
+
+    sent, recorded, pending = asyncio.run(scenario())
+    assert sent == ["now event_a"]
+    assert recorded == ["event_a"]
+    assert not pending
+
+
+def test_failed_batch_is_retried_and_only_recorded_once_delivered():
+    async def scenario():
+        transport = flaky_transport(failures=1)
+        notifier = make_notifier(transport, batch_window=0, retry_delay=0.2)
+        recorded = []
+        task = asyncio.create_task(notifier.run())
+
+        notifier.notify("thirty", "event_b", on_sent=lambda: recorded.append("event_b"))
+        await asyncio.sleep(0.1)
+        recorded_after_failure = list(recorded)
+        pending_after_failure = notifier.is_pending("thirty", "event_b")
+
+        await asyncio.sleep(0.3)
+        notifier.stop()
+        await task
+        return transport.sent, recorded_after_failure, pending_after_failure, recorded
+
+    sent, recorded_after_failure, pending_after_failure, recorded = asyncio.run(scenario())
+    assert recorded_after_failure == []
+    assert pending_after_failure
+    assert sent == ["thirty event_b"]
+    assert recorded == ["event_b"]
+
+
+def test_notification_without_a_message_is_recorded_as_skipped():
+    async def scenario():
+        transport = flaky_transport()
+        notifier = make_notifier(transport, batch_window=0)
+        # Like build_message for an event that has been deleted
+        notifier.build_message = lambda action, unique_name, winners, score: None
+        recorded = []
+        task = asyncio.create_task(notifier.run())
+
+        notifier.notify("now", "deleted_event", on_sent=lambda: recorded.append("deleted_event"))
+        await asyncio.sleep(0.1)
+        notifier.stop()
+        await task
+        return transport.sent, recorded, notifier.is_pending("now", "deleted_event")
+
+    sent, recorded, pending = asyncio.run(scenario())
+    assert sent == []
+    assert recorded == ["deleted_event"]
+    assert not pending
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import re
+
+import pytest
+
+import rcon_event_framework
+import sql_calendar
+from database_manager import db_manager
+from event_plan import event_plan
+from fake_rcon import strict_server, PASSWORD
+
+EVENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "events", "events_json")
+
+SCORES = {"alice": 12, "bob": 7, "carol": None}
+
+
+def scoreboard(cmd):
+    """Vanilla's replies to the scoreboard commands the framework sends"""
+    if cmd == "scoreboard players list":
+        return f"There are {len(SCORES)} tracked entity/entities: {', '.join(SCORES)}"
+    match = re.fullmatch(r"scoreboard players get (\S+) (\S+)", cmd)
+    if match:
+        player, objective = match.groups()
+        if SCORES[player] is None:
+            return f"Can't get value of {objective} for {player}; none is set"
+        return f"{player} has {SCORES[player]} [{objective}]"
+    return f"ran {cmd}"
+
+
+def serve(monkeypatch, respond):
+    """Start a fake server and point the framework's RCON settings at it"""
+    server = strict_server(respond=respond)
+    monkeypatch.setattr(rcon_event_framework, "rcon_host", "127.0.0.1")
+    monkeypatch.setattr(rcon_event_framework, "rcon_port", server.port)
+    monkeypatch.setattr(rcon_event_framework, "rcon_pass", PASSWORD)
+    return server
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = serve(monkeypatch, scoreboard)
+    yield server
+    rcon_event_framework.close_all()
+    server.close()
+
+
+def test_get_scores_reads_every_tracked_player(server):
+    assert rcon_event_framework.get_scores("TotalLogs") == {"alice": 12, "bob": 7}
+    assert not server.dropped
+
+
+def test_get_scores_costs_one_command_per_player(server):
+    rcon_event_framework.get_scores("TotalLogs")
+    assert server.received == ["scoreboard players list"] + [f"scoreboard players get {player} TotalLogs" for player in SCORES]
+
+
+@pytest.fixture
+def plan():
+    with open(os.path.join(EVENTS_DIR, "TimberTrial.json")) as f:
+        return event_plan(json.load(f))
+
+
+@pytest.fixture
+def event():
+    sql_calendar.migrate_database()
+    sql_calendar.insert_event("final_event", "final_event", "TimberTrial.json", "", "2026-01-01T00:00:00Z", "2026-01-02T00:00:00Z")
+    yield "final_event"
+    db = db_manager(sql_calendar.DATABASE_PATH, sql_calendar.SCHEMA_PATH)
+    event_id = sql_calendar.get_event_id_by_unique_name("final_event")
+    db.db_query_with_params("DELETE FROM score_snapshots WHERE event_id = ?", (event_id,))
+    db.db_query_with_params("DELETE FROM events WHERE id = ?", (event_id,))
+
+
+def test_failed_final_read_declares_no_winners(server, plan, event):
+    assert rcon_event_framework.find_leaders(plan, True, event) == (["alice"], 12)
+
+    # The server goes away before the event ends
+    server.close()
+    assert rcon_event_framework.find_leaders(plan, True, event, True) == ([], 0)
+
+
+AGGREGATE_EVENT = {
+    "is_aggregate": True,
+    "aggregate_objective": "TotalLogs",
+    "commands": {"aggregate": ["OakLogs", "BirchLogs"]},
+}
+
+
+def test_selector_aggregation_does_not_depend_on_player_count(server):
+    rcon_event_framework.aggregate_scores(AGGREGATE_EVENT)
+    assert server.received == [
+        "execute as @a run scoreboard players set @s TotalLogs 0",
+        "execute as @a run scoreboard players operation @s TotalLogs += @s OakLogs",
+        "execute as @a run scoreboard players operation @s TotalLogs += @s BirchLogs",
+    ]
+
+
+def test_failed_selector_aggregation_falls_back_to_each_player(monkeypatch):
+    def no_selectors(cmd):
+        # Drop the connection on the selector form
+        return None if cmd.startswith("execute") else scoreboard(cmd)
+
+    server = serve(monkeypatch, no_selectors)
+    try:
+        rcon_event_framework.aggregate_scores(AGGREGATE_EVENT)
+    finally:
+        rcon_event_framework.close_all()
+        server.close()
+
+    per_player = [cmd for cmd in server.received if not cmd.startswith("execute")]
+    assert per_player[0] == "scoreboard players list"
+    assert per_player[1:] == [
+        cmd
+        for player in SCORES
+        for cmd in (
+            f"scoreboard players set {player} TotalLogs 0",
+            f"scoreboard players operation {player} TotalLogs += {player} OakLogs",
+            f"scoreboard players operation {player} TotalLogs += {player} BirchLogs",
+        )
+    ]
+
+
+def test_final_aggregation_walks_every_tracked_player(server):
+    rcon_event_framework.aggregate_scores(AGGREGATE_EVENT, exact=True)
+    assert server.received[0] == "scoreboard players list"
+    assert not any(cmd.startswith("execute") for cmd in server.received)
+
+
+def test_engine_keeps_its_rcon_session_between_actions(server, plan, monkeypatch):
+    monkeypatch.setattr(rcon_event_framework, "events_path", EVENTS_DIR)
+    monkeypatch.setattr(rcon_event_framework, "BELL_INTERVAL", 0)
+    engine = rcon_event_framework.event_engine()
+
+    async def two_starts():
+        return [await engine.start("TimberTrial.json"), await engine.start("TimberTrial.json")]
+
+    assert asyncio.run(two_starts()) == [True, True]
+    assert server.received.count(plan.setup_commands[0]) == 2
+    # Both actions ran in this process over the one pooled session
+    assert len(server.connections) == 1
+
+
+def test_engine_reports_a_missing_event_file(server, monkeypatch):
+    monkeypatch.setattr(rcon_event_framework, "events_path", EVENTS_DIR)
+    assert asyncio.run(rcon_event_framework.event_engine().start("Missing.json")) is False
+    assert server.received == []
+
+
+@pytest.fixture
+def quick_plan():
+    """TimberTrial with the closing sidebar shown for no time at all"""
+    with open(os.path.join(EVENTS_DIR, "TimberTrial.json")) as f:
+        definition = json.load(f)
+    definition["sidebar"]["duration"] = 0
+    return event_plan(definition)
+
+
+def play_ceremony(server, plan, event, monkeypatch):
+    """Run the closing ceremony at full speed, noting what had been sent when results arrived"""
+    monkeypatch.setattr(rcon_event_framework, "FIREWORK_INTERVAL", 0)
+    handed_off = []
+
+    def on_results(leaders, final_score):
+        handed_off.append((leaders, final_score, list(server.received)))
+
+    asyncio.run(rcon_event_framework.closing_ceremony({"unique_event_name": event}, plan, on_results))
+    return handed_off
+
+
+def test_results_are_handed_off_before_the_ceremony_plays(server, quick_plan, event, monkeypatch):
+    handed_off = play_ceremony(server, quick_plan, event, monkeypatch)
+
+    assert len(handed_off) == 1
+    leaders, final_score, sent_so_far = handed_off[0]
+    assert (leaders, final_score) == (["alice"], 12)
+    # Only the score reads had gone out - no announcement, fireworks or music yet
+    assert all(cmd.startswith("scoreboard players") for cmd in sent_so_far)
+    assert quick_plan.end_announcement in server.received[len(sent_so_far):]
+
+
+def test_no_participation_hands_off_no_winners(monkeypatch, quick_plan, event):
+    server = serve(monkeypatch, lambda cmd: scoreboard(cmd).replace(" has 12 ", " has 0 ").replace(" has 7 ", " has 0 "))
+    try:
+        handed_off = play_ceremony(server, quick_plan, event, monkeypatch)
+    finally:
+        rcon_event_framework.close_all()
+        server.close()
+
+    assert [(leaders, final_score) for leaders, final_score, _ in handed_off] == [([], 0)]
+    assert quick_plan.no_winner_announcement in server.received
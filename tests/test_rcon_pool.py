@@ -0,0 +1,70 @@
+import pytest
+
+from fake_rcon import strict_server, PASSWORD
+from rcon_pool import rcon_connection, rcon_pool, rcon_error
+
+LONG_REPLY = "€" * 3000  # 9000 bytes, and 4096-byte chunks split a character
+
+
+def reply(cmd):
+    return LONG_REPLY if cmd == "long" else f"ran {cmd}"
+
+
+@pytest.fixture
+def server():
+    server = strict_server(respond=reply)
+    yield server
+    server.close()
+
+
+def connect(server, pipeline=False):
+    conn = rcon_connection("127.0.0.1", server.port, PASSWORD, timeout=5, pipeline=pipeline)
+    conn.connect()
+    return conn
+
+
+def test_batch_runs_lock_step_by_default(server):
+    conn = connect(server)
+    cmds = [f"say {i}" for i in range(100)]
+    assert conn.command_batch(cmds) == [f"ran {cmd}" for cmd in cmds]
+    assert not server.dropped
+    conn.close()
+
+
+def test_multi_packet_reply_is_joined_before_decoding(server):
+    conn = connect(server)
+    assert conn.command_batch(["say before", "long", "say after"]) == ["ran say before", LONG_REPLY, "ran say after"]
+    assert not server.dropped
+    conn.close()
+
+
+def test_pipelining_is_dropped_by_a_strict_server(server):
+    conn = connect(server, pipeline=True)
+    with pytest.raises((OSError, rcon_error)):
+        conn.command_batch(["say 1", "say 2"])
+    assert server.dropped
+    conn.close()
+
+
+def test_unanswered_command_is_not_resent():
+    server = strict_server(ignore="give")
+    pool = rcon_pool("127.0.0.1", server.port, PASSWORD, timeout=1)
+    try:
+        assert pool.run(["say warm up"]) == ["ran say warm up"]
+        # The reused session times out waiting - the give may have run, so it must not go again
+        with pytest.raises(OSError):
+            pool.run(["give winner minecraft:diamond 1"])
+        assert server.received.count("give winner minecraft:diamond 1") == 1
+    finally:
+        pool.close()
+        server.close()
+
+
+def test_batch_is_retried_on_a_fresh_session_when_an_idle_one_was_dropped(server):
+    pool = rcon_pool("127.0.0.1", server.port, PASSWORD, timeout=5)
+    assert pool.run(["say one"]) == ["ran say one"]
+
+    server.drop_connections()
+    assert pool.run(["say two"]) == ["ran say two"]
+    assert server.received == ["say one", "say two"]
+    pool.close()
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import sql_calendar
+from database_manager import db_manager
+
+FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def at(when):
+    """Scheduler clock parameters for a given time"""
+    return {"now": when.strftime(FORMAT), "in_30m": (when + timedelta(minutes=30)).strftime(FORMAT)}
+
+
+@pytest.fixture(scope="module")
+def db():
+    sql_calendar.migrate_database()
+    return db_manager(sql_calendar.DATABASE_PATH, sql_calendar.SCHEMA_PATH)
+
+
+@pytest.fixture
+def events(db):
+    """A handful of events in every scheduler state, removed again afterwards"""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def add(name, start, end, **state):
+        sql_calendar.insert_event(name, name, f"{name}.json", "", (now + start).strftime(FORMAT), (now + end).strftime(FORMAT))
+        event_id = sql_calendar.get_event_id_by_unique_name(name)
+        for column, value in state.items():
+            db.db_query_with_params(f"UPDATE events SET {column} = ? WHERE id = ?", (value, event_id))
+        return event_id
+
+    ids = [
+        add("sched_soon", timedelta(hours=2), timedelta(hours=4)),
+        add("sched_later", timedelta(days=3), timedelta(days=3, hours=2)),
+        add("sched_running", -timedelta(hours=1), timedelta(hours=1), event_started=1, event_in_progress=1,
+            last_scoreboard_time=(now - timedelta(minutes=5)).strftime(FORMAT)),
+        add("sched_cadence", -timedelta(hours=1), timedelta(hours=3), event_started=1, event_in_progress=1,
+            next_scoreboard_time=(now + timedelta(minutes=7)).strftime(FORMAT)),
+    ]
+    yield now, ids
+    for event_id in ids:
+        db.db_query_with_params("DELETE FROM events WHERE id = ?", (event_id,))
+
+
+def due(db, clock, ids):
+    rows = db.db_query_with_params(sql_calendar.DUE_ACTIONS_QUERY, clock) or []
+    return {(row[1], row[2]) for row in rows if row[2] in ids}
+
+
+def test_every_deadline_is_picked_up_once_it_is_due(db, events):
+    now, ids = events
+    deadlines = [row for row in db.db_query_with_params(sql_calendar.UPCOMING_DEADLINES_QUERY, at(now)) if row[0] in ids]
+    assert {action for _, action, _ in deadlines} == {"start", "start_notification", "end", "display", "30min", "24h"}
+
+    for event_id, action, due_at in deadlines:
+        due_time = datetime.strptime(due_at, FORMAT).replace(tzinfo=timezone.utc)
+        assert (action, event_id) in due(db, at(max(due_time, now)), ids), (action, due_at)
+        if due_time > now:
+            assert (action, event_id) not in due(db, at(due_time - timedelta(seconds=1)), ids), (action, due_at)
+
+
+def test_nothing_is_due_without_a_deadline(db, events):
+    now, ids = events
+    deadlines = {(action, event_id) for event_id, action, _ in db.db_query_with_params(sql_calendar.UPCOMING_DEADLINES_QUERY, at(now)) if event_id in ids}
+    assert due(db, at(now), ids) <= deadlines
+
+
+@pytest.mark.parametrize("query", ["UPCOMING_DEADLINES_QUERY", "DUE_ACTIONS_QUERY"])
+def test_scheduler_queries_search_indexes(tmp_path, query):
+    # A fresh database brought up to date the same way the handler does it at startup
+    fresh = db_manager(str(tmp_path / "fresh.db"), sql_calendar.SCHEMA_PATH)
+    fresh.initialize_db()
+    fresh.migrate(sql_calendar.MIGRATIONS_DIR)
+
+    plan = fresh.db_query_with_params(f"EXPLAIN QUERY PLAN {getattr(sql_calendar, query)}", sql_calendar.due_actions_clock())
+    assert plan
+    assert [row[3] for row in plan if "SCAN" in row[3]] == []
@@ -0,0 +1,75 @@
+import pytest
+
+import sql_calendar
+from database_manager import db_manager
+from score_snapshots import score_recorder, score_poller, score_history
+
+
+@pytest.fixture
+def event_id():
+    sql_calendar.migrate_database()
+    sql_calendar.insert_event("snap_event", "snap_event", "snap_event.json", "", "2026-01-01T00:00:00Z", "2026-01-02T00:00:00Z")
+    event_id = sql_calendar.get_event_id_by_unique_name("snap_event")
+    yield event_id
+    db = db_manager(sql_calendar.DATABASE_PATH, sql_calendar.SCHEMA_PATH)
+    db.db_query_with_params("DELETE FROM score_snapshots WHERE event_id = ?", (event_id,))
+    db.db_query_with_params("DELETE FROM events WHERE id = ?", (event_id,))
+
+
+def test_leaders_come_from_the_merged_reading(event_id):
+    poller = score_poller(score_recorder())
+    poller.poll(event_id, {"alice": 5, "bob": 3})
+
+    # alice has no score in this reading but keeps her last one
+    changes = poller.poll(event_id, {"bob": 4})
+    assert changes.leaders == ["alice"]
+    assert changes.leading_score == 5
+    assert not changes.leaders_changed
+
+
+def test_a_restart_continues_from_the_stored_scores(event_id):
+    score_poller(score_recorder()).poll(event_id, {"alice": 5, "bob": 3})
+
+    restarted = score_poller(score_recorder())
+    changes = restarted.poll(event_id, {"alice": 5, "bob": 3})
+    assert not changes.first
+    assert not changes.leaders_changed
+
+    changes = restarted.poll(event_id, {"bob": 6})
+    assert changes.leaders == ["bob"]
+    assert changes.leaders_changed
+
+
+def test_only_changed_players_are_stored(event_id):
+    recorder = score_recorder()
+    assert recorder.record(event_id, {"alice": 5, "bob": 3}, "2026-01-01T00:01:00Z") == {"alice": 5, "bob": 3}
+    assert recorder.record(event_id, {"alice": 5, "bob": 4}, "2026-01-01T00:02:00Z") == {"bob": 4}
+    # Nothing moved, so nothing is written
+    assert recorder.record(event_id, {"alice": 5, "bob": 4}, "2026-01-01T00:03:00Z") == {}
+
+    assert sql_calendar.get_score_history(event_id) == [
+        ("2026-01-01T00:01:00Z", "alice", 5),
+        ("2026-01-01T00:01:00Z", "bob", 3),
+        ("2026-01-01T00:02:00Z", "bob", 4),
+    ]
+
+
+def test_deltas_round_trip_to_the_full_scores(event_id):
+    recorder = score_recorder()
+    recorder.record(event_id, {"alice": 5, "bob": 3}, "2026-01-01T00:01:00Z")
+    recorder.record(event_id, {"bob": 7}, "2026-01-01T00:02:00Z")
+    recorder.record(event_id, {"carol": 2}, "2026-01-01T00:03:00Z")
+
+    assert sql_calendar.get_latest_scores(event_id) == {"alice": 5, "bob": 7, "carol": 2}
+    assert score_history(event_id) == {
+        "series": {
+            "alice": [["2026-01-01T00:01:00Z", 5]],
+            "bob": [["2026-01-01T00:01:00Z", 3], ["2026-01-01T00:02:00Z", 7]],
+            "carol": [["2026-01-01T00:03:00Z", 2]],
+        },
+        "standings": [
+            {"player": "bob", "score": 7},
+            {"player": "alice", "score": 5},
+            {"player": "carol", "score": 2},
+        ],
+    }